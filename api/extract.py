@@ -1,174 +1,283 @@
 #pylint: disable=C0304
-import os
 import json
-import fitz  # PyMuPDF
-from google import genai
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
-from prompts import ResumeExtractionPrompt, SummarizePrompt
+import time
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from prompts import SummarizePrompt
 
 from lib import DatabaseService, QdrantService
-
-GEMINI_MODEL_ID = os.environ.get("GEMINI_MODEL_ID", "gemini-2.5-flash")
+from lib.concurrency import run_io
+from lib.hybrid_search import hybrid_search, lexical_search
+from lib.ingestion import IngestionError, IngestionPipeline, delete_resume
+from lib.latency import search_latency
+from lib.metrics import PROMPT_BUILD_SECONDS, PROMPT_TOKENS
+from lib.pdf_extractor import PDF_MAX_BYTES
+from lib.providers import get_llm_provider
+from lib.tracing import log_payload
 
 router = APIRouter()
-client = genai.Client()
-
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+logger = logging.getLogger(__name__)
+# The LLM client is created on first use, so importing the API needs no credentials
+ingestion_pipeline = IngestionPipeline()
+
+def search_params(
+    query: str,
+    limit: int = Query(5, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    score_threshold: Optional[float] = None,
+    section: Optional[List[str]] = Query(None),
+    skill: Optional[List[str]] = Query(None),
+    company: Optional[List[str]] = Query(None),
+    resume_id: Optional[List[int]] = Query(None),
+    group_by_candidate: bool = False,
+    aggregate: str = Query("max", pattern="^(max|sum_top_n|section_weighted)$"),
+    top_n: int = Query(3, ge=1, le=20),
+    group_size: int = Query(3, ge=1, le=20),
+    section_weights: Optional[str] = Query(None, description="e.g. experience:1,skill:0.5"),
+    mode: str = Query("dense", pattern="^(dense|hybrid|lexical)$"),
+    summarize: bool = True,
+) -> dict:
     """
-    Extract text from a PDF, including complex and multi-column layouts,
-    using block-based extraction and coordinate sorting.
+    Query parameters shared by the search endpoints. Filters can be repeated
+    (e.g. `skill=Python&skill=SQL`) to match any of the values.
+    With `group_by_candidate` the results are candidates rather than chunks:
+    `limit`/`offset` page over candidates ranked by `aggregate`, each with
+    its `group_size` best chunks.
+    `mode` picks the retriever: "dense" (Qdrant), "lexical" (Postgres
+    full-text, no embedding call) or "hybrid" (both, fused by rank); the
+    latter two always return candidates. Without `summarize` no LLM call is made.
     """
-    try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid PDF file: {e}")
-
-    all_text = []
-
-    for page in doc:
-        # Extract blocks, each block: (x0, y0, x1, y1, text, block_type, block_no)
-        blocks = page.get_text("blocks")
-
-        if not blocks:
-            continue
-
-        # Sort blocks by vertical position then horizontal position
-        blocks = sorted(blocks, key=lambda b: (round(b[1], 1), round(b[0], 1)))
-
-        page_text_parts = []
-        for block in blocks:
-            text = block[4]
-            if text and text.strip():
-                page_text_parts.append(text.strip())
-
-        page_text = "\n".join(page_text_parts)
-        all_text.append(page_text)
-
-    doc.close()
+    params = {
+        "mode": mode,
+        "summarize": summarize,
+        "query": query,
+        "limit": limit,
+        "offset": offset,
+        "score_threshold": score_threshold,
+        "filters": {
+            "section": section,
+            "skill": skill,
+            "company": company,
+            "resume_id": resume_id,
+        },
+    }
+    if group_by_candidate or mode != "dense":
+        weights = None
+        if section_weights:
+            try:
+                weights = {
+                    name.strip(): float(weight)
+                    for name, weight in (pair.split(":") for pair in section_weights.split(","))
+                }
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail="section_weights must look like experience:1,skill:0.5") from e
+        params.update({
+            "aggregate": aggregate,
+            "top_n": top_n,
+            "group_size": group_size,
+            "section_weights": weights,
+        })
+    return params
+
+def dense_search(params: dict):
+    """
+    Blocking semantic or candidate-grouped search, run on the I/O thread pool.
+    """
+    if "aggregate" in params:
+        return QdrantService().grouped_search(**params)
+    return QdrantService().semantic_search(**params)
 
-    # Join pages with spacing
-    return "\n\n".join(all_text)
+async def search_resumes(params: dict):
+    """
+    Retrieve results with the retriever selected by `mode`.
+    """
+    mode = params["mode"]
+    params = {k: v for k, v in params.items() if k not in ("mode", "summarize")}
+    if mode == "lexical":
+        return await run_io(
+            lexical_search, params["query"], params["limit"], params["offset"],
+            params["filters"], params["group_size"]
+        )
+    if mode == "hybrid":
+        return await hybrid_search(**params)
+    return await run_io(dense_search, params)
+
+def summarize_prompt(query: str, search_results) -> str:
+    """
+    Build the summary prompt, recording its build time and token savings.
+    """
+    usage = {}
+    with PROMPT_BUILD_SECONDS.time(prompt="summarize"):
+        prompt_text = SummarizePrompt.prompt(question=query, search_results=search_results, usage=usage)
+    for stage, tokens in usage.items():
+        PROMPT_TOKENS.inc(tokens, prompt="summarize", stage=stage)
+    return prompt_text
+
+async def read_upload(file: UploadFile) -> bytes:
+    """
+    Read an uploaded PDF, which Starlette has spooled to a temporary file,
+    refusing files over PDF_MAX_BYTES without loading them into memory.
+    """
+    too_large = HTTPException(status_code=413, detail=f"PDF files are limited to {PDF_MAX_BYTES} bytes.")
+    if file.size is not None and file.size > PDF_MAX_BYTES:
+        raise too_large
+    pdf_bytes = await file.read(PDF_MAX_BYTES + 1)
+    if len(pdf_bytes) > PDF_MAX_BYTES:
+        raise too_large
+    return pdf_bytes
+
+def enqueue_job(filename: str, pdf_bytes: bytes, force: bool):
+    """
+    Store the upload in the ingestion job queue.
+    """
+    with DatabaseService() as database:
+        return database.enqueue_job(filename, pdf_bytes, force)
 
 @router.get("/api/search")
-async def semantic_search(query: str, limit: int = 5):
+async def semantic_search(params: dict = Depends(search_params)):
     """
     Endpoint to perform semantic search on resumes using Qdrant.
+    Results can be paged with `limit`/`offset`, cut off with `score_threshold`
+    and filtered by `section`, `skill`, `company` and `resume_id`.
+    `mode=lexical&summarize=false` answers keyword lookups from Postgres
+    alone, without any model call.
     """
-    qdrant_service = QdrantService()
-    search_results = qdrant_service.semantic_search(
-        query=query,
-        limit=limit
-    )
-    print("Search Results:", search_results)  # Debug print
-    # Summarize results using LLM
-    prompt_text = SummarizePrompt.prompt(question=query, search_results=search_results)
-    print("Prompt Text for Summarization:", prompt_text)  # Debug print
-    response = client.models.generate_content(
-        model=GEMINI_MODEL_ID,
-        contents=prompt_text
-    )
-    response_message = response.text
+    started = time.perf_counter()
+    search_results = await search_resumes(params)
+    log_payload(logger, "search results", search_results, mode=params["mode"])
+    response_message = None
+    if params["summarize"]:
+        # Summarize results using LLM
+        prompt_text = summarize_prompt(params["query"], search_results)
+        log_payload(logger, "summarize prompt", prompt_text)
+        response_message = await get_llm_provider().generate(prompt_text, operation="summarize")
+    # Nothing reaches the client before the full answer, so TTFB is the total time
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    search_latency.record("search.ttfb", elapsed_ms)
+    search_latency.record(f"search.{params['mode']}.ttfb", elapsed_ms)
+    if "aggregate" in params:
+        return JSONResponse(content={
+            "answer": response_message,
+            "candidates": search_results,
+            "limit": params["limit"],
+            "offset": params["offset"],
+            "mode": params["mode"]
+        })
+    if not params["summarize"]:
+        return JSONResponse(content={"answer": None, "results": search_results})
     return JSONResponse(content={"answer": response_message})
 
+def sse_event(event: str, data: dict) -> str:
+    """
+    Format one Server-Sent Event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/api/search/stream")
+async def semantic_search_stream(params: dict = Depends(search_params)):
+    """
+    Streaming variant of /api/search using Server-Sent Events.
+    Sends a `hits` event with the retrieved results as soon as they are
+    available, then `token` events as the summary is generated, and a final
+    `done` event with the measured time-to-first-byte and first-token latency.
+    """
+    started = time.perf_counter()
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    async def events():
+        search_results = await search_resumes(params)
+        ttfb_ms = elapsed_ms()
+        search_latency.record("search_stream.ttfb", ttfb_ms)
+        yield sse_event("hits", {"results": search_results})
+        if not params["summarize"]:
+            yield sse_event("done", {"ttfb_ms": ttfb_ms, "first_token_ms": None, "total_ms": ttfb_ms})
+            return
+
+        prompt_text = summarize_prompt(params["query"], search_results)
+        first_token_ms = None
+        try:
+            async for text in get_llm_provider().stream(prompt_text, operation="summarize_stream"):
+                if first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                    search_latency.record("search_stream.first_token", first_token_ms)
+                yield sse_event("token", {"text": text})
+        except Exception as e: #pylint: disable=W0718
+            logger.exception("Streaming summarization failed")
+            yield sse_event("error", {"detail": f"Summarization failed: {e}"})
+        total_ms = elapsed_ms()
+        search_latency.record("search_stream.total", total_ms)
+        yield sse_event("done", {
+            "ttfb_ms": ttfb_ms,
+            "first_token_ms": first_token_ms,
+            "total_ms": total_ms
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/api/resume/{resume_id}")
 async def get_resume(resume_id: int):
     """
     Endpoint to retrieve resume data by ID.
     """
-    database = DatabaseService(
-        host=os.environ.get("POSTGRES_HOST", "localhost"),
-        port=int(os.environ.get("POSTGRES_PORT", 5432)),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        database=os.environ.get("POSTGRES_DB", "resumescreenerdb")
-    )
-    database.start_connection()
-    resume_data = database.get_resume_by_id(resume_id)
-    skills = database.get_skills_by_resume_id(resume_id)
-    experience = database.get_experience_by_resume_id(resume_id)
-    education = database.get_education_by_resume_id(resume_id)
-    database.close_connection()
-
-    response_data = {
-        "resume": resume_data,
-        "skills": skills,
-        "experience": experience,
-        "education": education
-    }
-
-    if not resume_data:
+    response_data = await run_io(DatabaseService().get_resume_document, resume_id)
+    if not response_data:
         raise HTTPException(status_code=404, detail="Resume not found.")
 
     return JSONResponse(content=response_data)
 
+@router.delete("/api/resume/{resume_id}")
+async def remove_resume(resume_id: int):
+    """
+    Endpoint to delete a resume from Postgres and its vectors from Qdrant.
+    """
+    try:
+        deleted = await run_io(delete_resume, resume_id)
+    except IngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Resume not found.")
+    return {"resume_id": resume_id, "deleted": True}
+
 @router.post("/api/resume")
-async def extract_pdf_text(file: UploadFile = File(...)):
+async def extract_pdf_text(file: UploadFile = File(...), force: bool = False, background: bool = False):
     """
     Endpoint to extract text from uploaded PDF file.
     Handles complex PDFs including multi-column layouts.
+    Uploads already seen (same file bytes or same extracted text) return the
+    stored resume without calling the model, unless `force` is set, in which
+    case the existing resume is re-extracted and replaced in place.
+    With `background` set the upload is queued and 202 Accepted is returned
+    with a job id to poll on /api/jobs/{job_id}.
     """
 
     # Validate PDF
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
-    pdf_bytes = await file.read()
+    pdf_bytes = await read_upload(file)
     if not pdf_bytes:
         raise HTTPException(status_code=400, detail="Empty file uploaded.")
 
-    # Extract text using improved logic
-    extracted_text = extract_text_from_pdf(pdf_bytes)
-    prompt_text = ResumeExtractionPrompt.prompt(raw_text=extracted_text)
-    print("Prompt Text:", prompt_text)  # Debug print
-    response = client.models.generate_content(
-        model=GEMINI_MODEL_ID,
-        contents=prompt_text
-    )
-    response_message = response.text
-    print("Response Message:", response_message)  # Debug print
-
-    # Extract from first { to last }
-    start_index = response_message.find('{')
-    end_index = response_message.rfind('}') + 1
-    if start_index == -1 or end_index == -1:
-        raise HTTPException(status_code=500, detail="Failed to parse response from language model.")
-
-    json_str = response_message[start_index:end_index]
-    parsed_json = json.loads(json_str)
-
-    database = DatabaseService(
-        host=os.environ.get("POSTGRES_HOST", "localhost"),
-        port=int(os.environ.get("POSTGRES_PORT", 5432)),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        database=os.environ.get("POSTGRES_DB", "resumescreenerdb")
-    )
-    database.start_connection()
-    resume_id = database.insert_resume(parsed_json)
-    
-    skills = parsed_json.get("skills", [])
-    database.insert_skills(resume_id, skills)
-
-    experience_list = parsed_json.get("experience", [])
-    database.insert_experience(resume_id, experience_list)
-
-    education_list = parsed_json.get("education", [])
-    database.insert_education(resume_id, education_list)
-    
-    database.close_connection()
-
-    response_data = {
-        "resume_id": resume_id,
-        "extracted_data": parsed_json
-    }
+    if background:
+        job_id = await run_io(enqueue_job, file.filename, pdf_bytes, force)
+        if job_id is None:
+            raise HTTPException(status_code=500, detail="Failed to queue ingestion job.")
+        logger.info("Queued ingestion job %s for %s.", job_id, file.filename)
+        return JSONResponse(status_code=202, content={
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/api/jobs/{job_id}"
+        })
 
-    # Starting the Vector database ingestion
-    qdrant_service = QdrantService()
-
-    # Prepare resume chunks
-    qdrant_service.prepare_resume_chunks(response_data)
-
-    # Create embeddings and store in Qdrant
-    qdrant_service.create_embeddings_and_store()
-
-
-    return response_data
\ No newline at end of file
+    try:
+        return await ingestion_pipeline.run(pdf_bytes, force=force)
+    except IngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
\ No newline at end of file
@@ -0,0 +1,27 @@
+#pylint: disable=C0304
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from lib import DatabaseService
+from lib.concurrency import run_io
+
+router = APIRouter()
+
+def fetch_job(job_id: int):
+    """
+    Blocking job lookup, run on the I/O thread pool.
+    """
+    with DatabaseService() as database:
+        return database.get_job(job_id)
+
+@router.get("/api/jobs/{job_id}")
+async def get_job(job_id: int):
+    """
+    Endpoint to poll a background ingestion job.
+    Reports the job status, each pipeline stage with its timing, and the
+    ingestion result once the job has succeeded.
+    """
+    job = await run_io(fetch_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JSONResponse(content=job)
\ No newline at end of file
@@ -0,0 +1,44 @@
+#pylint: disable=C0304
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from lib.concurrency import run_io
+from lib.profile_index import ProfileIndexError, match_job_description
+
+router = APIRouter()
+
+class MatchRequest(BaseModel):
+    """
+    A job description to rank candidates against.
+    """
+    job_description: str = Field(..., min_length=1)
+    limit: int = Field(10, ge=1, le=100)
+    resume_ids: Optional[List[int]] = Field(None, description="only rank these resumes")
+    section_weights: Optional[Dict[str, float]] = Field(
+        None, description="e.g. {\"experience\": 1, \"skill\": 0.5}"
+    )
+
+@router.post("/api/match")
+async def match_candidates(request: MatchRequest):
+    """
+    Endpoint to rank candidates against a job description.
+    The description is embedded once and scored against every candidate's
+    profile vectors (per-section centroids of their resume chunks) in a
+    single matrix multiply; no LLM call is made. Each candidate comes with
+    its score per section. Profiles are rebuilt with build_profiles.py, so
+    resumes uploaded or re-extracted since the last build are not ranked
+    (or ranked on their old chunks) yet; `age_seconds` and
+    `changed_since_build` in the response say how stale the snapshot is.
+    """
+    try:
+        result = await run_io(
+            match_job_description, request.job_description, request.limit,
+            request.resume_ids, request.section_weights
+        )
+    except ProfileIndexError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return JSONResponse(content=result)
\ No newline at end of file
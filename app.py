@@ -1,11 +1,97 @@
 """
 Entrypoint for the Resume Screener API.
 """
-from fastapi import FastAPI
+import os
+import logging
+from contextlib import asynccontextmanager
+
+import psycopg2
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from api import extract, jobs, match
+from lib import DatabaseService, PoolTimeoutError, QdrantService, init_pool, get_pool, close_pool
+from lib.database_service import resume_cache
+from lib.concurrency import run_io, start_executors, shutdown_executors, warm_cpu_workers
+from lib.embedding_cache import close_embedding_cache, get_embedding_cache
+from lib.job_worker import start_workers, stop_workers
+from lib.latency import search_latency
+from lib.metrics import REGISTRY
+from lib.middleware import RequestContextMiddleware
+from lib.pdf_extractor import worker_ready
+from lib.providers import get_embedding_provider, get_llm_provider
+from lib.qdrant_service import close_qdrant_clients
+from lib.tracing import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+def runtime_gauges():
+    """
+    Numeric pool and cache statistics from /api/stats as gauges, one per
+    statistic (e.g. resumescreener_database_pool_in_use).
+    """
+    components = {
+        "database_pool": get_pool().stats(),
+        "resume_cache": resume_cache.stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+    }
+    for component, values in components.items():
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield (f"resumescreener_{component}_{key}", f"{component} {key}.",
+                       [(f"resumescreener_{component}_{key}", {}, value)])
 
-from api import extract
+REGISTRY.register_callback(runtime_gauges)
+
+def warm_up():
+    """
+    Create the model clients and the shared Qdrant client, and check the
+    collection settings once, so the first requests do not pay for them.
+    """
+    get_embedding_provider()
+    get_llm_provider()
+    service = QdrantService()
+    service.ensure_collection(service.collection_name)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Create process-wide resources at startup and release them at shutdown.
+    """
+    init_pool()
+    start_executors()
+    workers = []
+    try:
+        try:
+            with DatabaseService() as database:
+                missing = database.missing_schema()
+            if missing:
+                logger.warning("Database schema incomplete (missing %s); run python migrate.py.", ", ".join(missing))
+        except (psycopg2.Error, PoolTimeoutError) as e:
+            logger.warning("Skipping schema check, database unavailable: %s", e)
+        try:
+            await run_io(warm_up)
+        except Exception as e: #pylint: disable=W0718
+            # Clients are created on first use instead, e.g. once credentials are set
+            logger.warning("Skipping warm-up: %s", e)
+        await warm_cpu_workers(worker_ready)
+        # Background ingestion workers; set INGEST_WORKERS=0 to run them only via worker.py
+        workers = start_workers(
+            extract.ingestion_pipeline,
+            int(os.environ.get("INGEST_WORKERS", 2))
+        )
+        yield
+    finally:
+        # Release everything even if startup or shutdown failed part-way
+        try:
+            await stop_workers(workers)
+        finally:
+            shutdown_executors()
+            close_qdrant_clients()
+            close_embedding_cache()
+            close_pool()
 
 app = FastAPI(
     title = "Resume Screener API",
@@ -19,16 +105,28 @@ app = FastAPI(
     },
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/v1/openapi.json"
+    openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan
 )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_methods=["*"]
+    allow_methods=["*"],
+    expose_headers=["X-Request-ID"]
 )
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(extract.router)
+app.include_router(jobs.router)
+app.include_router(match.router)
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(_request: Request, exc: PoolTimeoutError):
+    """
+    The database pool is saturated; ask the client to retry later.
+    """
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 @app.get("/api/heartbeat")
 async def heartbeat():
@@ -36,3 +134,24 @@ async def heartbeat():
     Simple hearbeat endpoint. Returns 200.
     """
     return JSONResponse(status_code=200, content = {"message": "API is running !"})
+
+@app.get("/api/metrics")
+async def metrics():
+    """
+    Stage latency histograms, counters and pool/cache gauges in the
+    Prometheus text exposition format.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/stats")
+async def stats():
+    """
+    Runtime statistics used for capacity planning.
+    """
+    return JSONResponse(status_code=200, content={
+        "database_pool": get_pool().stats(),
+        "resume_cache": resume_cache.stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "search_latency": search_latency.stats(),
+    })
\ No newline at end of file
@@ -0,0 +1,411 @@
+"""
+End-to-end benchmark of the ingestion pipeline and the search endpoint.
+
+Every document goes through the same functions the API uses:
+extract_text_from_pdf -> LLM extraction -> DatabaseService -> QdrantService.
+Then /api/search is queried in each retrieval mode. Gemini is replaced by the
+local providers and Qdrant by an in-memory instance, unless --qdrant-url is
+given. Postgres is the one configured by the POSTGRES_* variables; point it at
+a scratch database, or pass --skip-database.
+
+For each stage the run reports p50/p95/p99 latency, throughput and peak RSS.
+The results are written as JSON so they can be compared between commits.
+
+Usage:
+    python -m benchmarks.run --synthetic 1000
+    python -m benchmarks.run --source sample_resumes --repeat 25
+    python -m benchmarks.run --synthetic 10000 --compare benchmarks/results/<commit>-synthetic-10000.json
+"""
+import os
+
+# Local stand-ins for the Gemini APIs, set before lib reads its configuration
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ.setdefault("LLM_PROVIDER", "local")
+# Keep the on-disk embedding cache out of the measurements
+os.environ.setdefault("EMBED_CACHE_PATH", "")
+
+#pylint: disable=C0413
+import sys
+import json
+import time
+import random
+import asyncio
+import inspect
+import platform
+import argparse
+import threading
+import subprocess
+import contextlib
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from qdrant_client import QdrantClient
+
+import lib.qdrant_service
+from api import extract
+from lib import DatabaseService, init_pool, close_pool
+from lib.concurrency import shutdown_executors
+from lib.fingerprint import CONTENT, TEXT, content_fingerprint, text_fingerprint
+from lib.ingestion import IngestionPipeline, index_resume, store_resume
+from lib.latency import LatencyTracker
+from lib.pdf_extractor import extract_text_from_pdf
+from lib.providers import get_embedding_provider, get_llm_provider
+
+from .synthetic import ROLES, SKILLS, synthetic_resumes
+
+MODES = ("dense", "lexical", "hybrid")
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource #pylint: disable=C0415
+        # Not Linux: fall back to the peak so far (bytes on macOS, kilobytes elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BenchmarkStats:
+    """
+    Latency samples, busy time, processed units and peak RSS per stage.
+    A background thread samples RSS and attributes it to the running stage.
+    """
+    def __init__(self, sample_interval: float = 0.01):
+        """
+        Start the RSS sampler.
+        """
+        self.latency = LatencyTracker(window=None)
+        self.busy = defaultdict(float)
+        self.units: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.peak_rss = defaultdict(int)
+        self.current: Optional[str] = None
+        self.started = time.perf_counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, args=(sample_interval,), daemon=True)
+        self._sampler.start()
+
+    def _sample(self, interval: float):
+        while not self._stop.wait(interval):
+            self._observe()
+
+    def _observe(self):
+        rss = current_rss()
+        stage = self.current
+        if stage is not None:
+            self.peak_rss[stage] = max(self.peak_rss[stage], rss)
+        self.peak_rss["total"] = max(self.peak_rss["total"], rss)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Attribute RSS samples taken inside the block to `name`.
+        """
+        self.current = name
+        self._observe()
+        try:
+            yield
+        finally:
+            self._observe()
+            self.current = None
+
+    def record(self, stage: str, started: float, **units: int):
+        """
+        Record one operation of `stage` that began at `started`, with the
+        units it processed (e.g. documents=1, points=12).
+        """
+        elapsed = time.perf_counter() - started
+        self.latency.record(stage, elapsed * 1000)
+        self.busy[stage] += elapsed
+        for unit, count in units.items():
+            self.units[stage][unit] += count
+
+    def summary(self) -> dict:
+        """
+        Per-stage results plus run totals.
+        """
+        self._stop.set()
+        self._sampler.join()
+        self._observe()
+        stages = {}
+        for stage, latency in self.latency.stats().items():
+            busy = self.busy[stage]
+            stages[stage] = {
+                **latency,
+                "busy_s": round(busy, 3),
+                "throughput_per_s": {
+                    unit: round(count / busy, 2) if busy else None
+                    for unit, count in self.units[stage].items()
+                },
+                "peak_rss_mb": round(self.peak_rss[stage] / 2**20, 1),
+            }
+        return {
+            "stages": stages,
+            "total": {
+                "wall_s": round(time.perf_counter() - self.started, 3),
+                "peak_rss_mb": round(self.peak_rss["total"] / 2**20, 1),
+            },
+        }
+
+
+def source_documents(source: str, repeat: int) -> Tuple[List[str], Iterator[Tuple[str, bytes]]]:
+    """
+    PDFs of a directory, each read `repeat` times.
+    """
+    keys = sorted(n for n in os.listdir(source) if n.lower().endswith(".pdf"))
+
+    def documents():
+        for round_ in range(repeat):
+            for key in keys:
+                with open(os.path.join(source, key), "rb") as f:
+                    yield f"{round_}/{key}", f.read()
+    return keys, documents()
+
+
+def search_request(**overrides) -> dict:
+    """
+    Build /api/search parameters as FastAPI would, from the endpoint's defaults.
+    """
+    kwargs = {}
+    for name, param in inspect.signature(extract.search_params).parameters.items():
+        # Query(...) defaults carry the plain default value
+        kwargs[name] = overrides.get(name, getattr(param.default, "default", param.default))
+    return extract.search_params(**kwargs)
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Swallow the debug output of the code under test during timed sections.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+async def ingest(documents: Iterator[Tuple[str, bytes]], stats: BenchmarkStats, #pylint: disable=R0914
+                 chunk_size: int, use_database: bool) -> int:
+    """
+    Push documents through the pipeline stage by stage, `chunk_size` at a time.
+    Returns the number of documents ingested.
+    """
+    pipeline = IngestionPipeline(get_llm_provider())
+    next_id = 0
+    total = 0
+    while True:
+        chunk = list(islice(documents, chunk_size))
+        if not chunk:
+            return total
+        texts = []
+        with stats.stage("extract"):
+            for _, pdf_bytes in chunk:
+                started = time.perf_counter()
+                texts.append(extract_text_from_pdf(pdf_bytes))
+                stats.record("extract", started, documents=1)
+
+        parsed = []
+        with stats.stage("llm_extraction"), quiet():
+            for text in texts:
+                started = time.perf_counter()
+                parsed.append(await pipeline.parse_resume(text))
+                stats.record("llm_extraction", started, documents=1)
+
+        resume_ids = []
+        with stats.stage("database"):
+            for (_, pdf_bytes), text, data in zip(chunk, texts, parsed):
+                fingerprints = {content_fingerprint(pdf_bytes): CONTENT, text_fingerprint(text): TEXT}
+                started = time.perf_counter()
+                if use_database:
+                    resume_id = store_resume(data, fingerprints, None)
+                    if resume_id is None:
+                        raise RuntimeError("Failed to store resume; is the resumescreener schema created?")
+                else:
+                    next_id += 1
+                    resume_id = next_id
+                resume_ids.append(resume_id)
+                stats.record("database", started, documents=1)
+
+        with stats.stage("vector_index"), quiet():
+            for resume_id, data in zip(resume_ids, parsed):
+                started = time.perf_counter()
+                points = index_resume({"resume_id": resume_id, "extracted_data": data}, False)
+                stats.record("vector_index", started, documents=1, points=points)
+
+        total += len(chunk)
+        print(f"Ingested {total} documents.", flush=True)
+
+
+async def search(queries: List[str], modes: List[str], stats: BenchmarkStats, limit: int, summarize: bool):
+    """
+    Run every query through /api/search in each mode.
+    """
+    for mode in modes:
+        stage = f"search.{mode}"
+        with stats.stage(stage), quiet():
+            for query in queries:
+                params = search_request(query=query, mode=mode, limit=limit, summarize=summarize)
+                started = time.perf_counter()
+                response = await extract.semantic_search(params)
+                stats.record(stage, started, queries=1)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{stage} returned {response.status_code}")
+
+
+def git_commit() -> dict:
+    """
+    Commit the benchmark ran against, so results can be lined up with history.
+    """
+    def git(*args):
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=False).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def print_results(results: dict):
+    """
+    Human-readable table of the stage results.
+    """
+    print(f"\n{'stage':<22}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+          f"{'throughput':>40}{'peak RSS MB':>13}")
+    for name, stage in results["stages"].items():
+        throughput = ", ".join(f"{v}/s {k}" for k, v in stage["throughput_per_s"].items())
+        print(f"{name:<22}{stage['count']:>8}{stage['p50_ms']:>10}{stage['p95_ms']:>10}{stage['p99_ms']:>10}"
+              f"{stage['max_ms']:>10}{throughput:>40}{stage['peak_rss_mb']:>13}")
+    total = results["total"]
+    print(f"wall {total['wall_s']}s, peak RSS {total['peak_rss_mb']} MB")
+
+
+def compare(results: dict, baseline: dict, threshold: Optional[float]) -> bool:
+    """
+    Print the change of each stage against a baseline run. Returns False if
+    any p95 latency grew, or throughput fell, by more than `threshold` percent.
+    """
+    def change(new, old):
+        return (new - old) / old * 100 if old else 0.0
+
+    ok = True
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('source')}):")
+    for name, stage in results["stages"].items():
+        old = baseline["stages"].get(name)
+        if old is None:
+            continue
+        p50, p95 = change(stage["p50_ms"], old["p50_ms"]), change(stage["p95_ms"], old["p95_ms"])
+        unit = next(iter(stage["throughput_per_s"]), None)
+        rate = change(stage["throughput_per_s"].get(unit) or 0, (old["throughput_per_s"].get(unit) or 0))
+        regressed = threshold is not None and (p95 > threshold or rate < -threshold)
+        ok = ok and not regressed
+        print(f"  {name:<22} p50 {p50:+7.1f}%  p95 {p95:+7.1f}%  throughput {rate:+7.1f}%"
+              f"{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+async def main(args) -> int: #pylint: disable=R0914
+    """
+    Run the benchmark configured on the command line.
+    """
+    if args.qdrant_url:
+        os.environ["QDRANT_URL"] = args.qdrant_url
+        qdrant = args.qdrant_url
+    else:
+        # One in-memory Qdrant shared by every QdrantService the code under test creates
+        shared = QdrantClient(":memory:")
+        lib.qdrant_service.QdrantClient = lambda **_: shared
+        qdrant = ":memory:"
+
+    if args.synthetic:
+        source = f"synthetic-{args.synthetic}"
+        documents = synthetic_resumes(args.synthetic, seed=args.seed)
+    else:
+        keys, documents = source_documents(args.source, args.repeat)
+        source = f"{os.path.basename(os.path.normpath(args.source))}-x{args.repeat}"
+        if not keys:
+            print(f"No PDFs found in {args.source}.")
+            return 1
+
+    modes = [m for m in args.modes.split(",") if m]
+    use_database = not args.skip_database
+    if use_database:
+        init_pool()
+        with DatabaseService() as database:
+            database.migrate(log=lambda _: None)
+    else:
+        modes = [m for m in modes if m == "dense"]
+
+    rng = random.Random(args.seed)
+    queries = [
+        rng.choice([rng.choice(SKILLS), rng.choice(ROLES), f"{rng.choice(ROLES)} with {rng.choice(SKILLS)}"])
+        for _ in range(args.queries)
+    ]
+
+    stats = BenchmarkStats()
+    try:
+        ingested = await ingest(documents, stats, args.chunk_size, use_database)
+        await search(queries, modes, stats, args.limit, not args.no_summarize)
+    finally:
+        shutdown_executors()
+        if use_database:
+            close_pool()
+
+    results = {
+        "meta": {
+            **git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "source": source,
+            "documents": ingested,
+            "queries": len(queries),
+            "modes": modes,
+            "summarize": not args.no_summarize,
+            "embedding_provider": get_embedding_provider().model,
+            "llm_provider": get_llm_provider().model,
+            "qdrant": qdrant,
+            "database": use_database,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        **stats.summary(),
+    }
+    results["total"]["documents_per_s"] = round(ingested / results["total"]["wall_s"], 2)
+
+    print_results(results)
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"{(results['meta']['commit'] or 'unknown')[:10]}-{source}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.fail_threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resume ingestion and search end to end.")
+    inputs = parser.add_mutually_exclusive_group()
+    inputs.add_argument("--synthetic", type=int, metavar="N",
+                        help="ingest N generated resumes (e.g. 1000, 10000, 100000)")
+    inputs.add_argument("--source", default="sample_resumes", help="directory of PDFs (default: sample_resumes)")
+    parser.add_argument("--repeat", type=int, default=1, help="times to ingest each PDF of --source")
+    parser.add_argument("--seed", type=int, default=0, help="seed for synthetic resumes and queries")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="documents taken through each stage at a time")
+    parser.add_argument("--queries", type=int, default=200, help="search queries per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated search modes to measure")
+    parser.add_argument("--limit", type=int, default=5, help="results per search")
+    parser.add_argument("--no-summarize", action="store_true", help="skip the summary step of searches")
+    parser.add_argument("--skip-database", action="store_true",
+                        help="do not write to Postgres (only dense search is measured)")
+    parser.add_argument("--qdrant-url", help="benchmark against a Qdrant server instead of in-memory")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-<source>.json)")
+    parser.add_argument("--compare", help="results file of a previous run to compare against")
+    parser.add_argument("--fail-threshold", type=float,
+                        help="with --compare, exit 1 if p95 or throughput regress by more than this percent")
+    sys.exit(asyncio.run(main(parser.parse_args())))
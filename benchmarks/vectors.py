@@ -0,0 +1,288 @@
+"""
+Memory and recall benchmark for compact vector storage.
+
+The chunks of synthetic resumes (one point per summary, skill, experience
+and education entry, as QdrantService indexes them) are embedded at each
+output dimensionality and searched with each quantization ("none",
+"scalar", "binary"). For every combination the run reports the vector
+memory per million points and recall@k against exact float32 search at the
+full dimensionality.
+
+Against a Qdrant server (--qdrant-url) a collection is created per
+combination with QdrantService's settings and searched through Qdrant with
+rescoring. The in-memory client always searches exactly, so without a
+server quantized search is emulated with numpy the way Qdrant runs it:
+`oversampling` times more candidates than needed are ranked with the
+quantized vectors, then rescored with the original vectors.
+
+Usage:
+    python -m benchmarks.vectors --synthetic 2000
+    python -m benchmarks.vectors --synthetic 2000 --dimensions 384,192,96 --oversampling 3
+    EMBEDDING_PROVIDER=gemini python -m benchmarks.vectors --qdrant-url http://localhost:6333 \
+        --dimensions 3072,1536,768
+"""
+import os
+
+# Local stand-ins for the Gemini APIs, set before lib reads its configuration
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ.setdefault("LLM_PROVIDER", "local")
+os.environ.setdefault("EMBED_CACHE_PATH", "")
+
+#pylint: disable=C0413
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+from typing import Dict, List
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+import lib.qdrant_service
+from lib.providers.local import extract_resume
+from lib.qdrant_service import QUANTIZATIONS, QdrantService
+
+from .run import git_commit, quiet
+from .synthetic import ROLES, SKILLS, resume_lines
+
+# Scalar quantization clips this share of the most extreme values, like quantile=0.99
+SCALAR_CLIP = 0.01
+
+
+def corpus(service: QdrantService, count: int, seed: int) -> List[str]:
+    """
+    Chunk texts of `count` synthetic resumes.
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        data = extract_resume("\n".join(resume_lines(index, rng)))
+        service.prepare_resume_chunks({"resume_id": index, "extracted_data": data}, append=index > 0)
+    return [chunk["text"] for chunk in service.chunks]
+
+
+def normalized(vectors: List[List[float]]) -> np.ndarray:
+    """
+    Vectors as float32 rows of unit length, as Qdrant stores them for cosine distance.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the `k` highest scores of each row, best first.
+    """
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, part, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+
+def quantized_scores(points: np.ndarray, queries: np.ndarray, kind: str) -> np.ndarray:
+    """
+    Query-point similarities computed from quantized point vectors.
+    """
+    if kind == "none":
+        return queries @ points.T
+    if kind == "scalar":
+        low, high = np.quantile(points, [SCALAR_CLIP / 2, 1 - SCALAR_CLIP / 2])
+        step = (high - low) / 255
+        codes = np.round((np.clip(points, low, high) - low) / step).astype(np.uint8)
+        return queries @ (low + codes.astype(np.float32) * step).T
+    if kind == "binary":
+        # Matching sign bits of query and point, i.e. dimension minus Hamming distance
+        point_bits = (points > 0).astype(np.float32) * 2 - 1
+        query_bits = (queries > 0).astype(np.float32) * 2 - 1
+        return query_bits @ point_bits.T
+    raise ValueError(f"Unsupported quantization: {kind}")
+
+
+def emulated_search(points: np.ndarray, queries: np.ndarray, kind: str, k: int,
+                    oversampling: float, rescore: bool) -> np.ndarray:
+    """
+    Top `k` point indices per query: candidates from the quantized vectors,
+    rescored with the originals.
+    """
+    if kind == "none":
+        return top_k(queries @ points.T, k)
+    candidates = top_k(quantized_scores(points, queries, kind), math.ceil(k * oversampling))
+    if not rescore:
+        return candidates[:, :k]
+    exact = np.einsum("qd,qcd->qc", queries, points[candidates])
+    return np.take_along_axis(candidates, top_k(exact, k), axis=1)
+
+
+def server_search(service: QdrantService, points: np.ndarray, queries: np.ndarray,
+                  kind: str, k: int) -> np.ndarray:
+    """
+    Top `k` point indices per query from a Qdrant collection created with
+    QdrantService's settings for quantization `kind`.
+    """
+    dimension = points.shape[1]
+    service.collection_name = f"benchmark_vectors_{dimension}_{kind}"
+    service.quantization = kind
+    service.on_disk_vectors = kind != "none"
+    if service.qclient.collection_exists(service.collection_name):
+        service.qclient.delete_collection(service.collection_name)
+        service.forget_collection(service.collection_name)
+    service.ensure_collection(service.collection_name, dimension)
+    for start in range(0, len(points), service.upsert_batch_size):
+        batch = points[start:start + service.upsert_batch_size]
+        service.qclient.upsert(service.collection_name, points=qmodels.Batch(
+            ids=list(range(start, start + len(batch))), vectors=batch.tolist()
+        ), wait=True)
+    # Quantized vectors are built by the optimizer once the points are in
+    while service.qclient.get_collection(service.collection_name).status != qmodels.CollectionStatus.GREEN:
+        time.sleep(0.5)
+    hits = []
+    for query in queries:
+        response = service.qclient.query_points(
+            service.collection_name, query=query.tolist(), limit=k, search_params=service.search_params()
+        )
+        hits.append([point.id for point in response.points])
+    service.qclient.delete_collection(service.collection_name)
+    service.forget_collection(service.collection_name)
+    return np.asarray(hits)
+
+
+def recall(found: np.ndarray, exact: np.ndarray, k: int) -> float:
+    """
+    Mean share of each query's results that belong to its exact top `k`,
+    given the exact query-point similarities. Points tied with the k-th
+    best count as a match, since many chunks (e.g. a common skill) share
+    the same text.
+    """
+    kth = np.take_along_axis(exact, top_k(exact, k)[:, -1:], axis=1)
+    hits = np.take_along_axis(exact, found[:, :k], axis=1) >= kth - 1e-6
+    return float(hits.sum(axis=1).mean() / k)
+
+
+def memory_per_million(dimension: int, kind: str, on_disk: bool) -> Dict[str, float]:
+    """
+    Estimated vector storage for a million points, in MB: RAM for the
+    vectors searched in memory, disk for originals moved out of RAM.
+    HNSW links and payloads are not included.
+    """
+    original = 4 * dimension
+    if kind == "none":
+        ram = 0 if on_disk else original
+    elif kind == "scalar":
+        ram = dimension + 4  # int8 codes plus a per-vector offset
+    else:
+        ram = math.ceil(dimension / 64) * 8  # bits packed in 64-bit words
+    return {
+        "ram_mb": round(ram * 1e6 / 2**20, 1),
+        "disk_mb": round(original * 1e6 / 2**20, 1) if (kind != "none" or on_disk) else 0.0,
+    }
+
+
+def print_results(results: dict):
+    """
+    Human-readable table of the combinations.
+    """
+    k = results["meta"]["k"]
+    print(f"{'dimension':>9} {'quantization':<12} {'RAM MB/1M':>10} {'disk MB/1M':>11} {f'recall@{k}':>10}")
+    for row in results["runs"]:
+        print(f"{row['dimension']:>9} {row['quantization']:<12} {row['ram_mb_per_million']:>10.1f} "
+              f"{row['disk_mb_per_million']:>11.1f} {row['recall']:>10.3f}")
+
+
+def main(args) -> int: #pylint: disable=R0914
+    """
+    Run the benchmark configured on the command line.
+    """
+    if args.qdrant_url:
+        os.environ["QDRANT_URL"] = args.qdrant_url
+    else:
+        # Searches are emulated; the service only prepares chunks and embeds them
+        lib.qdrant_service.QdrantClient = lambda **_: QdrantClient(":memory:")
+    service = QdrantService()
+    texts = corpus(service, args.synthetic, args.seed)
+    rng = random.Random(args.seed)
+    query_texts = [
+        rng.choice([rng.choice(SKILLS), rng.choice(ROLES), f"{rng.choice(ROLES)} with {rng.choice(SKILLS)}"])
+        for _ in range(args.queries)
+    ]
+    full = service.embedder.dimension or len(service.embed_texts(["dimension probe"])[0])
+    dimensions = [int(d) for d in args.dimensions.split(",")] if args.dimensions else [full, full // 2, full // 4]
+    kinds = [kind for kind in args.quantizations.split(",") if kind]
+    for kind in kinds:
+        if kind not in QUANTIZATIONS:
+            print(f"Unknown quantization {kind!r}; choose from {', '.join(QUANTIZATIONS)}.")
+            return 1
+    print(f"{len(texts)} points from {args.synthetic} resumes, {len(query_texts)} queries, "
+          f"{'Qdrant at ' + args.qdrant_url if args.qdrant_url else 'emulated quantization'}")
+
+    def embed(batch: List[str], dimension: int) -> np.ndarray:
+        with quiet():
+            return normalized(service.embed_texts(batch, dimension))
+
+    exact = embed(query_texts, full) @ embed(texts, full).T
+    runs = []
+    for dimension in dimensions:
+        points, queries = embed(texts, dimension), embed(query_texts, dimension)
+        for kind in kinds:
+            if args.qdrant_url:
+                found = server_search(service, points, queries, kind, args.k)
+            else:
+                found = emulated_search(points, queries, kind, args.k, args.oversampling, not args.no_rescore)
+            memory = memory_per_million(dimension, kind, on_disk=kind != "none")
+            runs.append({
+                "dimension": dimension,
+                "quantization": kind,
+                "ram_mb_per_million": memory["ram_mb"],
+                "disk_mb_per_million": memory["disk_mb"],
+                "recall": round(recall(found, exact, args.k), 4),
+            })
+
+    results = {
+        "meta": {
+            **git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "resumes": args.synthetic,
+            "points": len(texts),
+            "queries": len(query_texts),
+            "k": args.k,
+            "baseline_dimension": full,
+            "oversampling": service.quantization_oversampling if args.qdrant_url else args.oversampling,
+            "rescore": service.quantization_rescore if args.qdrant_url else not args.no_rescore,
+            "embedding_provider": service.embedder.model,
+            "qdrant": args.qdrant_url or "emulated",
+            "python": platform.python_version(),
+        },
+        "runs": runs,
+    }
+    print_results(results)
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results",
+        f"{(results['meta']['commit'] or 'unknown')[:10]}-vectors-{args.synthetic}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vector memory and recall per dimension and quantization.")
+    parser.add_argument("--synthetic", type=int, default=1000, metavar="N", help="generated resumes to index")
+    parser.add_argument("--seed", type=int, default=0, help="seed for synthetic resumes and queries")
+    parser.add_argument("--queries", type=int, default=200, help="search queries")
+    parser.add_argument("--k", type=int, default=10, help="results per search, the k of recall@k")
+    parser.add_argument("--dimensions",
+                        help="comma-separated output dimensionalities (default: full, 1/2 and 1/4 size)")
+    parser.add_argument("--quantizations", default=",".join(QUANTIZATIONS),
+                        help="comma-separated quantizations to measure")
+    parser.add_argument("--oversampling", type=float, default=2.0,
+                        help="emulated search: candidates per result ranked with quantized vectors")
+    parser.add_argument("--no-rescore", action="store_true", help="emulated search: skip rescoring")
+    parser.add_argument("--qdrant-url",
+                        help="measure a Qdrant server (QDRANT_QUANTIZATION_* settings apply)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-vectors-<N>.json)")
+    sys.exit(main(parser.parse_args()))
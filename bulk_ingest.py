@@ -0,0 +1,332 @@
+"""
+Bulk ingestion of resume PDFs from a directory or a zip archive.
+
+PDF text extraction runs across cores in a process pool, in-flight LLM
+extraction calls are bounded, and parsed resumes are written to Postgres
+and Qdrant in batches. Progress is checkpointed to a SQLite file, so a
+crashed run picks up where it stopped when started again.
+
+Usage: python bulk_ingest.py sample_resumes/ --workers 8 --llm-concurrency 16 --batch-size 50
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import zipfile
+import argparse
+import traceback
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from lib import DatabaseService, QdrantService, init_pool, close_pool
+from lib.concurrency import run_cpu, run_io, start_executors, shutdown_executors
+from lib.embedding_cache import close_embedding_cache
+from lib.fingerprint import content_fingerprint, upload_fingerprints
+from lib.ingestion import IngestionPipeline, existing_resume_response
+from lib.pdf_extractor import extract_text_from_pdf
+from lib.qdrant_service import close_qdrant_clients
+from lib.providers import get_llm_provider
+from lib.tracing import configure_logging
+
+
+def list_sources(source: str) -> List[str]:
+    """
+    Keys of every PDF under a directory (relative paths) or in a zip archive (member names).
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return sorted(n for n in archive.namelist() if n.lower().endswith(".pdf"))
+    keys = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                keys.append(os.path.relpath(os.path.join(root, name), source))
+    return sorted(keys)
+
+
+def extract_source(source: str, key: str):
+    """
+    Read one PDF and extract its text. Runs in a worker process, so the
+    file bytes never cross the process boundary.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            pdf_bytes = archive.read(key)
+    else:
+        with open(os.path.join(source, key), "rb") as f:
+            pdf_bytes = f.read()
+    return content_fingerprint(pdf_bytes), extract_text_from_pdf(pdf_bytes)
+
+
+class Checkpoint:
+    """
+    Per-file progress of a bulk run, stored in SQLite.
+    """
+    def __init__(self, path: str):
+        """
+        Open or create the checkpoint file.
+        """
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                key TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                resume_id INTEGER,
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def completed(self) -> set:
+        """
+        Keys that need no further work (ingested or found to be duplicates).
+        """
+        rows = self.db.execute("SELECT key FROM files WHERE status IN ('done', 'duplicate');")
+        return {row[0] for row in rows}
+
+    def mark(self, rows: List[tuple]):
+        """
+        Record (key, status, resume_id, error) rows.
+        """
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO files (key, status, resume_id, error, updated_at) VALUES (?, ?, ?, ?, ?);",
+            [(*row, now) for row in rows]
+        )
+        self.db.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of files per status.
+        """
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM files GROUP BY status;").fetchall())
+
+
+class StageStats:
+    """
+    Items processed and busy time per pipeline stage.
+    """
+    def __init__(self):
+        """
+        Start the wall clock.
+        """
+        self.started = time.perf_counter()
+        self.items = defaultdict(int)
+        self.busy = defaultdict(float)
+
+    def record(self, stage: str, items: int, started: float):
+        """
+        Count `items` finished by `stage` in the call that began at `started`.
+        """
+        self.items[stage] += items
+        self.busy[stage] += time.perf_counter() - started
+
+    def report(self) -> str:
+        """
+        One line per stage with its throughput over the run so far.
+        """
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        units = {"index": "chunks"}
+        lines = [f"elapsed {elapsed:.1f}s"]
+        for stage in ("extract", "llm", "database", "index"):
+            unit = units.get(stage, "docs")
+            lines.append(
+                f"  {stage:<9} {self.items[stage]:>8} {unit:<6} "
+                f"{self.items[stage] / elapsed:10.2f} {unit}/s  busy {self.busy[stage]:.1f}s"
+            )
+        return "\n".join(lines)
+
+
+class BulkIngestion: #pylint: disable=R0902
+    """
+    Drives one bulk run: extraction -> LLM parsing -> batched Postgres/Qdrant writes.
+    """
+    def __init__(self, source: str, pipeline, checkpoint: Checkpoint, #pylint: disable=R0913
+                 concurrency: int, batch_size: int, flush_interval: float):
+        """
+        Initialize the run.
+        """
+        self.source = source
+        self.pipeline = pipeline
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = StageStats()
+        self.seen: Dict[str, str] = {}   # fingerprint -> key, duplicates within this run
+        self.batches: Optional[asyncio.Queue] = None
+
+    def _lookup(self, fingerprints: dict):
+        with DatabaseService() as database:
+            existing_id = database.find_resume_by_fingerprints(list(fingerprints))
+        if existing_id is not None:
+            # A failed batch upload leaves stored resumes without vectors; index them now
+            existing_resume_response(existing_id)
+        return existing_id
+
+    def _write_batch(self, batch: list):
+        started = time.perf_counter()
+        with DatabaseService() as database:
+            resume_ids = database.ingest_resumes(
+                [parsed for _, parsed, _ in batch],
+                [fingerprints for _, _, fingerprints in batch]
+            )
+        if not resume_ids:
+            raise RuntimeError("Failed to store batch in Postgres.")
+        self.stats.record("database", len(resume_ids), started)
+
+        started = time.perf_counter()
+        qdrant_service = QdrantService()
+        for resume_id, (_, parsed, _) in zip(resume_ids, batch):
+            qdrant_service.prepare_resume_chunks(
+                {"resume_id": resume_id, "extracted_data": parsed}, append=True
+            )
+        points = qdrant_service.create_embeddings_and_store()
+        self.stats.record("index", points, started)
+        return resume_ids
+
+    async def _process(self, key: str):
+        started = time.perf_counter()
+        content_hash, text = await run_cpu(extract_source, self.source, key)
+        self.stats.record("extract", 1, started)
+
+        fingerprints = upload_fingerprints(content_hash, text)
+        duplicate_of = next((self.seen[f] for f in fingerprints if f in self.seen), None)
+        if duplicate_of is not None:
+            self.checkpoint.mark([(key, "duplicate", None, f"same content as {duplicate_of}")])
+            return
+        for fingerprint in fingerprints:
+            self.seen[fingerprint] = key
+        existing_id = await run_io(self._lookup, fingerprints)
+        if existing_id is not None:
+            self.checkpoint.mark([(key, "duplicate", existing_id, None)])
+            return
+
+        started = time.perf_counter()
+        parsed = await self.pipeline.parse_resume(text)
+        self.stats.record("llm", 1, started)
+        await self.batches.put((key, parsed, fingerprints))
+
+    async def _producer(self, keys: asyncio.Queue):
+        while True:
+            try:
+                key = keys.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self._process(key)
+            except Exception as e: #pylint: disable=W0718
+                self.checkpoint.mark([(key, "failed", None, f"{type(e).__name__}: {e}")])
+
+    async def _writer(self):
+        batch = []
+        finished = False
+        while not finished:
+            timed_out = False
+            try:
+                item = await asyncio.wait_for(self.batches.get(), timeout=self.flush_interval)
+                if item is None:
+                    finished = True
+                else:
+                    batch.append(item)
+            except asyncio.TimeoutError:
+                timed_out = True
+            if batch and (finished or timed_out or len(batch) >= self.batch_size):
+                try:
+                    resume_ids = await run_io(self._write_batch, batch)
+                    self.checkpoint.mark([
+                        (key, "done", resume_id, None)
+                        for (key, _, _), resume_id in zip(batch, resume_ids)
+                    ])
+                except Exception as e: #pylint: disable=W0718
+                    traceback.print_exc()
+                    self.checkpoint.mark([
+                        (key, "failed", None, f"{type(e).__name__}: {e}") for key, _, _ in batch
+                    ])
+                batch = []
+
+    async def _reporter(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats.report(), flush=True)
+
+    async def run(self, keys: List[str], report_interval: float):
+        """
+        Ingest every key and wait for the last batch to be written.
+        """
+        pending = asyncio.Queue()
+        for key in keys:
+            pending.put_nowait(key)
+        # Bounded so extraction and the LLM cannot run far ahead of the writer
+        self.batches = asyncio.Queue(maxsize=self.batch_size * 2)
+        writer = asyncio.create_task(self._writer())
+        reporter = asyncio.create_task(self._reporter(report_interval))
+        try:
+            await asyncio.gather(*(self._producer(pending) for _ in range(self.concurrency)))
+            await self.batches.put(None)
+            await writer
+        finally:
+            reporter.cancel()
+            writer.cancel()
+
+
+async def main(args):
+    """
+    Run a bulk ingestion as configured on the command line.
+    """
+    configure_logging()
+    # Executor sizes are read from the environment when first created
+    os.environ["PDF_WORKERS"] = str(args.workers)
+
+    source = os.path.abspath(args.source)
+    checkpoint_path = args.checkpoint or source.rstrip(os.sep) + ".checkpoint.sqlite3"
+    checkpoint = Checkpoint(checkpoint_path)
+    keys = list_sources(source)
+    completed = checkpoint.completed()
+    remaining = [k for k in keys if k not in completed]
+    print(f"{len(keys)} PDFs found, {len(completed)} already done, {len(remaining)} to ingest. "
+          f"Checkpoint: {checkpoint_path}")
+    if not remaining:
+        return
+
+    init_pool()
+    start_executors()
+    try:
+        llm = get_llm_provider()
+        llm.concurrency = args.llm_concurrency
+        run = BulkIngestion(
+            source=source,
+            pipeline=IngestionPipeline(llm),
+            checkpoint=checkpoint,
+            # Enough producers to keep every PDF worker and LLM slot busy
+            concurrency=args.workers + args.llm_concurrency,
+            batch_size=args.batch_size,
+            flush_interval=args.flush_interval,
+        )
+        await run.run(remaining, args.report_interval)
+        print(run.stats.report())
+        print(f"Checkpoint status: {checkpoint.counts()}")
+    finally:
+        shutdown_executors()
+        close_qdrant_clients()
+        close_embedding_cache()
+        close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-ingest resume PDFs from a directory or zip archive.")
+    parser.add_argument("source", help="directory or .zip file containing PDFs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int,
+                        default=int(os.environ.get("LLM_MAX_CONCURRENCY", 8)),
+                        help="maximum in-flight LLM extraction calls")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="resumes per Postgres transaction and Qdrant upload")
+    parser.add_argument("--flush-interval", type=float, default=5.0,
+                        help="seconds before a partial batch is written anyway")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <source>.checkpoint.sqlite3)")
+    parser.add_argument("--report-interval", type=float, default=10.0,
+                        help="seconds between throughput reports")
+    asyncio.run(main(parser.parse_args()))
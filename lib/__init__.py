@@ -1,2 +1,10 @@
+from .database_pool import DatabasePool, PoolTimeoutError, init_pool, get_pool, close_pool
 from .database_service import DatabaseService
-from .qdrant_service import QdrantService
\ No newline at end of file
+
+def __getattr__(name):
+    # qdrant_client and the model SDKs take over a second to import; PDF worker
+    # processes only need lib.pdf_extractor, so they are loaded on first use
+    if name == "QdrantService":
+        from .qdrant_service import QdrantService #pylint: disable=C0415
+        return QdrantService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
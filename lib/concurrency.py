@@ -0,0 +1,96 @@
+"""
+Concurrency Module
+Process-wide executors that keep blocking work off the event loop:
+a process pool for CPU-bound PDF parsing and a bounded thread pool for
+blocking network and database calls. Model calls are limited per provider
+in lib.rate_limit.
+"""
+import os
+import asyncio
+import functools
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_cpu_executor: Optional[Executor] = None
+_io_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def start_executors():
+    """
+    Create the executors from the environment if they do not exist yet.
+    PDF_WORKERS=0 parses PDFs on the I/O thread pool instead of in processes.
+    """
+    global _cpu_executor, _io_executor #pylint: disable=W0603
+    with _lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("BLOCKING_IO_WORKERS", "32")),
+                thread_name_prefix="blocking-io"
+            )
+        if _cpu_executor is None:
+            pdf_workers = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+            if pdf_workers > 0:
+                _cpu_executor = ProcessPoolExecutor(
+                    max_workers=pdf_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                _cpu_executor = _io_executor
+
+
+def shutdown_executors():
+    """
+    Shut the executors down, waiting for running work to finish.
+    """
+    global _cpu_executor, _io_executor #pylint: disable=W0603
+    with _lock:
+        if _cpu_executor is not None and _cpu_executor is not _io_executor:
+            _cpu_executor.shutdown(wait=True)
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=True)
+        _cpu_executor = _io_executor = None
+
+
+def cpu_workers() -> int:
+    """
+    Number of PDF worker processes, 0 when PDFs are parsed on the thread pool.
+    """
+    start_executors()
+    return getattr(_cpu_executor, "_max_workers", 0) if _cpu_executor is not _io_executor else 0
+
+
+async def warm_cpu_workers(initializer: Callable) -> int:
+    """
+    Start the PDF worker processes now instead of on the first upload, by
+    running the picklable `initializer` once per worker. Returns the number
+    of processes that ran it.
+    """
+    workers = cpu_workers()
+    if not workers:
+        return 0
+    return len(set(await asyncio.gather(*(run_cpu(initializer) for _ in range(workers)))))
+
+
+async def run_cpu(fn: Callable, *args: Any) -> Any:
+    """
+    Run a picklable CPU-bound function in the process pool.
+    """
+    start_executors()
+    return await asyncio.get_running_loop().run_in_executor(_cpu_executor, fn, *args)
+
+
+async def run_io(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking call on the bounded I/O thread pool, in a copy of the
+    caller's context so the request id follows it.
+    """
+    start_executors()
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _io_executor, functools.partial(context.run, fn, *args, **kwargs)
+    )
+
@@ -0,0 +1,262 @@
+"""
+Database Pool Module
+Process-wide PostgreSQL connection pool shared by every DatabaseService.
+The API creates it once at startup and closes it at shutdown.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Optional
+import psycopg2
+from psycopg2 import extensions as pgext
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection could be borrowed within the pool timeout.
+    """
+
+
+class DatabasePool: #pylint: disable=R0902
+    """
+    Bounded, thread-safe pool of psycopg2 connections.
+    Borrowers wait up to `timeout` seconds for a free connection; wait time
+    and saturation are tracked so the pool can be sized from real traffic.
+    """
+    def __init__(self, host: str, port: int, user: str, database: str, #pylint: disable=R0913
+                 minconn: int = 1, maxconn: int = 10, timeout: float = 5.0,
+                 health_check: bool = True, health_check_interval: float = 30.0):
+        """
+        Initialize the pool and open `minconn` connections up front.
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = os.environ.get("local_postgres_password", "")
+        self.database = database
+        self.minconn = max(0, minconn)
+        self.maxconn = max(1, maxconn)
+        self.timeout = timeout
+        self.health_check = health_check
+        self.health_check_interval = health_check_interval
+        self._idle = deque()   # (connection, returned_at)
+        self._size = 0         # connections currently open, idle or borrowed
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "borrows": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "peak_in_use": 0,
+            "health_check_failures": 0,
+        }
+        self._prefill()
+
+    @classmethod
+    def from_env(cls) -> "DatabasePool":
+        """
+        Build a pool from the POSTGRES_* environment variables.
+        """
+        return cls(
+            host=os.environ.get("POSTGRES_HOST", "localhost"),
+            port=int(os.environ.get("POSTGRES_PORT", 5432)),
+            user=os.environ.get("POSTGRES_USER", "postgres"),
+            database=os.environ.get("POSTGRES_DB", "resumescreenerdb"),
+            minconn=int(os.environ.get("POSTGRES_POOL_MIN", 1)),
+            maxconn=int(os.environ.get("POSTGRES_POOL_MAX", 10)),
+            timeout=float(os.environ.get("POSTGRES_POOL_TIMEOUT", 5.0)),
+            health_check=os.environ.get("POSTGRES_POOL_HEALTH_CHECK", "true").lower() == "true",
+            health_check_interval=float(os.environ.get("POSTGRES_POOL_HEALTH_CHECK_INTERVAL", 30.0)),
+        )
+
+    def _connect(self):
+        return psycopg2.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database
+        )
+
+    def _prefill(self):
+        """
+        Open the minimum number of connections. A database that is down at
+        startup is reported but does not prevent the API from starting.
+        """
+        for _ in range(self.minconn):
+            try:
+                conn = self._connect()
+            except psycopg2.Error as e:
+                logger.error("Error pre-filling connection pool: %s", e)
+                return
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._size += 1
+
+    def _is_healthy(self, conn, returned_at: float) -> bool:
+        """
+        Check a connection that sat idle in the pool before handing it out.
+        """
+        if conn.closed:
+            return False
+        if not self.health_check or time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1;")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """
+        Borrow a connection, waiting up to the pool timeout for one to free up.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed.")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    self._size += 1
+                    conn, returned_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection "
+                        f"({self._in_use}/{self.maxconn} in use)."
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            self._in_use += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, returned_at):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                conn.close()
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        wait_seconds = time.monotonic() - started
+        with self._cond:
+            self._stats["borrows"] += 1
+            self._stats["wait_seconds_total"] += wait_seconds
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], wait_seconds)
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._in_use)
+            if waited:
+                self._stats["waits"] += 1
+        return conn
+
+    def putconn(self, conn):
+        """
+        Return a borrowed connection. Any open transaction is rolled back and
+        broken connections are discarded instead of being reused.
+        """
+        keep = not conn.closed and not self._closed
+        if keep:
+            try:
+                status = conn.info.transaction_status
+                if status == pgext.TRANSACTION_STATUS_UNKNOWN:
+                    keep = False
+                elif status != pgext.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                keep = False
+        if not keep and not conn.closed:
+            conn.close()
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        """
+        Snapshot of pool usage: occupancy, saturation and borrow wait times.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.maxconn,
+                "saturation": self._in_use / self.maxconn,
+                "wait_seconds_avg": (
+                    stats["wait_seconds_total"] / stats["borrows"] if stats["borrows"] else 0.0
+                ),
+            })
+        return stats
+
+    def closeall(self):
+        """
+        Close every idle connection and refuse further borrows.
+        Borrowed connections are closed as they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                if not conn.closed:
+                    conn.close()
+                self._size -= 1
+            self._cond.notify_all()
+
+
+_pool: Optional[DatabasePool] = None
+_pool_lock = threading.Lock()
+
+
+def init_pool() -> DatabasePool:
+    """
+    Create the process-wide pool from the environment if it does not exist yet.
+    """
+    global _pool #pylint: disable=W0603
+    with _pool_lock:
+        if _pool is None:
+            _pool = DatabasePool.from_env()
+        return _pool
+
+
+def get_pool() -> DatabasePool:
+    """
+    Return the process-wide pool, creating it lazily outside of the API lifespan.
+    """
+    return _pool if _pool is not None else init_pool()
+
+
+def close_pool():
+    """
+    Close the process-wide pool.
+    """
+    global _pool #pylint: disable=W0603
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
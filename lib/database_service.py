@@ -1,78 +1,382 @@
 import os
+import logging
 import psycopg2
+from psycopg2.extras import Json, execute_values
+from .cache import TTLCache
+from .database_pool import DatabasePool, get_pool
+from .metrics import DB_QUERY_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+BULK_PAGE_SIZE = 1000
+
+# Tables created by migrate.py, in dependency order
+SCHEMA_TABLES = [
+    # Lets reindex.py replay re-extractions made while it runs
+    "ALTER TABLE resumescreener.resumes ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();",
+    """
+        CREATE TABLE IF NOT EXISTS resumescreener.resume_fingerprints (
+            fingerprint TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            resume_id INTEGER NOT NULL REFERENCES resumescreener.resumes (id) ON DELETE CASCADE,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS resumescreener.ingest_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'queued',
+            filename TEXT,
+            force BOOLEAN NOT NULL DEFAULT FALSE,
+            pdf BYTEA,
+            stages JSONB NOT NULL DEFAULT '{}'::jsonb,
+            resume_id INTEGER,
+            result JSONB,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            leased_until TIMESTAMPTZ,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            started_at TIMESTAMPTZ,
+            finished_at TIMESTAMPTZ
+        );
+    """,
+    # Tombstones of deleted resumes, replayed by reindex.py
+    """
+        CREATE TABLE IF NOT EXISTS resumescreener.resume_deletions (
+            resume_id INTEGER PRIMARY KEY,
+            deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """,
+]
+
+# Indexes created by migrate.py with CREATE INDEX CONCURRENTLY, by name
+SCHEMA_INDEXES = {
+    "skills_resume_id_idx": "ON resumescreener.skills (resume_id)",
+    "experience_resume_id_idx": "ON resumescreener.experience (resume_id)",
+    "education_resume_id_idx": "ON resumescreener.education (resume_id)",
+    "resume_fingerprints_resume_id_idx": "ON resumescreener.resume_fingerprints (resume_id)",
+    "ingest_jobs_pending_idx": "ON resumescreener.ingest_jobs (id) WHERE status IN ('queued', 'running')",
+    "resumes_updated_at_idx": "ON resumescreener.resumes (updated_at)",
+    "resume_deletions_deleted_at_idx": "ON resumescreener.resume_deletions (deleted_at)",
+    # Full-text indexes for lexical search; the expressions must match LEXICAL_SECTIONS exactly
+    "resumes_summary_fts_idx": "ON resumescreener.resumes USING GIN (to_tsvector('english', COALESCE(summary, '')))",
+    "skills_skill_fts_idx": "ON resumescreener.skills USING GIN (to_tsvector('simple', COALESCE(skill, '')))",
+    "experience_fts_idx": """
+        ON resumescreener.experience USING GIN (
+            to_tsvector('english', COALESCE(role, '') || ' ' || COALESCE(company, '') || ' ' || COALESCE(description, ''))
+        )
+    """,
+    "education_fts_idx": """
+        ON resumescreener.education USING GIN (
+            to_tsvector('english', COALESCE(degree, '') || ' ' || COALESCE(institution, ''))
+        )
+    """,
+}
+
+# One SELECT per searchable section, yielding (resume_id, section, text, rank)
+# rows that match the query. Skills are matched without stemming so exact
+# tool and certification names are found as written.
+LEXICAL_SECTIONS = {
+    "summary": """
+        SELECT r.id, 'summary', r.summary,
+               ts_rank(to_tsvector('english', COALESCE(r.summary, '')), q.english)
+        FROM resumescreener.resumes r, q
+        WHERE to_tsvector('english', COALESCE(r.summary, '')) @@ q.english
+    """,
+    "skill": """
+        SELECT s.resume_id, 'skill', s.skill,
+               ts_rank(to_tsvector('simple', COALESCE(s.skill, '')), q.simple)
+        FROM resumescreener.skills s, q
+        WHERE to_tsvector('simple', COALESCE(s.skill, '')) @@ q.simple
+    """,
+    "experience": """
+        SELECT e.resume_id, 'experience', CONCAT_WS(' ', e.role, 'at', e.company, e.description),
+               ts_rank(to_tsvector('english', COALESCE(e.role, '') || ' ' || COALESCE(e.company, '') || ' ' || COALESCE(e.description, '')), q.english)
+        FROM resumescreener.experience e, q
+        WHERE to_tsvector('english', COALESCE(e.role, '') || ' ' || COALESCE(e.company, '') || ' ' || COALESCE(e.description, '')) @@ q.english
+    """,
+    "education": """
+        SELECT ed.resume_id, 'education', CONCAT_WS(' ', ed.degree, 'at', ed.institution),
+               ts_rank(to_tsvector('english', COALESCE(ed.degree, '') || ' ' || COALESCE(ed.institution, '')), q.english)
+        FROM resumescreener.education ed, q
+        WHERE to_tsvector('english', COALESCE(ed.degree, '') || ' ' || COALESCE(ed.institution, '')) @@ q.english
+    """,
+}
+
+# One resume with its skills, experience and education as a JSON document
+RESUME_DOCUMENT_JSON = """
+    json_build_object(
+        'resume', json_build_object(
+            'id', r.id, 'name', r.name, 'email', r.email,
+            'phone', r.phone, 'summary', r.summary
+        ),
+        'skills', COALESCE((
+            SELECT json_agg(s.skill)
+            FROM resumescreener.skills s
+            WHERE s.resume_id = r.id
+        ), '[]'::json),
+        'experience', COALESCE((
+            SELECT json_agg(json_build_object(
+                'company', e.company, 'role', e.role, 'start_date', e.start_date,
+                'end_date', e.end_date, 'description', e.description
+            ))
+            FROM resumescreener.experience e
+            WHERE e.resume_id = r.id
+        ), '[]'::json),
+        'education', COALESCE((
+            SELECT json_agg(json_build_object(
+                'institution', ed.institution, 'degree', ed.degree,
+                'start_year', ed.start_year, 'end_year', ed.end_year
+            ))
+            FROM resumescreener.education ed
+            WHERE ed.resume_id = r.id
+        ), '[]'::json)
+    )
+"""
+
+# Per-process read-through cache for GET /api/resume/{resume_id}. Writes made
+# through this process invalidate it; the TTL bounds staleness across workers.
+resume_cache = TTLCache(
+    maxsize=int(os.environ.get("RESUME_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("RESUME_CACHE_TTL", 300)),
+)
 
 class DatabaseService:
-    def __init__(self, host: str, port: int, user: str, database: str):
-        self.host = host
-        self.port = port
-        self.user = user
-        self.password = os.environ.get("local_postgres_password", "")
-        self.database = database
+    def __init__(self, pool: DatabasePool = None):
+        self.pool = pool or get_pool()
+        self.conn = None
+
+    def __enter__(self):
+        self.start_connection()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close_connection()
 
     def start_connection(self):
+        self.conn = self.pool.getconn()
+
+    def close_connection(self):
+        if self.conn:
+            self.pool.putconn(self.conn)
+            self.conn = None
+
+    def migrate(self, log=print):
+        """
+        Create the tables and indexes the service relies on. Indexes are
+        built with CREATE INDEX CONCURRENTLY, so writes to large tables go
+        on while they build; an invalid index left by an interrupted build
+        is dropped and rebuilt. Meant for migrate.py, not request handling.
+        """
+        cursor = self.conn.cursor()
+        try:
+            for statement in SCHEMA_TABLES:
+                cursor.execute(statement)
+            self.conn.commit()
+            # CONCURRENTLY cannot run inside a transaction block
+            self.conn.autocommit = True
+            for name, definition in SCHEMA_INDEXES.items():
+                cursor.execute("""
+                    SELECT i.indisvalid
+                    FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = 'resumescreener' AND c.relname = %s;
+                """, (name,))
+                row = cursor.fetchone()
+                if row and row[0]:
+                    continue
+                if row:
+                    log(f"Dropping invalid index {name}.")
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS resumescreener.{name};")
+                log(f"Creating index {name}.")
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition};")
+        finally:
+            self.conn.rollback()
+            self.conn.autocommit = False
+            cursor.close()
+
+    @timed(DB_QUERY_SECONDS, operation="missing_schema")
+    def missing_schema(self):
+        """
+        Names of the tables and indexes from migrate.py that do not exist yet.
+        """
+        names = [statement.split("resumescreener.")[1].split()[0] for statement in SCHEMA_TABLES]
+        names += list(SCHEMA_INDEXES)
         try:
-            conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT name FROM unnest(%s::text[]) AS name "
+                "WHERE to_regclass('resumescreener.' || name) IS NULL;", (names,)
             )
-            self.conn = conn
+            missing = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            self.conn.rollback()
+            return missing
         except psycopg2.Error as e:
-            print(f"Error connecting to database: {e}")
+            logger.error("Error checking database schema: %s", e)
+            self.conn.rollback()
             return None
-        
-    def close_connection(self):
-        if self.conn:
-            self.conn.close()
-        
-    def insert_resume(self, resume_data: dict):
+
+    @timed(DB_QUERY_SECONDS, operation="ingest_resume")
+    def ingest_resume(self, resume_data: dict, fingerprints: dict = None, resume_id: int = None):
+        """
+        Write one parsed resume in a single transaction. When `resume_id` is
+        given the existing resume is replaced in place, otherwise a new one is
+        created. `fingerprints` maps fingerprint -> kind and is stored with it.
+        """
+        if resume_id is not None:
+            return self.replace_resume(resume_id, resume_data, fingerprints)
+        resume_ids = self.ingest_resumes([resume_data], [fingerprints] if fingerprints else None)
+        return resume_ids[0] if resume_ids else None
+
+    @timed(DB_QUERY_SECONDS, operation="ingest_resumes")
+    def ingest_resumes(self, resume_list: list, fingerprint_list: list = None):
+        """
+        Write parsed resumes and all their child rows in a single transaction.
+        Each table is written with one multi-row INSERT, so the round trips do
+        not grow with the number of skills, jobs or degrees.
+        Returns the new resume ids in input order, or [] if nothing was written.
+        """
+        if not resume_list:
+            return []
         try:
             cursor = self.conn.cursor()
-            insert_query = """
-                INSERT INTO resumescreener.resumes (name, email, phone, summary)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id;
-            """
-            cursor.execute(insert_query, (
+            resume_ids = self._insert_resume_rows(cursor, resume_list)
+            self._insert_child_rows(cursor, list(zip(resume_ids, resume_list)))
+            if fingerprint_list:
+                self._upsert_fingerprint_rows(cursor, list(zip(resume_ids, fingerprint_list)))
+            self.conn.commit()
+            cursor.close()
+            for resume_id in resume_ids:
+                resume_cache.invalidate(resume_id)
+            return resume_ids
+        except psycopg2.Error as e:
+            logger.error("Error ingesting resumes: %s", e)
+            self.conn.rollback()
+            return []
+
+    @timed(DB_QUERY_SECONDS, operation="replace_resume")
+    def replace_resume(self, resume_id: int, resume_data: dict, fingerprints: dict = None):
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE resumescreener.resumes
+                SET name = %s, email = %s, phone = %s, summary = %s, updated_at = now()
+                WHERE id = %s;
+            """, (
                 resume_data.get("name"),
                 resume_data.get("email"),
                 resume_data.get("phone"),
                 resume_data.get("summary"),
+                resume_id,
             ))
-            resume_id = cursor.fetchone()[0]
+            if cursor.rowcount == 0:
+                self.conn.rollback()
+                cursor.close()
+                return None
+            for table in ("skills", "experience", "education"):
+                cursor.execute(f"DELETE FROM resumescreener.{table} WHERE resume_id = %s;", (resume_id,))
+            self._insert_child_rows(cursor, [(resume_id, resume_data)])
+            if fingerprints:
+                self._upsert_fingerprint_rows(cursor, [(resume_id, fingerprints)])
             self.conn.commit()
             cursor.close()
+            resume_cache.invalidate(resume_id)
             return resume_id
         except psycopg2.Error as e:
-            print(f"Error inserting resume data: {e}")
+            logger.error("Error replacing resume: %s", e)
             self.conn.rollback()
+            return None
 
-    def insert_skills(self, resume_id: int, skills: list):
+    @timed(DB_QUERY_SECONDS, operation="delete_resume")
+    def delete_resume(self, resume_id: int, before_commit=None):
+        """
+        Delete the resume with its skills, experience, education and
+        fingerprints in one transaction. `before_commit` is called after the
+        rows are deleted and before the commit; if it raises, nothing is
+        deleted. Returns True if the resume existed, False if it did not and
+        None on a database error.
+        """
         try:
             cursor = self.conn.cursor()
-            insert_query = """
-                INSERT INTO resumescreener.skills (resume_id, skill)
-                VALUES (%s, %s);
-            """
-            for skill in skills:
-                cursor.execute(insert_query, (resume_id, skill))
+            # Lock the resume row, so a concurrent replace waits for the delete
+            cursor.execute("SELECT id FROM resumescreener.resumes WHERE id = %s FOR UPDATE;", (resume_id,))
+            if cursor.fetchone() is None:
+                self.conn.rollback()
+                cursor.close()
+                return False
+            for table in ("skills", "experience", "education", "resume_fingerprints"):
+                cursor.execute(f"DELETE FROM resumescreener.{table} WHERE resume_id = %s;", (resume_id,))
+            cursor.execute("DELETE FROM resumescreener.resumes WHERE id = %s;", (resume_id,))
+            cursor.execute("""
+                INSERT INTO resumescreener.resume_deletions (resume_id) VALUES (%s)
+                ON CONFLICT (resume_id) DO UPDATE SET deleted_at = now();
+            """, (resume_id,))
+            if before_commit is not None:
+                before_commit()
             self.conn.commit()
             cursor.close()
+            resume_cache.invalidate(resume_id)
+            return True
         except psycopg2.Error as e:
-            print(f"Error inserting skills: {e}")
+            logger.error("Error deleting resume: %s", e)
+            self.conn.rollback()
+            return None
+        except Exception:
             self.conn.rollback()
+            raise
 
-    def insert_experience(self, resume_id: int, experience_list: list):
+    @timed(DB_QUERY_SECONDS, operation="find_resume_by_fingerprints")
+    def find_resume_by_fingerprints(self, fingerprints: list):
         try:
             cursor = self.conn.cursor()
-            insert_query = """
-                INSERT INTO resumescreener.experience (resume_id, company, role, start_date, end_date, description)
-                VALUES (%s, %s, %s, %s, %s, %s);
+            select_query = """
+                SELECT resume_id
+                FROM resumescreener.resume_fingerprints
+                WHERE fingerprint = ANY(%s)
+                LIMIT 1;
             """
-            for exp in experience_list:
-                cursor.execute(insert_query, (
+            cursor.execute(select_query, (list(fingerprints),))
+            result = cursor.fetchone()
+            cursor.close()
+            return result[0] if result else None
+        except psycopg2.Error as e:
+            logger.error("Error retrieving resume fingerprint: %s", e)
+            self.conn.rollback()
+            return None
+
+    @timed(DB_QUERY_SECONDS, operation="record_fingerprints")
+    def record_fingerprints(self, resume_id: int, fingerprints: dict):
+        try:
+            cursor = self.conn.cursor()
+            self._upsert_fingerprint_rows(cursor, [(resume_id, fingerprints)])
+            self.conn.commit()
+            cursor.close()
+        except psycopg2.Error as e:
+            logger.error("Error recording resume fingerprints: %s", e)
+            self.conn.rollback()
+
+    def _upsert_fingerprint_rows(self, cursor, pairs: list):
+        rows = [
+            (fingerprint, kind, resume_id)
+            for resume_id, fingerprints in pairs
+            for fingerprint, kind in (fingerprints or {}).items()
+        ]
+        if rows:
+            execute_values(cursor, """
+                INSERT INTO resumescreener.resume_fingerprints (fingerprint, kind, resume_id)
+                VALUES %s
+                ON CONFLICT (fingerprint) DO UPDATE SET resume_id = EXCLUDED.resume_id;
+            """, rows, page_size=BULK_PAGE_SIZE)
+
+    def _insert_child_rows(self, cursor, pairs: list):
+        skill_rows, experience_rows, education_rows = [], [], []
+        for resume_id, resume_data in pairs:
+            for skill in resume_data.get("skills") or []:
+                skill_rows.append((resume_id, skill))
+            for exp in resume_data.get("experience") or []:
+                experience_rows.append((
                     resume_id,
                     exp.get("company"),
                     exp.get("role"),
@@ -80,118 +384,420 @@ class DatabaseService:
                     exp.get("end_date"),
                     exp.get("description"),
                 ))
+            for edu in resume_data.get("education") or []:
+                education_rows.append((
+                    resume_id,
+                    edu.get("institution"),
+                    edu.get("degree"),
+                    edu.get("start_year"),
+                    edu.get("end_year"),
+                ))
+        if skill_rows:
+            execute_values(cursor, """
+                INSERT INTO resumescreener.skills (resume_id, skill)
+                VALUES %s;
+            """, skill_rows, page_size=BULK_PAGE_SIZE)
+        if experience_rows:
+            execute_values(cursor, """
+                INSERT INTO resumescreener.experience (resume_id, company, role, start_date, end_date, description)
+                VALUES %s;
+            """, experience_rows, page_size=BULK_PAGE_SIZE)
+        if education_rows:
+            execute_values(cursor, """
+                INSERT INTO resumescreener.education (resume_id, institution, degree, start_year, end_year)
+                VALUES %s;
+            """, education_rows, page_size=BULK_PAGE_SIZE)
+
+    def _insert_resume_rows(self, cursor, resume_list: list):
+        # Ids come from the sequence in the order rows are fed to the INSERT,
+        # so sorting the returned ids maps them back onto the input order.
+        rows = [(
+            position,
+            resume_data.get("name"),
+            resume_data.get("email"),
+            resume_data.get("phone"),
+            resume_data.get("summary"),
+        ) for position, resume_data in enumerate(resume_list)]
+        returned = execute_values(cursor, """
+            INSERT INTO resumescreener.resumes (name, email, phone, summary)
+            SELECT v.name, v.email, v.phone, v.summary
+            FROM (VALUES %s) AS v(position, name, email, phone, summary)
+            ORDER BY v.position
+            RETURNING id;
+        """, rows, template="(%s, %s::text, %s::text, %s::text, %s::text)",
+            page_size=len(rows), fetch=True)
+        return sorted(row[0] for row in returned)
+
+    @timed(DB_QUERY_SECONDS, operation="get_resume_document")
+    def get_resume_document(self, resume_id: int):
+        """
+        Return the resume with its skills, experience and education, served
+        from the cache when possible and otherwise built by a single query.
+        A connection is only borrowed on a cache miss.
+        """
+        document = resume_cache.get(resume_id)
+        if document is not None:
+            return document
+        borrowed = self.conn is None
+        if borrowed:
+            self.start_connection()
+        try:
+            cursor = self.conn.cursor()
+            select_query = f"""
+                SELECT {RESUME_DOCUMENT_JSON}
+                FROM resumescreener.resumes r
+                WHERE r.id = %s;
+            """
+            cursor.execute(select_query, (resume_id,))
+            result = cursor.fetchone()
+            cursor.close()
+            if not result:
+                return None
+            resume_cache.set(resume_id, result[0])
+            return result[0]
+        except psycopg2.Error as e:
+            logger.error("Error retrieving resume document: %s", e)
+            return None
+        finally:
+            if borrowed:
+                self.close_connection()
+
+    def iter_resume_documents(self, after_id: int = 0, itersize: int = BULK_PAGE_SIZE,
+                              updated_since=None, up_to_id: int = None):
+        """
+        Yield (resume_id, document) for every resume with an id above
+        `after_id` (and at most `up_to_id`, updated at or after
+        `updated_since` if given), in id order. Rows are fetched in pages of
+        `itersize` by id, each page in its own short transaction, so neither
+        memory nor transaction age grows with the table.
+        """
+        conditions = ["r.id > %(after_id)s"]
+        if updated_since is not None:
+            conditions.append("r.updated_at >= %(updated_since)s")
+        if up_to_id is not None:
+            conditions.append("r.id <= %(up_to_id)s")
+        while True:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(f"""
+                    SELECT r.id, {RESUME_DOCUMENT_JSON}
+                    FROM resumescreener.resumes r
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY r.id
+                    LIMIT %(limit)s;
+                """, {"after_id": after_id, "updated_since": updated_since, "up_to_id": up_to_id, "limit": itersize})
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                self.conn.rollback()
+            yield from rows
+            if len(rows) < itersize:
+                return
+            after_id = rows[-1][0]
+
+    def current_time(self):
+        """
+        The database clock, which stamps updated_at and deleted_at.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT now();")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+            self.conn.rollback()
+
+    def deleted_resume_ids(self, since):
+        """
+        Ids of the resumes deleted at or after `since`.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT resume_id FROM resumescreener.resume_deletions WHERE deleted_at >= %s ORDER BY resume_id;",
+                (since,)
+            )
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            self.conn.rollback()
+
+    def prune_deletions(self, before):
+        """
+        Forget the tombstones of resumes deleted before `before`.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("DELETE FROM resumescreener.resume_deletions WHERE deleted_at < %s;", (before,))
             self.conn.commit()
+        finally:
+            cursor.close()
+
+    @timed(DB_QUERY_SECONDS, operation="lexical_search")
+    def lexical_search(self, query: str, limit: int = 5, offset: int = 0, #pylint: disable=R0913
+                       filters: dict = None, group_size: int = 3):
+        """
+        Full-text search over summaries, skills, experience and education,
+        ranked per candidate by the summed ts_rank of the matching entries.
+        `query` uses web search syntax (quoted phrases, `or`, `-word`).
+        Filters follow the Qdrant payload semantics: `skill` and `company`
+        only match skill and experience entries carrying one of the values.
+        Returns candidates shaped like QdrantService.grouped_search.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        sections = filters.get("section") or list(LEXICAL_SECTIONS)
+        if "skill" in filters:
+            sections = [s for s in sections if s == "skill"]
+        if "company" in filters:
+            sections = [s for s in sections if s == "experience"]
+        subqueries = []
+        for section in sections:
+            if section not in LEXICAL_SECTIONS:
+                raise ValueError(f"Unsupported section: {section}")
+            subquery = LEXICAL_SECTIONS[section]
+            if section == "skill" and "skill" in filters:
+                subquery += " AND s.skill = ANY(%(skill)s)"
+            if section == "experience" and "company" in filters:
+                subquery += " AND e.company = ANY(%(company)s)"
+            subqueries.append(subquery)
+        if not subqueries:
+            return []
+        resume_filter = "WHERE resume_id = ANY(%(resume_id)s)" if "resume_id" in filters else ""
+        try:
+            cursor = self.conn.cursor()
+            select_query = f"""
+                WITH q AS (
+                    SELECT websearch_to_tsquery('english', %(query)s) AS english,
+                           websearch_to_tsquery('simple', %(query)s) AS simple
+                ),
+                hits (resume_id, section, text, rank) AS (
+                    {" UNION ALL ".join(subqueries)}
+                ),
+                ranked AS (
+                    SELECT *, row_number() OVER (PARTITION BY resume_id ORDER BY rank DESC) AS n
+                    FROM hits
+                    {resume_filter}
+                )
+                SELECT r.id, r.name, SUM(h.rank) AS score,
+                       json_agg(json_build_object('section', h.section, 'text', h.text, 'score', h.rank)
+                                ORDER BY h.rank DESC) FILTER (WHERE h.n <= %(group_size)s)
+                FROM ranked h
+                JOIN resumescreener.resumes r ON r.id = h.resume_id
+                GROUP BY r.id, r.name
+                ORDER BY score DESC, r.id
+                LIMIT %(limit)s OFFSET %(offset)s;
+            """
+            cursor.execute(select_query, {
+                **filters,
+                "query": query,
+                "group_size": group_size,
+                "limit": limit,
+                "offset": offset,
+            })
+            rows = cursor.fetchall()
             cursor.close()
+            return [{
+                "resume_id": row[0],
+                "candidate_name": row[1],
+                "score": row[2],
+                "hits": row[3]
+            } for row in rows]
         except psycopg2.Error as e:
-            print(f"Error inserting experience: {e}")
+            logger.error("Error running lexical search: %s", e)
             self.conn.rollback()
+            return []
 
-    def insert_education(self, resume_id: int, education_list: list):
+    @timed(DB_QUERY_SECONDS, operation="list_resume_ids")
+    def list_resume_ids(self):
+        """
+        Ids of every stored resume, ascending.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id FROM resumescreener.resumes ORDER BY id;")
+            rows = cursor.fetchall()
+            cursor.close()
+            return [row[0] for row in rows]
+        except psycopg2.Error as e:
+            logger.error("Error listing resumes: %s", e)
+            self.conn.rollback()
+            return None
+
+    @timed(DB_QUERY_SECONDS, operation="get_candidate_names")
+    def get_candidate_names(self, resume_ids: list):
+        """
+        {resume_id: candidate name} for those of `resume_ids` that still exist.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT id, name FROM resumescreener.resumes WHERE id = ANY(%s);", (list(resume_ids),)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return dict(rows)
+        except psycopg2.Error as e:
+            logger.error("Error retrieving candidate names: %s", e)
+            self.conn.rollback()
+            return {}
+
+    @timed(DB_QUERY_SECONDS, operation="count_resumes_changed_since")
+    def count_resumes_changed_since(self, since):
+        """
+        Number of resumes uploaded or re-extracted at or after `since`, or
+        None if it cannot be counted.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT count(*) FROM resumescreener.resumes WHERE updated_at >= %s;", (since,))
+            count = cursor.fetchone()[0]
+            cursor.close()
+            return count
+        except psycopg2.Error as e:
+            logger.error("Error counting changed resumes: %s", e)
+            self.conn.rollback()
+            return None
+
+    @timed(DB_QUERY_SECONDS, operation="enqueue_job")
+    def enqueue_job(self, filename: str, pdf_bytes: bytes, force: bool = False):
         try:
             cursor = self.conn.cursor()
             insert_query = """
-                INSERT INTO resumescreener.education (resume_id, institution, degree, start_year, end_year)
-                VALUES (%s, %s, %s, %s, %s);
+                INSERT INTO resumescreener.ingest_jobs (filename, force, pdf)
+                VALUES (%s, %s, %s)
+                RETURNING id;
             """
-            for edu in education_list:
-                cursor.execute(insert_query, (
-                    resume_id,
-                    edu.get("institution"),
-                    edu.get("degree"),
-                    edu.get("start_year"),
-                    edu.get("end_year"),
-                ))
+            cursor.execute(insert_query, (filename, force, psycopg2.Binary(pdf_bytes)))
+            job_id = cursor.fetchone()[0]
             self.conn.commit()
             cursor.close()
+            return job_id
         except psycopg2.Error as e:
-            print(f"Error inserting education: {e}")
+            logger.error("Error enqueuing ingestion job: %s", e)
             self.conn.rollback()
+            return None
 
-    def get_resume_by_id(self, resume_id: int):
+    @timed(DB_QUERY_SECONDS, operation="claim_job")
+    def claim_job(self, lease_seconds: float, max_attempts: int):
+        """
+        Atomically take the oldest queued job, or a running job whose worker
+        stopped renewing its lease, and lease it to the caller.
+        Jobs that already used up their attempts are marked failed instead.
+        """
         try:
             cursor = self.conn.cursor()
-            select_query = """
-                SELECT id, name, email, phone, summary
-                FROM resumescreener.resumes
-                WHERE id = %s;
-            """
-            cursor.execute(select_query, (resume_id,))
+            cursor.execute("""
+                UPDATE resumescreener.ingest_jobs
+                SET status = 'failed', finished_at = now(), pdf = NULL,
+                    error = COALESCE(error, 'Worker lost while processing the job.')
+                WHERE status = 'running' AND leased_until < now() AND attempts >= %s;
+            """, (max_attempts,))
+            cursor.execute("""
+                UPDATE resumescreener.ingest_jobs
+                SET status = 'running', attempts = attempts + 1, started_at = now(),
+                    leased_until = now() + make_interval(secs => %s)
+                WHERE id = (
+                    SELECT id FROM resumescreener.ingest_jobs
+                    WHERE status = 'queued' OR (status = 'running' AND leased_until < now())
+                    ORDER BY id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id, filename, force, pdf;
+            """, (lease_seconds,))
             result = cursor.fetchone()
+            self.conn.commit()
             cursor.close()
-            if result:
-                return {
-                    "id": result[0],
-                    "name": result[1],
-                    "email": result[2],
-                    "phone": result[3],
-                    "summary": result[4],
-                }
-            return None
+            if not result:
+                return None
+            return {
+                "id": result[0],
+                "filename": result[1],
+                "force": result[2],
+                "pdf": bytes(result[3]),
+            }
         except psycopg2.Error as e:
-            print(f"Error retrieving resume: {e}")
+            logger.error("Error claiming ingestion job: %s", e)
+            self.conn.rollback()
             return None
-        
-    def get_skills_by_resume_id(self, resume_id: int):
+
+    @timed(DB_QUERY_SECONDS, operation="update_job_stage")
+    def update_job_stage(self, job_id: int, stage: str, info: dict, lease_seconds: float):
         try:
             cursor = self.conn.cursor()
-            select_query = """
-                SELECT skill
-                FROM resumescreener.skills
-                WHERE resume_id = %s;
+            update_query = """
+                UPDATE resumescreener.ingest_jobs
+                SET stages = stages || jsonb_build_object(%s, COALESCE(stages -> %s, '{}'::jsonb) || %s),
+                    leased_until = now() + make_interval(secs => %s)
+                WHERE id = %s;
             """
-            cursor.execute(select_query, (resume_id,))
-            results = cursor.fetchall()
+            cursor.execute(update_query, (stage, stage, Json(info), lease_seconds, job_id))
+            self.conn.commit()
             cursor.close()
-            return [row[0] for row in results]
         except psycopg2.Error as e:
-            print(f"Error retrieving skills: {e}")
-            return []
-    
-    def get_experience_by_resume_id(self, resume_id: int):
+            logger.error("Error updating ingestion job: %s", e)
+            self.conn.rollback()
+
+    @timed(DB_QUERY_SECONDS, operation="finish_job")
+    def finish_job(self, job_id: int, result: dict = None, error: str = None, retry: bool = False):
         try:
             cursor = self.conn.cursor()
-            select_query = """
-                SELECT company, role, start_date, end_date, description
-                FROM resumescreener.experience
-                WHERE resume_id = %s;
-            """
-            cursor.execute(select_query, (resume_id,))
-            results = cursor.fetchall()
-            cursor.close()
-            experience_list = []
-            for row in results:
-                experience_list.append({
-                    "company": row[0],
-                    "role": row[1],
-                    "start_date": row[2],
-                    "end_date": row[3],
-                    "description": row[4],
-                })
-            return experience_list
-        except psycopg2.Error as e:
-            print(f"Error retrieving experience: {e}")
-            return []
-    
-    def get_education_by_resume_id(self, resume_id: int):
+            if retry:
+                update_query = """
+                    UPDATE resumescreener.ingest_jobs
+                    SET status = 'queued', error = %s, leased_until = NULL
+                    WHERE id = %s;
+                """
+                cursor.execute(update_query, (error, job_id))
+            else:
+                update_query = """
+                    UPDATE resumescreener.ingest_jobs
+                    SET status = %s, result = %s, resume_id = %s, error = %s,
+                        finished_at = now(), leased_until = NULL, pdf = NULL
+                    WHERE id = %s;
+                """
+                cursor.execute(update_query, (
+                    "failed" if error else "succeeded",
+                    Json(result) if result is not None else None,
+                    result.get("resume_id") if result else None,
+                    error,
+                    job_id,
+                ))
+            self.conn.commit()
+            cursor.close()
+        except psycopg2.Error as e:
+            logger.error("Error finishing ingestion job: %s", e)
+            self.conn.rollback()
+
+    @timed(DB_QUERY_SECONDS, operation="get_job")
+    def get_job(self, job_id: int):
         try:
             cursor = self.conn.cursor()
             select_query = """
-                SELECT institution, degree, start_year, end_year
-                FROM resumescreener.education
-                WHERE resume_id = %s;
+                SELECT id, status, filename, force, stages, resume_id, result, error,
+                       attempts, created_at, started_at, finished_at
+                FROM resumescreener.ingest_jobs
+                WHERE id = %s;
             """
-            cursor.execute(select_query, (resume_id,))
-            results = cursor.fetchall()
-            cursor.close()
-            education_list = []
-            for row in results:
-                education_list.append({
-                    "institution": row[0],
-                    "degree": row[1],
-                    "start_year": row[2],
-                    "end_year": row[3],
-                })
-            return education_list
-        except psycopg2.Error as e:
-            print(f"Error retrieving education: {e}")
-            return []
\ No newline at end of file
+            cursor.execute(select_query, (job_id,))
+            result = cursor.fetchone()
+            cursor.close()
+            if not result:
+                return None
+            return {
+                "job_id": result[0],
+                "status": result[1],
+                "filename": result[2],
+                "force": result[3],
+                "stages": result[4],
+                "resume_id": result[5],
+                "result": result[6],
+                "error": result[7],
+                "attempts": result[8],
+                "created_at": result[9].isoformat() if result[9] else None,
+                "started_at": result[10].isoformat() if result[10] else None,
+                "finished_at": result[11].isoformat() if result[11] else None,
+            }
+        except psycopg2.Error as e:
+            logger.error("Error retrieving ingestion job: %s", e)
+            return None
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Embedding Cache Module
+Two-tier cache of embedding vectors: an in-memory LRU in front of a SQLite
+file, keyed by embedding model, output dimension and normalized text.
+"""
+import os
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from .cache import TTLCache
+
+
+class EmbeddingCache:
+    """
+    Process-wide embedding cache. Only texts missing from both tiers need to
+    be sent to the embedding API.
+    """
+    def __init__(self, path: Optional[str], memory_size: int = 10000):
+        """
+        Initialize the cache. A falsy `path` disables the on-disk tier.
+        """
+        self.memory = TTLCache(maxsize=memory_size, ttl=float("inf"))
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL;")
+            self._db.execute("PRAGMA synchronous=NORMAL;")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL);"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(model: str, dimension: Optional[int], text: str) -> str:
+        """
+        Cache key for a text embedded by `model` at `dimension`.
+        """
+        raw = f"{model}\x1f{dimension or 'default'}\x1f{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look keys up in memory, then on disk. Returns only the keys found.
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                missing.append(key)
+        memory_hits = len(found)
+        disk_hits = 0
+        if missing and self._db is not None:
+            with self._lock:
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))});",
+                        batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = array("f", blob).tolist()
+                        found[key] = vector
+                        self.memory.set(key, vector)
+                        disk_hits += 1
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += disk_hits
+            self.misses += len(set(keys) - found.keys())
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """
+        Store freshly computed vectors in both tiers.
+        """
+        for key, vector in items.items():
+            self.memory.set(key, vector)
+        if self._db is not None and items:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?);",
+                    [(key, array("f", vector).tobytes()) for key, vector in items.items()]
+                )
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters for both tiers.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_size": self.memory.stats()["size"],
+            }
+
+    def close(self):
+        """
+        Close the on-disk tier.
+        """
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Return the process-wide embedding cache, configured from the environment.
+    """
+    global _cache #pylint: disable=W0603
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(
+                path=os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite3"),
+                memory_size=int(os.getenv("EMBED_CACHE_SIZE", "10000")),
+            )
+        return _cache
+
+
+def close_embedding_cache():
+    """
+    Close the process-wide embedding cache; the next use opens it again.
+    """
+    global _cache #pylint: disable=W0603
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
@@ -0,0 +1,37 @@
+"""
+Fingerprint Module
+Content hashes used to recognise resumes that were already ingested.
+"""
+import re
+import hashlib
+from typing import Dict
+
+CONTENT = "content"
+TEXT = "text"
+
+
+def content_fingerprint(pdf_bytes: bytes) -> str:
+    """
+    Hash of the uploaded file exactly as received.
+    """
+    return f"{CONTENT}:sha256:{hashlib.sha256(pdf_bytes).hexdigest()}"
+
+
+def text_fingerprint(text: str) -> str:
+    """
+    Hash of the extracted text after case and whitespace normalization, so the
+    same resume exported twice (different metadata, same words) still matches.
+    """
+    normalized = re.sub(r"\s+", " ", text or "").strip().lower()
+    return f"{TEXT}:sha256:{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+
+
+def upload_fingerprints(content_hash: str, text: str) -> Dict[str, str]:
+    """
+    {fingerprint: kind} of an upload. Text-less PDFs (scans, image-only
+    pages) get no text fingerprint: they would all share the hash of "".
+    """
+    fingerprints = {content_hash: CONTENT}
+    if re.sub(r"\s+", "", text or ""):
+        fingerprints[text_fingerprint(text)] = TEXT
+    return fingerprints
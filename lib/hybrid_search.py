@@ -0,0 +1,93 @@
+"""
+Hybrid Search Module
+Candidate-level retrieval combining Postgres full-text search with Qdrant
+dense search through reciprocal-rank fusion (RRF). The lexical path needs
+no embedding call, so it also serves as a fast keyword-only mode.
+"""
+import os
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from .concurrency import run_io
+from .database_service import DatabaseService
+from .qdrant_service import QdrantService
+
+MODES = ("dense", "hybrid", "lexical")
+
+# Rank damping constant from the original RRF paper; larger values flatten
+# the advantage of the very top ranks
+RRF_K = int(os.environ.get("HYBRID_RRF_K", 60))
+# Candidates taken from each retriever before fusion
+HYBRID_DEPTH = int(os.environ.get("HYBRID_DEPTH", 50))
+
+
+def lexical_search(query: str, limit: int = 5, offset: int = 0,
+                   filters: Optional[Dict[str, Any]] = None, group_size: int = 3):
+    """
+    Blocking full-text candidate search against Postgres.
+    """
+    with DatabaseService() as database:
+        return database.lexical_search(query, limit, offset, filters, group_size)
+
+
+def dense_search(query: str, **kwargs):
+    """
+    Blocking candidate-grouped dense search against Qdrant.
+    """
+    return QdrantService().grouped_search(query, **kwargs)
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Dict]], k: int = RRF_K,
+                           group_size: int = 3) -> List[Dict]:
+    """
+    Fuse candidate lists ranked by different retrievers. A candidate scores
+    sum(1 / (k + rank)) over the lists it appears in, so raw scores on
+    different scales never need to be compared. Each fused candidate keeps
+    its rank per retriever and up to `group_size` supporting hits.
+    """
+    fused: Dict[Any, Dict] = {}
+    for source, candidates in rankings.items():
+        for rank, candidate in enumerate(candidates, start=1):
+            entry = fused.setdefault(candidate["resume_id"], {
+                "resume_id": candidate["resume_id"],
+                "candidate_name": candidate.get("candidate_name"),
+                "score": 0.0,
+                "ranks": {name: None for name in rankings},
+                "hits": []
+            })
+            entry["score"] += 1.0 / (k + rank)
+            entry["ranks"][source] = rank
+            entry["candidate_name"] = entry["candidate_name"] or candidate.get("candidate_name")
+            entry["hits"].extend({**hit, "source": source} for hit in candidate["hits"])
+    results = sorted(fused.values(), key=lambda c: (-c["score"], c["resume_id"]))
+    for entry in results:
+        # Interleave so both retrievers contribute evidence, dropping repeated texts
+        by_source = [[h for h in entry["hits"] if h["source"] == name] for name in rankings]
+        hits, seen = [], set()
+        for i in range(max(len(s) for s in by_source)):
+            for source_hits in by_source:
+                if i < len(source_hits) and source_hits[i]["text"] not in seen:
+                    seen.add(source_hits[i]["text"])
+                    hits.append(source_hits[i])
+        entry["hits"] = hits[:group_size]
+    return results
+
+
+async def hybrid_search(query: str, limit: int = 5, offset: int = 0, #pylint: disable=R0913
+                        score_threshold: Optional[float] = None,
+                        filters: Optional[Dict[str, Any]] = None,
+                        group_size: int = 3, **grouped_kwargs) -> List[Dict]:
+    """
+    Run dense candidate search and lexical search concurrently and fuse them
+    with RRF. `score_threshold` and `grouped_kwargs` (aggregate, top_n,
+    section_weights) only apply to the dense side.
+    """
+    depth = max(offset + limit, HYBRID_DEPTH)
+    dense, lexical = await asyncio.gather(
+        run_io(dense_search, query, limit=depth, offset=0,
+               score_threshold=score_threshold, filters=filters,
+               group_size=group_size, **grouped_kwargs),
+        run_io(lexical_search, query, depth, 0, filters, group_size),
+    )
+    fused = reciprocal_rank_fusion({"dense": dense, "lexical": lexical}, group_size=group_size)
+    return fused[offset:offset + limit]
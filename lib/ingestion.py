@@ -0,0 +1,346 @@
+"""
+Ingestion Pipeline Module
+Runs an uploaded PDF through text extraction, LLM parsing, the Postgres
+writes and Qdrant indexing. Shared by the synchronous upload endpoint and
+the background job workers.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError, create_model
+
+from prompts import ResumeExtraction, ResumeExtractionPrompt, ResumeRepairPrompt
+
+from .concurrency import run_io
+from .database_service import DatabaseService
+from .fingerprint import CONTENT, content_fingerprint, upload_fingerprints
+from .metrics import LLM_OUTPUT_RETRIES, PDF_PARSE_SECONDS, PROMPT_BUILD_SECONDS, PROMPT_TOKENS
+from .pdf_extractor import InvalidPDFError, PDFBudgetError, extract_text
+from .providers import LLMProvider, get_llm_provider
+from .rate_limit import backoff_delay
+from .qdrant_service import QdrantService
+from .tracing import log_payload
+
+LLM_OUTPUT_ATTEMPTS = int(os.getenv("LLM_OUTPUT_ATTEMPTS", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+
+STAGES = ["deduplicate", "extract_text", "llm_extraction", "database", "vector_index"]
+
+StageHook = Callable[[str, Dict], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionError(Exception):
+    """
+    Raised when an upload cannot be ingested. `status_code` is the HTTP
+    status the API should answer with.
+    """
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def json_object(text: str) -> str:
+    """
+    The outermost {...} of a model response, dropping any code fences or
+    prose around it.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    return text[start:end + 1] if start != -1 and end > start else text
+
+
+def invalid_fields(response_message: str, error: ValidationError) -> Optional[Tuple[dict, List[str]]]:
+    """
+    The parsed response and the top-level fields that failed validation, or
+    None when the response is not a JSON object and has to be redone.
+    """
+    try:
+        data = json.loads(json_object(response_message))
+    except ValueError:
+        return None
+    fields = sorted({e["loc"][0] for e in error.errors() if e["loc"]})
+    if not isinstance(data, dict) or not fields:
+        return None
+    return data, fields
+
+
+def find_existing_resume(fingerprints: dict, record: bool):
+    """
+    Look an upload up by fingerprint, optionally attaching the new
+    fingerprints to the resume that matched.
+    """
+    with DatabaseService() as database:
+        existing_id = database.find_resume_by_fingerprints(list(fingerprints))
+        if existing_id is not None and record:
+            database.record_fingerprints(existing_id, fingerprints)
+    return existing_id
+
+
+def document_data(document: dict) -> dict:
+    """
+    The extraction JSON of a stored resume document (see get_resume_document).
+    """
+    resume = document["resume"]
+    return {
+        "name": resume["name"],
+        "email": resume["email"],
+        "phone": resume["phone"],
+        "summary": resume["summary"],
+        "skills": document["skills"],
+        "experience": document["experience"],
+        "education": document["education"],
+    }
+
+
+def ensure_indexed(response_data: dict) -> int:
+    """
+    Index a stored resume that has no vectors, e.g. because Qdrant failed
+    after Postgres had committed it. Returns the number of points written.
+    """
+    qdrant_service = QdrantService()
+    if qdrant_service.has_resume_points(response_data["resume_id"]):
+        return 0
+    logger.warning("Resume %s has no vectors; indexing it again.", response_data["resume_id"])
+    qdrant_service.prepare_resume_chunks(response_data)
+    return qdrant_service.create_embeddings_and_store()
+
+
+def existing_resume_response(resume_id: int):
+    """
+    Build the upload response for a resume that was already ingested,
+    indexing it first if its vectors are missing so a retried upload
+    makes it searchable. The stored resume is returned even when Qdrant
+    is unavailable; the vectors are then written by a later upload or a
+    reindex.
+    """
+    document = DatabaseService().get_resume_document(resume_id)
+    if not document:
+        return None
+    response_data = {
+        "resume_id": resume_id,
+        "extracted_data": document_data(document),
+        "deduplicated": True
+    }
+    try:
+        ensure_indexed(response_data)
+    except Exception as e: #pylint: disable=W0718
+        logger.error("Could not check the vectors of resume %s: %s", resume_id, e)
+    return response_data
+
+
+def store_resume(parsed_json: dict, fingerprints: dict, existing_id):
+    """
+    Write the parsed resume to Postgres. Returns the resume id or None.
+    """
+    with DatabaseService() as database:
+        return database.ingest_resume(parsed_json, fingerprints=fingerprints, resume_id=existing_id)
+
+
+def index_resume(response_data: dict, replace: bool):
+    """
+    Chunk, embed and store the resume in Qdrant. Returns the number of
+    points written.
+    """
+    qdrant_service = QdrantService()
+
+    # Prepare resume chunks
+    qdrant_service.prepare_resume_chunks(response_data)
+
+    if replace:
+        # Forced re-extraction replaces the resume: write only the changed
+        # chunks and drop the ones that are gone
+        return qdrant_service.sync_resume_points(response_data["resume_id"])["upserted"]
+
+    # Create embeddings and store in Qdrant
+    return qdrant_service.create_embeddings_and_store()
+
+
+def delete_resume(resume_id: int) -> bool:
+    """
+    Remove a resume from Postgres and Qdrant as one operation. The vectors
+    are deleted inside the database transaction, which commits only once
+    Qdrant has applied the delete; if either store fails, the resume is
+    left in both. Returns False if there is no such resume.
+    """
+    qdrant_service = QdrantService()
+    with DatabaseService() as database:
+        try:
+            deleted = database.delete_resume(
+                resume_id, before_commit=lambda: qdrant_service.delete_resume_points(resume_id)
+            )
+        except Exception as e:
+            logger.error("Error deleting vectors of resume %s: %s", resume_id, e)
+            raise IngestionError("Vector store unavailable; the resume was not deleted.", status_code=503) from e
+    if deleted is None:
+        raise IngestionError("Failed to delete resume.")
+    return deleted
+
+
+class IngestionPipeline:
+    """
+    Ingestion pipeline for a single uploaded PDF.
+    """
+    def __init__(self, llm: Optional[LLMProvider] = None):
+        """
+        Initialize the pipeline with the LLM provider used for parsing
+        (default: the process-wide provider, created on first use).
+        """
+        self._llm = llm
+
+    @property
+    def llm(self) -> LLMProvider:
+        """
+        The LLM provider used for parsing.
+        """
+        if self._llm is None:
+            self._llm = get_llm_provider()
+        return self._llm
+
+    async def _stage(self, on_stage: Optional[StageHook], name: str, status: str,
+                     started: float = None, **extra):
+        if on_stage is None:
+            return
+        info = {"status": status, **extra}
+        if started is not None:
+            info["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        await on_stage(name, info)
+
+    async def parse_resume(self, extracted_text: str) -> dict:
+        """
+        Ask the model to turn extracted resume text into the structured JSON
+        described by ResumeExtractionPrompt, validated against
+        ResumeExtraction. Output that fails validation is fixed by asking
+        again for just the invalid fields, or by rerunning the extraction
+        when it is not a JSON object at all, up to LLM_OUTPUT_ATTEMPTS
+        attempts with jittered backoff in between.
+        """
+        usage = {}
+        with PROMPT_BUILD_SECONDS.time(prompt="resume_extraction"):
+            prompt_text = ResumeExtractionPrompt.prompt(raw_text=extracted_text, usage=usage)
+        for stage, tokens in usage.items():
+            PROMPT_TOKENS.inc(tokens, prompt="resume_extraction", stage=stage)
+        log_payload(logger, "resume extraction prompt", prompt_text)
+
+        response_message = await self._extract(prompt_text)
+        for attempt in range(1, LLM_OUTPUT_ATTEMPTS + 1):
+            try:
+                return ResumeExtraction.model_validate_json(json_object(response_message)).model_dump()
+            except ValidationError as e:
+                error = e
+            logger.warning("Invalid extraction output (attempt %d of %d): %s",
+                           attempt, LLM_OUTPUT_ATTEMPTS, error.errors(include_url=False, include_input=False))
+            if attempt == LLM_OUTPUT_ATTEMPTS:
+                break
+            await asyncio.sleep(backoff_delay(attempt, LLM_RETRY_BASE_DELAY))
+            parsed = invalid_fields(response_message, error)
+            if parsed is None:
+                LLM_OUTPUT_RETRIES.inc(operation="resume_extraction", kind="rerun")
+                response_message = await self._extract(prompt_text)
+            else:
+                LLM_OUTPUT_RETRIES.inc(operation="resume_extraction", kind="repair")
+                response_message = await self._repair(extracted_text, *parsed, error)
+        raise IngestionError("Language model returned an invalid resume extraction.", status_code=502)
+
+    async def _extract(self, prompt_text: str) -> str:
+        response_message = await self.llm.generate(
+            prompt_text, operation="resume_extraction", schema=ResumeExtraction
+        )
+        log_payload(logger, "resume extraction response", response_message)
+        return response_message
+
+    async def _repair(self, extracted_text: str, data: dict, fields: List[str],
+                      error: ValidationError) -> str:
+        """
+        Ask for only the invalid `fields` of `data`, returning `data` with
+        them replaced as JSON.
+        """
+        messages = [f"{'.'.join(map(str, e['loc']))}: {e['msg']}"
+                    for e in error.errors(include_url=False, include_input=False)]
+        prompt_text = ResumeRepairPrompt.prompt(
+            raw_text=extracted_text, invalid={field: data.get(field) for field in fields}, errors=messages
+        )
+        schema = create_model(
+            "ResumeExtractionRepair",
+            **{field: (ResumeExtraction.model_fields[field].annotation, ResumeExtraction.model_fields[field])
+               for field in fields}
+        )
+        response_message = await self.llm.generate(prompt_text, operation="resume_repair", schema=schema)
+        log_payload(logger, "resume repair response", response_message)
+        try:
+            repaired = json.loads(json_object(response_message))
+        except ValueError:
+            repaired = None
+        if isinstance(repaired, dict):
+            data.update({field: repaired[field] for field in fields if field in repaired})
+        return json.dumps(data)
+
+    async def run(self, pdf_bytes: bytes, force: bool = False,
+                  on_stage: Optional[StageHook] = None) -> dict:
+        """
+        Ingest one PDF. Uploads already seen (same file bytes or same
+        extracted text) return the stored resume without calling the model,
+        unless `force` is set, in which case the existing resume is
+        re-extracted and replaced in place.
+        `on_stage(name, info)` is awaited as each stage starts and finishes.
+        """
+        started = time.perf_counter()
+        await self._stage(on_stage, "deduplicate", "running")
+        content_hash = content_fingerprint(pdf_bytes)
+        if not force:
+            existing_id = await run_io(find_existing_resume, {content_hash: CONTENT}, False)
+            if existing_id is not None:
+                existing = await run_io(existing_resume_response, existing_id)
+                if existing:
+                    await self._stage(on_stage, "deduplicate", "hit", started)
+                    return existing
+
+        # Extract text using improved logic, off the event loop
+        started = time.perf_counter()
+        await self._stage(on_stage, "extract_text", "running")
+        try:
+            with PDF_PARSE_SECONDS.time():
+                extracted_text = await extract_text(pdf_bytes)
+        except PDFBudgetError as e:
+            raise IngestionError(str(e), status_code=413) from e
+        except InvalidPDFError as e:
+            raise IngestionError(str(e), status_code=400) from e
+        await self._stage(on_stage, "extract_text", "done", started, characters=len(extracted_text))
+
+        fingerprints = upload_fingerprints(content_hash, extracted_text)
+        existing_id = await run_io(find_existing_resume, fingerprints, not force)
+        if existing_id is not None and not force:
+            existing = await run_io(existing_resume_response, existing_id)
+            if existing:
+                await self._stage(on_stage, "deduplicate", "hit")
+                return existing
+        await self._stage(on_stage, "deduplicate", "miss")
+
+        started = time.perf_counter()
+        await self._stage(on_stage, "llm_extraction", "running")
+        parsed_json = await self.parse_resume(extracted_text)
+        await self._stage(on_stage, "llm_extraction", "done", started)
+
+        started = time.perf_counter()
+        await self._stage(on_stage, "database", "running")
+        resume_id = await run_io(store_resume, parsed_json, fingerprints, existing_id)
+        if resume_id is None:
+            raise IngestionError("Failed to store extracted resume.")
+        await self._stage(on_stage, "database", "done", started, resume_id=resume_id)
+
+        response_data = {
+            "resume_id": resume_id,
+            "extracted_data": parsed_json,
+            "deduplicated": False
+        }
+
+        started = time.perf_counter()
+        await self._stage(on_stage, "vector_index", "running")
+        points = await run_io(index_resume, response_data, existing_id is not None)
+        await self._stage(on_stage, "vector_index", "done", started, points=points)
+
+        return response_data
@@ -0,0 +1,130 @@
+"""
+Job Worker Module
+Background workers that drain the Postgres-backed ingestion job queue.
+They run inside the API process (INGEST_WORKERS) or standalone via worker.py,
+so ingestion capacity can be scaled separately from the API.
+"""
+import os
+import asyncio
+import logging
+from typing import List
+
+from .concurrency import run_io
+from .database_service import DatabaseService
+from .ingestion import IngestionError, IngestionPipeline
+from .tracing import request_context
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Claims queued ingestion jobs one at a time and runs them through the pipeline.
+    """
+    def __init__(self, pipeline: IngestionPipeline, name: str = "worker"):
+        """
+        Initialize the worker with queue settings from environment variables.
+        """
+        self.pipeline = pipeline
+        self.name = name
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+    def _claim(self):
+        with DatabaseService() as database:
+            return database.claim_job(self.lease_seconds, self.max_attempts)
+
+    def _update_stage(self, job_id: int, stage: str, info: dict):
+        with DatabaseService() as database:
+            database.update_job_stage(job_id, stage, info, self.lease_seconds)
+
+    def _finish(self, job_id: int, **kwargs):
+        with DatabaseService() as database:
+            database.finish_job(job_id, **kwargs)
+
+    def _attempts(self, job_id: int) -> int:
+        with DatabaseService() as database:
+            job = database.get_job(job_id)
+        return job["attempts"] if job else self.max_attempts
+
+    async def run_once(self) -> bool:
+        """
+        Process a single job if one is available. Returns False when the queue was empty.
+        """
+        job = await run_io(self._claim)
+        if job is None:
+            return False
+        # Logs and stage traces of the job carry its id as the request id
+        with request_context(f"job-{job['id']}"):
+            await self._process(job)
+        return True
+
+    async def _process(self, job: dict):
+        job_id = job["id"]
+        logger.info("[%s] Processing ingestion job %s (%s).", self.name, job_id, job["filename"])
+
+        current = {}
+
+        async def on_stage(stage: str, info: dict):
+            if info["status"] == "running":
+                current["stage"] = stage
+            await run_io(self._update_stage, job_id, stage, info)
+
+        async def fail_stage():
+            if "stage" in current:
+                await run_io(self._update_stage, job_id, current["stage"], {"status": "failed"})
+
+        try:
+            result = await self.pipeline.run(job["pdf"], force=job["force"], on_stage=on_stage)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so another worker can take it now
+            await run_io(self._finish, job_id, error="Worker shut down during processing.", retry=True)
+            raise
+        except IngestionError as e:
+            await fail_stage()
+            # Client errors such as an invalid PDF will not succeed on retry
+            retry = e.status_code >= 500 and await run_io(self._attempts, job_id) < self.max_attempts
+            await run_io(self._finish, job_id, error=str(e), retry=retry)
+        except Exception as e: #pylint: disable=W0718
+            logger.exception("Ingestion job %s failed", job_id)
+            await fail_stage()
+            retry = await run_io(self._attempts, job_id) < self.max_attempts
+            await run_io(self._finish, job_id, error=f"{type(e).__name__}: {e}", retry=retry)
+        else:
+            await run_io(self._finish, job_id, result=result)
+
+    async def run_forever(self):
+        """
+        Keep draining the queue, sleeping for the poll interval whenever it is empty.
+        """
+        while True:
+            try:
+                if not await self.run_once():
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception: #pylint: disable=W0718
+                # Queue unavailable (e.g. database down); back off and retry
+                logger.exception("[%s] Job queue unavailable", self.name)
+                await asyncio.sleep(self.poll_interval)
+
+
+def start_workers(pipeline: IngestionPipeline, count: int) -> List[asyncio.Task]:
+    """
+    Start `count` workers as tasks on the running event loop.
+    """
+    return [
+        asyncio.create_task(JobWorker(pipeline, name=f"worker-{i}").run_forever())
+        for i in range(count)
+    ]
+
+
+async def stop_workers(tasks: List[asyncio.Task]):
+    """
+    Cancel worker tasks. Jobs they were running are put back on the queue;
+    jobs of a worker that died without this cleanup return once their lease expires.
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,54 @@
+"""
+Latency Module
+Rolling latency samples with percentile summaries, for comparing endpoints.
+"""
+import threading
+from collections import defaultdict, deque
+from typing import Dict
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent samples per named series, in milliseconds.
+    """
+    def __init__(self, window: int = 1000):
+        """
+        Initialize the tracker. Only the last `window` samples of a series are kept.
+        """
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, series: str, milliseconds: float):
+        """
+        Add one sample to a series.
+        """
+        with self._lock:
+            self._samples[series].append(milliseconds)
+            self._counts[series] += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Count plus p50/p95/p99/max over the recent window of every series.
+        """
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for name, samples in snapshot.items():
+            if not samples:
+                continue
+            def pct(p, values=samples):
+                return round(values[min(len(values) - 1, int(p * len(values)))], 2)
+            summary[name] = {
+                "count": counts[name],
+                "p50_ms": pct(0.50),
+                "p95_ms": pct(0.95),
+                "p99_ms": pct(0.99),
+                "max_ms": round(samples[-1], 2),
+            }
+        return summary
+
+
+search_latency = LatencyTracker()
\ No newline at end of file
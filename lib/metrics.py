@@ -0,0 +1,263 @@
+"""
+Metrics Module
+Process-wide counters and latency histograms for every pipeline stage,
+rendered in the Prometheus text exposition format on /api/metrics.
+"""
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .tracing import trace_stage
+
+# Seconds; spans fast cache hits and database calls up to slow LLM responses
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    A named metric with a fixed set of label names.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Initialize the metric.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        """
+        Current (name, labels, value) samples.
+        """
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Initialize the counter.
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        Add `amount` to the series selected by `labels`.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values.items()]
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        """
+        Record one observation in the series selected by `labels`.
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket counts..., sum, count]
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the block, in seconds. With stage tracing
+        enabled the duration is also logged against the current request id.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(elapsed, **labels)
+            trace_stage(self.name, elapsed, labels)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        samples = []
+        for key, values in series.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, values[-1]))
+            samples.append((f"{self.name}_sum", labels, values[-2]))
+            samples.append((f"{self.name}_count", labels, values[-1]))
+        return samples
+
+
+class Registry:
+    """
+    Collection of metrics plus callbacks reporting gauges read at scrape time.
+    """
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self._metrics: Dict[str, Metric] = {}
+        self._callbacks: List[Callable[[], Iterable[Tuple[str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric, returning the already registered one if the name is taken.
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def register_callback(self, callback: Callable[[], Iterable[Tuple[str, str, List[Sample]]]]):
+        """
+        Add a function returning (name, help, samples) gauges, called on every scrape.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            callbacks = list(self._callbacks)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for callback in callbacks:
+            try:
+                gauges = list(callback())
+            except Exception as e: #pylint: disable=W0718
+                lines.append(f"# collector {getattr(callback, '__name__', callback)} failed: {_escape(e)}")
+                continue
+            for name, documentation, samples in gauges:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                for sample_name, labels, value in samples:
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def timed(metric: Histogram, **labels):
+    """
+    Decorator observing the duration of every call in `metric`.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with metric.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    """
+    Create and register a counter.
+    """
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (),
+              buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    """
+    Create and register a histogram.
+    """
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+HTTP_REQUEST_SECONDS = histogram(
+    "resumescreener_http_request_seconds", "HTTP request latency.", ("method", "route", "status"))
+PDF_PARSE_SECONDS = histogram(
+    "resumescreener_pdf_parse_seconds", "PDF text extraction latency.")
+PROMPT_BUILD_SECONDS = histogram(
+    "resumescreener_prompt_build_seconds", "Prompt construction latency.", ("prompt",))
+PROMPT_TOKENS = counter(
+    "resumescreener_prompt_tokens_total", "Estimated prompt input tokens before and after compaction.",
+    ("prompt", "stage"))
+LLM_REQUEST_SECONDS = histogram(
+    "resumescreener_llm_request_seconds", "LLM call latency.", ("provider", "operation", "status"))
+LLM_OUTPUT_RETRIES = counter(
+    "resumescreener_llm_output_retries_total",
+    "Extra LLM calls after output failed validation: field repairs or full reruns.", ("operation", "kind"))
+LLM_TOKENS = counter(
+    "resumescreener_llm_tokens_total", "LLM tokens used.", ("provider", "operation", "kind"))
+DB_QUERY_SECONDS = histogram(
+    "resumescreener_db_query_seconds", "Postgres operation latency.", ("operation",))
+EMBED_BATCH_SECONDS = histogram(
+    "resumescreener_embed_batch_seconds", "Embedding request latency, per provider batch.", ("provider",))
+EMBED_TEXTS = counter(
+    "resumescreener_embed_texts_total", "Texts sent to the embedding provider.", ("provider",))
+QDRANT_UPSERT_SECONDS = histogram(
+    "resumescreener_qdrant_upsert_seconds", "Qdrant upsert latency, per batch.")
+QDRANT_POINTS_UPSERTED = counter(
+    "resumescreener_qdrant_points_upserted_total", "Points written to Qdrant.")
+QDRANT_QUERY_SECONDS = histogram(
+    "resumescreener_qdrant_query_seconds", "Qdrant query latency.", ("operation",))
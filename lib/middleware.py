@@ -0,0 +1,57 @@
+"""
+Middleware Module
+ASGI middleware that gives every HTTP request a request id and records its
+latency per route.
+"""
+import time
+
+from .metrics import HTTP_REQUEST_SECONDS
+from .tracing import new_request_id, request_id_var
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestContextMiddleware: #pylint: disable=R0903
+    """
+    Takes the request id from the X-Request-ID header (or generates one),
+    makes it the current request id for everything the request runs, echoes
+    it in the response and observes the request duration, labelled with the
+    route template so path parameters do not explode the label set.
+    Implemented as plain ASGI so streamed responses are timed to their end.
+    """
+    def __init__(self, app):
+        """
+        Wrap the ASGI `app`.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"").decode("latin-1")[:128]
+        token = request_id_var.set(request_id or new_request_id())
+        status = {"code": 500}
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != REQUEST_ID_HEADER]
+                headers.append((REQUEST_ID_HEADER, request_id_var.get().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            )
+            request_id_var.reset(token)
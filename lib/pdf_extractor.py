@@ -0,0 +1,179 @@
+"""
+PDF Extractor Module
+Text extraction from PDFs. Kept free of web-framework imports so it can run
+inside worker processes.
+Documents are checked against byte, page and time budgets. Long documents
+are spilled to a temporary file and their pages extracted in parallel
+across the PDF worker processes, each opening the file by path so the
+bytes are not copied to every worker.
+"""
+import os
+import math
+import time
+import asyncio
+import logging
+import tempfile
+from typing import List, Optional, Tuple, Union
+
+import fitz  # PyMuPDF
+
+from .concurrency import cpu_workers, run_cpu, run_io
+
+PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_BYTES", 10 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 50))
+PDF_TIMEOUT_SECONDS = float(os.environ.get("PDF_TIMEOUT_SECONDS", 30))
+# Pages after the first PDF_PARALLEL_MIN_PAGES are split across the worker processes
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 8))
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidPDFError(ValueError):
+    """
+    Raised when the uploaded bytes cannot be opened as a PDF.
+    """
+
+
+class PDFBudgetError(InvalidPDFError):
+    """
+    Raised when a PDF exceeds the byte, page or time budget.
+    """
+
+
+def worker_ready() -> int:
+    """
+    Run once in each PDF worker process at startup, so PyMuPDF is loaded
+    before the first upload. Returns the worker's pid.
+    """
+    return os.getpid()
+
+
+def _open(source: Union[bytes, str]) -> fitz.Document:
+    try:
+        if isinstance(source, str):
+            return fitz.open(source, filetype="pdf")
+        return fitz.open(stream=source, filetype="pdf")
+    except Exception as e:
+        raise InvalidPDFError(f"Invalid PDF file: {e}") from e
+
+
+def check_size(size: int):
+    """
+    Reject documents larger than PDF_MAX_BYTES.
+    """
+    if size > PDF_MAX_BYTES:
+        raise PDFBudgetError(f"PDF is {size} bytes, the limit is {PDF_MAX_BYTES} bytes.")
+
+
+def _check_pages(pages: int):
+    if pages > PDF_MAX_PAGES:
+        raise PDFBudgetError(f"PDF has {pages} pages, the limit is {PDF_MAX_PAGES} pages.")
+
+
+def _check_deadline(deadline: Optional[float]):
+    if deadline is not None and time.time() > deadline:
+        raise PDFBudgetError(f"PDF text extraction took longer than {PDF_TIMEOUT_SECONDS:g} seconds.")
+
+
+def page_text(page: fitz.Page) -> Optional[str]:
+    """
+    Text of one page with blocks in reading order: sorted by vertical then
+    horizontal position, so multi-column layouts read row by row.
+    Returns None for image-only pages (no fonts), which are not parsed.
+    """
+    if not page.get_fonts():
+        return None
+    # Each block: (x0, y0, x1, y1, text, block_no, block_type); image blocks are not returned
+    keyed = []
+    for block in page.get_text("blocks"):
+        text = block[4].strip()
+        if text:
+            keyed.append((round(block[1], 1), round(block[0], 1), block[5], text))
+    keyed.sort()
+    return "\n".join(entry[3] for entry in keyed)
+
+
+def _page_texts(doc: fitz.Document, start: int, stop: int,
+                deadline: Optional[float]) -> List[Optional[str]]:
+    texts = []
+    for number in range(start, min(stop, doc.page_count)):
+        _check_deadline(deadline)
+        texts.append(page_text(doc[number]))
+    return texts
+
+
+def extract_pages(path: str, start: int, stop: int, deadline: Optional[float] = None) -> List[Optional[str]]:
+    """
+    Text of pages [start, stop) of the PDF at `path`, None for image-only
+    pages. Stops with PDFBudgetError once `deadline` (a time.time() value)
+    has passed. PyMuPDF reads only the objects of the requested pages.
+    """
+    with _open(path) as doc:
+        return _page_texts(doc, start, stop, deadline)
+
+
+def extract_leading_pages(pdf_bytes: bytes, count: int,
+                          deadline: Optional[float] = None) -> Tuple[int, List[Optional[str]]]:
+    """
+    Page count of the PDF and the text of its first `count` pages.
+    """
+    check_size(len(pdf_bytes))
+    with _open(pdf_bytes) as doc:
+        _check_pages(doc.page_count)
+        return doc.page_count, _page_texts(doc, 0, count, deadline)
+
+
+def _join(texts: List[Optional[str]]) -> str:
+    # Join pages with spacing
+    return "\n\n".join(text for text in texts if text)
+
+
+def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+    """
+    Extract text from a PDF, including complex and multi-column layouts,
+    using block-based extraction and coordinate sorting. Pages are read in
+    this process, within the byte, page and time budgets.
+    """
+    deadline = time.time() + PDF_TIMEOUT_SECONDS
+    return _join(extract_leading_pages(pdf_bytes, PDF_MAX_PAGES, deadline)[1])
+
+
+def _page_ranges(start: int, pages: int, workers: int) -> List[Tuple[int, int]]:
+    step = max(1, math.ceil((pages - start) / workers))
+    return [(first, min(first + step, pages)) for first in range(start, pages, step)]
+
+
+async def _extract_text(pdf_bytes: bytes, workers: int, deadline: float) -> str:
+    pages, texts = await run_cpu(extract_leading_pages, pdf_bytes, PDF_PARALLEL_MIN_PAGES, deadline)
+    if pages > len(texts):
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as spooled:
+            await run_io(spooled.write, pdf_bytes)
+            await run_io(spooled.flush)
+            parts = await asyncio.gather(*(
+                run_cpu(extract_pages, spooled.name, first, stop, deadline)
+                for first, stop in _page_ranges(len(texts), pages, workers)
+            ))
+        texts.extend(text for part in parts for text in part)
+    image_only = sum(text is None for text in texts)
+    if image_only:
+        logger.info("Skipped %d image-only pages of %d.", image_only, pages)
+    return _join(texts)
+
+
+async def extract_text(pdf_bytes: bytes) -> str:
+    """
+    Extract text off the event loop. The first PDF_PARALLEL_MIN_PAGES pages
+    are parsed by one worker process; the pages of longer documents are
+    then read from a temporary file in parallel by the other workers.
+    """
+    check_size(len(pdf_bytes))
+    workers = cpu_workers()
+    if workers < 2:
+        return await run_cpu(extract_text_from_pdf, pdf_bytes)
+    try:
+        return await asyncio.wait_for(
+            _extract_text(pdf_bytes, workers, time.time() + PDF_TIMEOUT_SECONDS),
+            timeout=PDF_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError as e:
+        raise PDFBudgetError(f"PDF text extraction took longer than {PDF_TIMEOUT_SECONDS:g} seconds.") from e
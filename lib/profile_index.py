@@ -0,0 +1,264 @@
+"""
+Profile Index Module
+Per-candidate profile vectors for job-description matching. Each resume is
+summarized by the centroid of its chunk embeddings in every section, stored
+in a memory-mapped NumPy matrix of shape (resumes, sections, dimension).
+Matching scores every candidate against a job description with one matrix
+multiply, without an LLM call.
+The matrix is a snapshot of the Qdrant collection, built by
+`build_profile_index` (python build_profiles.py) and published atomically;
+readers pick up a new snapshot on their next query. Uploads and deletes do
+not change it; matches report its age and the resumes changed since.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .database_service import DatabaseService
+from .qdrant_service import DEFAULT_SECTION_WEIGHTS, QdrantService
+
+PROFILE_INDEX_PATH = os.environ.get("PROFILE_INDEX_PATH", ".cache/profiles")
+# Sections with a centroid each, in matrix order
+PROFILE_SECTIONS = tuple(DEFAULT_SECTION_WEIGHTS)
+# Points read from Qdrant per scroll request while building
+BUILD_PAGE_SIZE = 1000
+# Extra candidates scored per match, replacing resumes deleted since the build
+MATCH_OVERFETCH = int(os.environ.get("PROFILE_MATCH_OVERFETCH", 20))
+META_FILE = "meta.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileIndexError(Exception):
+    """
+    Raised when there is no usable profile index (never built, or built for
+    another embedding model).
+    """
+
+
+def _read_meta(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _publish(path: str, meta: dict):
+    # Readers see either the old or the new metadata, never a partial file
+    previous = _read_meta(path) or {}
+    tmp = os.path.join(path, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, META_FILE))
+    # Keep the previous snapshot until the next build: readers may have read its metadata just before the switch
+    keep = {meta["vectors"], meta["ids"], previous.get("vectors"), previous.get("ids")}
+    for name in os.listdir(path):
+        if name.endswith(".npy") and name not in keep:
+            os.remove(os.path.join(path, name))
+
+
+def build_profile_index(service: QdrantService, resume_ids: List[int],
+                        path: str = PROFILE_INDEX_PATH) -> dict:
+    """
+    Build the profile matrix for `resume_ids` from the vectors stored in
+    `service`'s collection and publish it under `path`. Chunk vectors are
+    summed per resume and section straight into the memory-mapped file and
+    the sums normalized, so memory use does not grow with the collection.
+    Returns the published metadata.
+    """
+    os.makedirs(path, exist_ok=True)
+    rows = {resume_id: row for row, resume_id in enumerate(sorted(set(resume_ids)))}
+    columns = {section: column for column, section in enumerate(PROFILE_SECTIONS)}
+    # Read the collection behind the alias, so a reindex switching it cannot mix two indexes
+    collection = service.alias_target(service.collection_name) or service.collection_name
+    dimension = service.qclient.get_collection(collection).config.params.vectors.size
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    meta = {
+        "vectors": f"vectors-{version}.npy",
+        "ids": f"ids-{version}.npy",
+        "model": service.embedder.model,
+        "dimension": dimension,
+        "sections": list(PROFILE_SECTIONS),
+        "count": len(rows),
+        "collection": collection,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    matrix = np.lib.format.open_memmap(
+        os.path.join(path, meta["vectors"]), mode="w+", dtype=np.float32,
+        shape=(len(rows), len(PROFILE_SECTIONS), dimension)
+    )
+    points_read = 0
+    offset = None
+    while True:
+        points, offset = service.qclient.scroll(
+            collection_name=collection,
+            limit=BUILD_PAGE_SIZE,
+            offset=offset,
+            with_payload=["resume_id", "section"],
+            with_vectors=True
+        )
+        # Points of resumes missing from Postgres or of unknown sections are skipped
+        kept = [
+            (rows[p.payload.get("resume_id")], columns[p.payload.get("section")], p.vector)
+            for p in points
+            if p.payload.get("resume_id") in rows and p.payload.get("section") in columns
+        ]
+        if kept:
+            row_index, column_index, vectors = zip(*kept)
+            np.add.at(matrix, (np.array(row_index), np.array(column_index)), np.asarray(vectors, dtype=np.float32))
+        points_read += len(points)
+        if offset is None:
+            break
+    for start in range(0, len(rows), BUILD_PAGE_SIZE):
+        block = matrix[start:start + BUILD_PAGE_SIZE]
+        norms = np.linalg.norm(block, axis=2, keepdims=True)
+        block /= np.where(norms == 0, 1, norms)
+    matrix.flush()
+    del matrix
+    np.save(os.path.join(path, meta["ids"]), np.fromiter(rows, dtype=np.int64, count=len(rows)))
+    _publish(path, meta)
+    logger.info("Built profile index of %d resumes from %d points.", len(rows), points_read)
+    return meta
+
+
+class ProfileIndex:
+    """
+    The published profile matrix, memory-mapped read-only. Each query
+    checks the metadata file and maps the newest snapshot if it changed.
+    """
+    def __init__(self, path: str = PROFILE_INDEX_PATH):
+        """
+        Initialize the index; nothing is read until the first query.
+        """
+        self.path = path
+        self.meta: Optional[dict] = None
+        self.ids: Optional[np.ndarray] = None
+        self.vectors: Optional[np.ndarray] = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Tuple[dict, np.ndarray, np.ndarray]:
+        """
+        (metadata, resume ids, profile matrix) of the current snapshot.
+        """
+        meta_path = os.path.join(self.path, META_FILE)
+        try:
+            version = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError as e:
+            raise ProfileIndexError("No profile index yet; build it with python build_profiles.py.") from e
+        with self._lock:
+            if version != self._version:
+                try:
+                    snapshot = self._read(meta_path)
+                except FileNotFoundError:
+                    # Two builds were published since the metadata was read; read the newest
+                    version = os.stat(meta_path).st_mtime_ns
+                    snapshot = self._read(meta_path)
+                (self.meta, self.ids, self.vectors), self._version = snapshot, version
+            return self.meta, self.ids, self.vectors
+
+    def _read(self, meta_path: str) -> Tuple[dict, np.ndarray, np.ndarray]:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(os.path.join(self.path, meta["vectors"]), mmap_mode="r")
+        return meta, np.load(os.path.join(self.path, meta["ids"])), vectors
+
+    def score(self, query: np.ndarray, weights: Dict[str, float], limit: int,
+              resume_ids: Optional[List[int]] = None) -> List[Tuple[int, float, Dict[str, float]]]:
+        """
+        The `limit` best (resume_id, score, section scores) for a unit-length
+        `query` vector, optionally among `resume_ids` only. Section scores
+        are cosine similarities to the section centroids; the score is their
+        average weighted by `weights`.
+        """
+        meta, ids, vectors = self.load()
+        unknown = set(weights) - set(meta["sections"])
+        if unknown:
+            raise ValueError(f"Unknown sections in section_weights: {', '.join(sorted(unknown))}.")
+        if resume_ids:
+            rows = np.flatnonzero(np.isin(ids, resume_ids))
+            ids, vectors = ids[rows], vectors[rows]
+        section_weights = np.array([weights.get(s, 0.0) for s in meta["sections"]], dtype=np.float32)
+        if section_weights.sum() <= 0:
+            raise ValueError("section_weights must give a positive weight to at least one section.")
+        count, sections, dimension = vectors.shape
+        if count == 0:
+            return []
+        # One matrix multiply scores every section of every candidate
+        section_scores = (vectors.reshape(count * sections, dimension) @ query).reshape(count, sections)
+        scores = section_scores @ (section_weights / section_weights.sum())
+        limit = min(limit, count)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (int(ids[row]), float(scores[row]),
+             {section: round(float(value), 4) for section, value in zip(meta["sections"], section_scores[row])})
+            for row in top
+        ]
+
+
+_profile_index = ProfileIndex()
+
+
+def get_profile_index() -> ProfileIndex:
+    """
+    Return the process-wide profile index.
+    """
+    return _profile_index
+
+
+def embed_query(service: QdrantService, meta: dict, text: str) -> np.ndarray:
+    """
+    Unit-length embedding of `text`, comparable with the profile vectors.
+    """
+    if service.embedder.model != meta["model"]:
+        raise ProfileIndexError(
+            f"The profile index was built with {meta['model']}, not {service.embedder.model}; "
+            "rebuild it with python build_profiles.py."
+        )
+    vector = np.asarray(service.embed_texts([text], meta["dimension"])[0], dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+def match_job_description(job_description: str, limit: int = 10, resume_ids: Optional[List[int]] = None,
+                          section_weights: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Blocking job-description match: embed the description once, score the
+    profile matrix and name the `limit` best candidates from Postgres.
+    """
+    index = get_profile_index()
+    meta, _, _ = index.load()
+    started = time.perf_counter()
+    query = embed_query(QdrantService(), meta, job_description)
+    embedded = time.perf_counter()
+    ranked = index.score(query, section_weights or DEFAULT_SECTION_WEIGHTS, limit + MATCH_OVERFETCH, resume_ids)
+    scored = time.perf_counter()
+    # built_at is when the build started reading Qdrant, so later changes are not in the snapshot
+    built_at = datetime.strptime(meta["built_at"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    with DatabaseService() as database:
+        names = database.get_candidate_names([resume_id for resume_id, _, _ in ranked])
+        changed = database.count_resumes_changed_since(built_at)
+    candidates = [
+        {"resume_id": resume_id, "candidate_name": names[resume_id], "score": round(score, 4), "sections": sections}
+        for resume_id, score, sections in ranked
+        if resume_id in names
+    ][:limit]
+    return {
+        "candidates": candidates,
+        "profiles": meta["count"],
+        "built_at": meta["built_at"],
+        "age_seconds": round((datetime.now(timezone.utc) - built_at).total_seconds()),
+        "changed_since_build": changed,
+        "timing_ms": {
+            "embed": round((embedded - started) * 1000, 2),
+            "score": round((scored - embedded) * 1000, 2),
+        },
+    }
@@ -0,0 +1,56 @@
+"""
+Embedding and LLM providers, selected with EMBEDDING_PROVIDER and
+LLM_PROVIDER ("gemini" by default, or "local" for the offline backend).
+"""
+import os
+import importlib
+import threading
+from typing import Optional
+
+from .base import EmbeddingProvider, LLMProvider, provider_setting
+
+# Provider classes by name, as (module, class): a provider's SDK is only
+# imported when it is selected (google-genai alone takes ~0.4s to import)
+EMBEDDING_PROVIDERS = {
+    "gemini": ("gemini", "GeminiEmbeddingProvider"),
+    "local": ("local", "HashingEmbeddingProvider"),
+}
+
+LLM_PROVIDERS = {
+    "gemini": ("gemini", "GeminiLLMProvider"),
+    "local": ("local", "RuleBasedLLMProvider"),
+}
+
+_embedding_provider: Optional[EmbeddingProvider] = None
+_llm_provider: Optional[LLMProvider] = None
+_lock = threading.Lock()
+
+
+def _create(registry: dict, variable: str):
+    name = os.getenv(variable, "gemini").lower()
+    if name not in registry:
+        raise ValueError(f"Unknown {variable} {name!r}; choose one of {', '.join(registry)}")
+    module, cls = registry[name]
+    return getattr(importlib.import_module(f".{module}", __name__), cls)()
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """
+    Return the process-wide embedding provider (EMBEDDING_PROVIDER).
+    """
+    global _embedding_provider #pylint: disable=W0603
+    with _lock:
+        if _embedding_provider is None:
+            _embedding_provider = _create(EMBEDDING_PROVIDERS, "EMBEDDING_PROVIDER")
+        return _embedding_provider
+
+
+def get_llm_provider() -> LLMProvider:
+    """
+    Return the process-wide LLM provider (LLM_PROVIDER).
+    """
+    global _llm_provider #pylint: disable=W0603
+    with _lock:
+        if _llm_provider is None:
+            _llm_provider = _create(LLM_PROVIDERS, "LLM_PROVIDER")
+        return _llm_provider
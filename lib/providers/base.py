@@ -0,0 +1,258 @@
+"""
+Provider interfaces for embedding models and LLMs.
+Every provider carries its own batch size and rate limits, read from
+`<PROVIDER>_*` environment variables. Calls go through a process-wide
+rate limiter per provider endpoint and throttled calls are retried.
+"""
+import os
+import time
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from prompts.compaction import estimate_tokens
+from ..metrics import EMBED_BATCH_SECONDS, EMBED_TEXTS, LLM_REQUEST_SECONDS, LLM_TOKENS
+from ..rate_limit import RATE_LIMIT_MAX_RETRIES, RETRIES, RateLimiter, backoff_delay, get_limiter
+from ..tracing import trace_stage
+
+
+def provider_setting(provider: str, name: str, default):
+    """
+    Read `<PROVIDER>_<NAME>` (e.g. GEMINI_EMBED_BATCH_SIZE) from the
+    environment, converted to the type of `default`.
+    """
+    return type(default)(os.getenv(f"{provider.upper()}_{name}", default))
+
+
+def provider_limiter(provider: str, endpoint: str, concurrency: int) -> RateLimiter:
+    """
+    The limiter for `endpoint` ("LLM" or "EMBED") of `provider`, with quotas
+    from `<PROVIDER>_<ENDPOINT>_RPM`, `_TPM` and `_LATENCY_TARGET` (0 = none).
+    """
+    return get_limiter(
+        f"{provider}_{endpoint.lower()}", concurrency,
+        rpm=provider_setting(provider, f"{endpoint}_RPM", 0.0),
+        tpm=provider_setting(provider, f"{endpoint}_TPM", 0.0),
+        latency_target=provider_setting(provider, f"{endpoint}_LATENCY_TARGET", 0.0),
+    )
+
+
+class ThrottledCall: #pylint: disable=R0903
+    """
+    Bookkeeping for one attempt of a rate-limited call: `end` releases the
+    limiter slot with the call's latency, outcome and real token usage.
+    """
+    def __init__(self, limiter: RateLimiter, reserved: int):
+        """
+        Start timing an attempt admitted with `reserved` tokens.
+        """
+        self.limiter = limiter
+        self.reserved = reserved
+        self.usage: Dict[str, int] = {}
+        self.throttled = False
+        self.started = time.perf_counter()
+
+    def end(self) -> float:
+        """
+        Release the slot and return the elapsed seconds.
+        """
+        elapsed = time.perf_counter() - self.started
+        # Calls that failed before reporting usage give their reservation back
+        self.limiter.release(elapsed, self.throttled, sum(self.usage.values()) - self.reserved)
+        return elapsed
+
+
+class EmbeddingProvider:
+    """
+    Turns texts into vectors. `embed` splits the input into requests of at
+    most `batch_size` texts, admitted by the provider's embedding limiter:
+    at most `concurrency` requests in flight across all threads of the
+    process, within the EMBED_RPM / EMBED_TPM quotas.
+    """
+    name = "base"
+
+    def __init__(self, model: str, batch_size: int, concurrency: int,
+                 dimension: Optional[int] = None):
+        """
+        Initialize the provider limits.
+        """
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.dimension = dimension
+        self.limiter = provider_limiter(self.name, "EMBED", max(1, concurrency))
+
+    @property
+    def concurrency(self) -> int:
+        """
+        Upper bound of the adaptive concurrency limit.
+        """
+        return self.limiter.max_concurrency
+
+    @concurrency.setter
+    def concurrency(self, value: int):
+        self.limiter.resize(value)
+
+    def embed(self, texts: List[str], dimension: Optional[int] = None) -> List[List[float]]:
+        """
+        Embed `texts`, one vector per text in the same order, with
+        `dimension` components (default: the provider's `dimension`).
+        """
+        dimension = dimension or self.dimension
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            vectors.extend(self._embed_batch(batch, dimension))
+            EMBED_TEXTS.inc(len(batch), provider=self.name)
+        return vectors
+
+    def _embed_batch(self, batch: List[str], dimension: Optional[int]) -> List[List[float]]:
+        reserved = sum(estimate_tokens(text) for text in batch)
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire(reserved)
+            call = ThrottledCall(self.limiter, reserved)
+            try:
+                with EMBED_BATCH_SECONDS.time(provider=self.name):
+                    vectors = self._embed(batch, dimension)
+                call.usage["prompt"] = reserved
+                return vectors
+            except Exception as e:
+                call.throttled = self._throttled(e)
+                if not call.throttled or attempt > RATE_LIMIT_MAX_RETRIES:
+                    raise
+            finally:
+                call.end()
+            RETRIES.inc(limiter=self.limiter.name)
+            time.sleep(backoff_delay(attempt))
+
+    def _embed(self, texts: List[str], dimension: Optional[int]) -> List[List[float]]:
+        """
+        Embed one batch; a None `dimension` means the model's native size.
+        """
+        raise NotImplementedError
+
+    def _throttled(self, error: Exception) -> bool: #pylint: disable=W0613
+        """
+        Whether `error` means the provider rejected the call as over quota.
+        """
+        return False
+
+
+class LLMProvider:
+    """
+    Generates text from a prompt, buffered or streamed. Calls are admitted
+    by the provider's LLM limiter: at most `concurrency` in flight in the
+    process (lowered adaptively when the provider throttles), within the
+    LLM_RPM / LLM_TPM quotas. Throttled calls are retried with backoff.
+    Latency and token usage are recorded per `operation` (e.g.
+    "resume_extraction", "summarize").
+    """
+    name = "base"
+
+    def __init__(self, model: str, concurrency: int):
+        """
+        Initialize the provider limits.
+        """
+        self.model = model
+        self.limiter = provider_limiter(self.name, "LLM", max(1, concurrency))
+
+    @property
+    def concurrency(self) -> int:
+        """
+        Upper bound of the adaptive concurrency limit.
+        """
+        return self.limiter.max_concurrency
+
+    @concurrency.setter
+    def concurrency(self, value: int):
+        self.limiter.resize(value)
+
+    async def _admit(self, reserved: int) -> ThrottledCall:
+        await self.limiter.acquire_async(reserved)
+        return ThrottledCall(self.limiter, reserved)
+
+    async def _backoff(self, attempt: int):
+        RETRIES.inc(limiter=self.limiter.name)
+        await asyncio.sleep(backoff_delay(attempt))
+
+    async def generate(self, prompt: str, operation: str = "generate",
+                       schema: Optional[Type[BaseModel]] = None) -> str:
+        """
+        Return the full response to `prompt`. With a `schema` the model is
+        asked for JSON matching it; the caller still validates the result.
+        """
+        reserved = estimate_tokens(prompt)
+        attempt = 0
+        while True:
+            attempt += 1
+            call = await self._admit(reserved)
+            status = "error"
+            try:
+                text = await self._generate(prompt, call.usage, schema)
+                status = "ok"
+                return text
+            except Exception as e:
+                call.throttled = self._throttled(e)
+                if call.throttled:
+                    status = "throttled"
+                if not call.throttled or attempt > RATE_LIMIT_MAX_RETRIES:
+                    raise
+            finally:
+                self._record(operation, status, call)
+            await self._backoff(attempt)
+
+    async def stream(self, prompt: str, operation: str = "stream") -> AsyncIterator[str]:
+        """
+        Yield the response to `prompt` in pieces as they are generated.
+        A throttled call is retried only if nothing was yielded yet.
+        """
+        reserved = estimate_tokens(prompt)
+        attempt = 0
+        while True:
+            attempt += 1
+            call = await self._admit(reserved)
+            status = "error"
+            started = False
+            try:
+                async for text in self._stream(prompt, call.usage):
+                    started = True
+                    yield text
+                status = "ok"
+                return
+            except Exception as e:
+                call.throttled = self._throttled(e)
+                if call.throttled:
+                    status = "throttled"
+                if not call.throttled or started or attempt > RATE_LIMIT_MAX_RETRIES:
+                    raise
+            finally:
+                self._record(operation, status, call)
+            await self._backoff(attempt)
+
+    def _record(self, operation: str, status: str, call: ThrottledCall):
+        elapsed = call.end()
+        usage = call.usage
+        labels = {"provider": self.name, "operation": operation, "status": status}
+        LLM_REQUEST_SECONDS.observe(elapsed, **labels)
+        trace_stage(LLM_REQUEST_SECONDS.name, elapsed, {**labels, **usage})
+        for kind, count in usage.items():
+            if count:
+                LLM_TOKENS.inc(count, provider=self.name, operation=operation, kind=kind)
+
+    async def _generate(self, prompt: str, usage: Dict[str, int],
+                        schema: Optional[Type[BaseModel]] = None) -> str:
+        """
+        Produce the response, filling `usage` with "prompt"/"completion" token counts.
+        """
+        raise NotImplementedError
+
+    async def _stream(self, prompt: str, usage: Dict[str, int]) -> AsyncIterator[str]:
+        yield await self._generate(prompt, usage)
+
+    def _throttled(self, error: Exception) -> bool: #pylint: disable=W0613
+        """
+        Whether `error` means the provider rejected the call as over quota.
+        """
+        return False
@@ -0,0 +1,95 @@
+"""
+Google Gemini providers, backed by the google-genai client.
+"""
+import os
+from typing import AsyncIterator, Dict, List, Optional, Type
+
+from google import genai
+from google.genai import errors, types
+from pydantic import BaseModel
+
+from .base import EmbeddingProvider, LLMProvider, provider_setting
+
+
+def is_quota_error(error: Exception) -> bool:
+    """
+    Whether `error` is the API rejecting a call as over quota (HTTP 429, RESOURCE_EXHAUSTED).
+    """
+    return isinstance(error, errors.APIError) and (error.code == 429 or error.status == "RESOURCE_EXHAUSTED")
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """
+    Embeddings from the Gemini embedding API.
+    """
+    name = "gemini"
+
+    def __init__(self, client=None):
+        """
+        Initialize the provider with GEMINI_EMBED_* settings.
+        """
+        super().__init__(
+            model=provider_setting(self.name, "EMBED_MODEL", "gemini-embedding-001"),
+            batch_size=provider_setting(self.name, "EMBED_BATCH_SIZE",
+                                        int(os.getenv("QDRANT_EMBED_BATCH_SIZE", "100"))),
+            concurrency=provider_setting(self.name, "EMBED_CONCURRENCY", 8),
+            # Smaller sizes are truncations of the full 3072-dimension embedding
+            dimension=provider_setting(self.name, "EMBED_DIMENSION", 0) or None,
+        )
+        self.client = client or genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+    def _embed(self, texts: List[str], dimension: Optional[int]) -> List[List[float]]:
+        config = types.EmbedContentConfig(output_dimensionality=dimension) if dimension else None
+        res = self.client.models.embed_content(model=self.model, contents=texts, config=config)
+        return [emb.values for emb in res.embeddings]
+
+    def _throttled(self, error: Exception) -> bool:
+        return is_quota_error(error)
+
+
+class GeminiLLMProvider(LLMProvider):
+    """
+    Text generation with a Gemini model (GEMINI_MODEL_ID).
+    """
+    name = "gemini"
+
+    def __init__(self, client=None):
+        """
+        Initialize the provider with GEMINI_* settings.
+        """
+        super().__init__(
+            model=os.getenv("GEMINI_MODEL_ID", "gemini-2.5-flash"),
+            concurrency=provider_setting(self.name, "LLM_CONCURRENCY",
+                                         int(os.getenv("LLM_MAX_CONCURRENCY", "8"))),
+        )
+        self.client = client or genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+    @staticmethod
+    def _usage(response, usage: Dict[str, int]):
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is None:
+            return
+        usage["prompt"] = metadata.prompt_token_count or 0
+        usage["completion"] = metadata.candidates_token_count or 0
+
+    async def _generate(self, prompt: str, usage: Dict[str, int],
+                        schema: Optional[Type[BaseModel]] = None) -> str:
+        config = None
+        if schema is not None:
+            # Constrained decoding: the model can only emit JSON of this shape
+            config = types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema)
+        response = await self.client.aio.models.generate_content(model=self.model, contents=prompt, config=config)
+        self._usage(response, usage)
+        # A blocked or empty candidate has no text; callers treat "" as invalid output and retry
+        return response.text or ""
+
+    def _throttled(self, error: Exception) -> bool:
+        return is_quota_error(error)
+
+    async def _stream(self, prompt: str, usage: Dict[str, int]) -> AsyncIterator[str]:
+        stream = await self.client.aio.models.generate_content_stream(model=self.model, contents=prompt)
+        async for chunk in stream:
+            # Usage totals arrive with the last chunks
+            self._usage(chunk, usage)
+            if chunk.text:
+                yield chunk.text
@@ -0,0 +1,328 @@
+"""
+Local CPU providers that need no network or model weights: a deterministic
+feature-hashing embedder and a rule-based LLM stand-in. Meant for tests,
+load tests and offline development, not for ranking quality.
+"""
+import os
+import re
+import json
+import math
+import hashlib
+from typing import Dict, List, Optional
+
+from prompts.compaction import estimate_tokens
+
+from .base import EmbeddingProvider, LLMProvider, provider_setting
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+YEAR = r"(?:[A-Za-z]{3,9}\.?\s+)?(?:\d{1,2}/)?\d{4}"
+DATE_RANGE_RE = re.compile(
+    rf"({YEAR})\s*(?:-|–|—|to)\s*({YEAR}|present|current|now)", re.IGNORECASE
+)
+BULLET_RE = re.compile(r"^[\s•·▪◦*-]+")
+
+# Section headings recognised in resume text, lower-cased without a trailing colon
+HEADINGS = {
+    "summary": {"summary", "profile", "objective", "about", "about me",
+                "professional summary", "career summary", "career objective"},
+    "skills": {"skills", "technical skills", "core skills", "key skills", "skills & tools",
+               "technologies", "competencies", "core competencies", "certifications"},
+    "experience": {"experience", "work experience", "professional experience",
+                   "employment", "employment history", "work history", "career history"},
+    "education": {"education", "academic background", "qualifications", "education & training"},
+    # Sections the extraction schema has no field for; their lines are dropped
+    "other": {"details", "personal details", "contact", "links", "hobbies", "interests", "languages",
+              "references", "achievements", "awards", "courses", "projects", "publications"},
+}
+HEADER_SPLIT_RE = re.compile(r"\s+at\s+|\s+@\s+|\s*\|\s*|\s+[-–—]\s+|,\s*")
+DEGREE_RE = re.compile(
+    r"\b(b\.?\s?s\.?c?|b\.?\s?a|b\.?\s?tech|b\.?\s?e|m\.?\s?s\.?c?|m\.?\s?a|m\.?\s?tech|mba|ph\.?\s?d|"
+    r"bachelor\S*|master\S*|doctor\S*|diploma|associate\S*|certificate)\b",
+    re.IGNORECASE
+)
+INSTITUTION_RE = re.compile(r"\b(university|college|institute|school|academy)\b", re.IGNORECASE)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic embeddings from hashed word and character-trigram
+    features, L2-normalized. Texts sharing words get similar vectors, which
+    is enough to exercise search end to end.
+    """
+    name = "local"
+
+    def __init__(self):
+        """
+        Initialize the provider with LOCAL_EMBED_* settings.
+        """
+        super().__init__(
+            model="local-hashing-v1",
+            batch_size=provider_setting(self.name, "EMBED_BATCH_SIZE", 1000),
+            concurrency=provider_setting(self.name, "EMBED_CONCURRENCY", os.cpu_count() or 1),
+            dimension=provider_setting(self.name, "EMBED_DIMENSION", 384),
+        )
+
+    def _features(self, text: str) -> Dict[str, float]:
+        features: Dict[str, float] = {}
+        for word in WORD_RE.findall(text.lower()):
+            features["w:" + word] = features.get("w:" + word, 0.0) + 1.0
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                gram = "c:" + padded[i:i + 3]
+                features[gram] = features.get(gram, 0.0) + 0.5
+        return features
+
+    def embed_one(self, text: str, dimension: Optional[int] = None) -> List[float]:
+        """
+        Embed a single text into `dimension` buckets (default: `self.dimension`).
+        """
+        dimension = dimension or self.dimension
+        vector = [0.0] * dimension
+        for feature, weight in self._features(text).items():
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vector[h % dimension] += weight if (h >> 63) & 1 else -weight
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            # Cosine distance needs a non-zero vector, even for empty text
+            vector[0], norm = 1.0, 1.0
+        return [v / norm for v in vector]
+
+    def _embed(self, texts: List[str], dimension: Optional[int]) -> List[List[float]]:
+        return [self.embed_one(t, dimension) for t in texts]
+
+
+def _between(text: str, start: str, end: Optional[str] = None) -> Optional[str]:
+    index = text.find(start)
+    if index == -1:
+        return None
+    body = text[index + len(start):]
+    if end is not None and end in body:
+        body = body[:body.index(end)]
+    return body.strip()
+
+
+def _heading(line: str) -> Optional[str]:
+    key = line.strip().strip(":").strip().lower()
+    for section, names in HEADINGS.items():
+        if key in names:
+            return section
+    return None
+
+
+def _split_sections(lines: List[str]) -> Dict[str, List[str]]:
+    sections = {"header": []}
+    current = "header"
+    for line in lines:
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        else:
+            sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _describe(entry: Optional[dict], lines: List[str]):
+    text = " ".join(BULLET_RE.sub("", line).strip() for line in lines).strip()
+    if entry is not None and text:
+        entry["description"] = f"{entry['description']} {text}" if entry["description"] else text
+
+
+def _parse_experience(lines: List[str]) -> List[dict]:
+    """
+    Each date range starts an entry. Its "role at company" / "role, company"
+    header is either on the same line or the closest line above that looks
+    like one; the lines in between describe the previous entry.
+    """
+    entries, current, pending = [], None, []
+    for line in lines:
+        match = DATE_RANGE_RE.search(line)
+        if not match:
+            pending.append(line)
+            continue
+        header = BULLET_RE.sub("", line[:match.start()] + line[match.end():]).strip(" ,|-–—()")
+        if not header and pending:
+            index = next((i for i in range(len(pending) - 1, -1, -1)
+                          if HEADER_SPLIT_RE.search(pending[i]) and len(pending[i].split()) <= 10),
+                         len(pending) - 1)
+            header = BULLET_RE.sub("", pending[index]).strip()
+            pending = pending[:index]
+        _describe(current, pending)
+        pending = []
+        parts = [p.strip() for p in HEADER_SPLIT_RE.split(header) if p.strip()]
+        current = {
+            "company": parts[1] if len(parts) > 1 else None,
+            "role": parts[0] if parts else None,
+            "start_date": match.group(1),
+            "end_date": match.group(2),
+            "description": None,
+        }
+        entries.append(current)
+    _describe(current, pending)
+    return entries
+
+
+def _parse_education(lines: List[str]) -> List[dict]:
+    entries, current = [], None
+    for line in lines:
+        text = BULLET_RE.sub("", line).strip()
+        if not text:
+            continue
+        dates = DATE_RANGE_RE.search(text)
+        years = re.findall(r"\b(?:19|20)\d{2}\b", text)
+        clean = DATE_RANGE_RE.sub("", text).strip(" ,|-–—()")
+        if len(clean.split()) > 15:
+            # Prose such as course lists, not a degree or institution line
+            continue
+        degree = DEGREE_RE.search(clean)
+        institution = INSTITUTION_RE.search(clean)
+        if current is None or (degree and current["degree"]) or (institution and current["institution"]):
+            current = {"institution": None, "degree": None, "start_year": None, "end_year": None}
+            entries.append(current)
+        parts = [p.strip() for p in re.split(r"\s*[,|]\s*|\s+[-–—]\s+|\s+at\s+", clean) if p.strip()]
+        for part in parts:
+            if INSTITUTION_RE.search(part) and not current["institution"]:
+                current["institution"] = part
+            elif DEGREE_RE.search(part) and not current["degree"]:
+                current["degree"] = part
+        if degree and not current["institution"]:
+            # "Degree, Institution" with an institution name the pattern does not know
+            rest = [p for p in parts if p != current["degree"] and not re.fullmatch(r"[\d\s-]+", p)]
+            current["institution"] = rest[0] if rest else None
+        if dates:
+            current["start_year"], current["end_year"] = dates.group(1), dates.group(2)
+        elif years:
+            current["start_year"] = current["start_year"] or (years[0] if len(years) > 1 else None)
+            current["end_year"] = years[-1]
+    return [e for e in entries if e["institution"] or e["degree"]]
+
+
+def extract_resume(raw_text: str) -> dict:
+    """
+    Rule-based resume parsing into the ResumeExtractionPrompt JSON structure.
+    """
+    lines = [line.rstrip() for line in raw_text.splitlines()]
+    email = EMAIL_RE.search(raw_text)
+    phone = PHONE_RE.search(raw_text)
+    sections = _split_sections([line for line in lines if line.strip()])
+
+    name = None
+    for line in sections["header"]:
+        candidate = line.strip()
+        if EMAIL_RE.search(candidate) or PHONE_RE.search(candidate):
+            continue
+        if 1 <= len(candidate.split()) <= 5 and not any(ch.isdigit() for ch in candidate):
+            name = candidate
+            break
+
+    skills = []
+    for line in sections.get("skills", []):
+        if DATE_RANGE_RE.search(line):
+            continue
+        line = re.sub(r"^[^:]{1,30}:\s*", "", BULLET_RE.sub("", line))
+        for skill in re.split(r"\s*[,;|•·]\s*", line):
+            skill = skill.strip(" .")
+            # Longer fragments are sentences that ended up in the section
+            if skill and len(skill.split()) <= 4 and skill.lower() not in {s.lower() for s in skills}:
+                skills.append(skill)
+
+    summary_lines = []
+    for line in sections.get("summary", []):
+        text = BULLET_RE.sub("", line).strip()
+        if EMAIL_RE.search(text) or PHONE_RE.search(text):
+            continue
+        if summary_lines and summary_lines[-1].endswith(".") and len(text.split()) <= 4:
+            # Short lines after the last sentence are contact details or sidebar text
+            break
+        summary_lines.append(text)
+    summary = " ".join(summary_lines) or None
+    return {
+        "name": name,
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0).strip() if phone else None,
+        "summary": summary,
+        "skills": skills,
+        "experience": _parse_experience(sections.get("experience", [])),
+        "education": _parse_education(sections.get("education", [])),
+    }
+
+
+def summarize_results(question: str, results) -> str:
+    """
+    Extractive stand-in for the search summary: lists the retrieved
+    candidates and their best matching text.
+    """
+    if not results:
+        return f"No matching resumes were found for: {question}"
+    lines = [f"Results for: {question}"]
+    for result in results:
+        if "payload" in result:
+            payload = result["payload"]
+            name, text = payload.get("candidate_name"), payload.get("text")
+        else:
+            hits = result.get("hits") or [{}]
+            name, text = result.get("candidate_name"), hits[0].get("text")
+        lines.append(f"- {name or 'Unknown candidate'}: {text or ''}".rstrip(": "))
+    return "\n".join(lines)
+
+
+def _parse_results(text: str) -> List[dict]:
+    # Candidate blocks written by prompts.compaction.compact_search_results
+    results = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("Candidate: "):
+            results.append({"candidate_name": line[len("Candidate: "):], "hits": []})
+        elif line.startswith("- [") and results:
+            results[-1]["hits"].append({"text": line.split("] ", 1)[-1]})
+    return results
+
+
+class RuleBasedLLMProvider(LLMProvider):
+    """
+    Answers the repo's prompts without a model: resume extraction prompts get
+    regex/heading-based JSON, summary prompts an extractive list of hits.
+    """
+    name = "local"
+
+    def __init__(self):
+        """
+        Initialize the provider with LOCAL_LLM_* settings.
+        """
+        super().__init__(
+            model="local-rules-v1",
+            concurrency=provider_setting(self.name, "LLM_CONCURRENCY", 64),
+        )
+
+    def respond(self, prompt: str) -> str:
+        """
+        Produce the response text for a prompt built by the `prompts` package.
+        """
+        raw_text = _between(prompt, "Input Resume Text:", "Output JSON Structure:")
+        if raw_text is not None:
+            return json.dumps(extract_resume(raw_text))
+        question = _between(prompt, "Question:", "Search Results:") or ""
+        results = _between(prompt, "Search Results:")
+        if results is not None:
+            return summarize_results(question, _parse_results(results))
+        return "The local provider only answers resume extraction and search summary prompts."
+
+    @staticmethod
+    def _usage(prompt: str, response: str, usage: Dict[str, int]):
+        usage["prompt"] = estimate_tokens(prompt)
+        usage["completion"] = estimate_tokens(response)
+
+    async def _generate(self, prompt: str, usage: Dict[str, int], schema=None) -> str:
+        # Responses to extraction prompts always follow the schema
+        response = self.respond(prompt)
+        self._usage(prompt, response, usage)
+        return response
+
+    async def _stream(self, prompt: str, usage: Dict[str, int]):
+        response = self.respond(prompt)
+        self._usage(prompt, response, usage)
+        for line in response.splitlines(keepends=True):
+            yield line
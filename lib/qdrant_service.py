@@ -1,20 +1,131 @@
 """
 Qdrant Service Module
-Handles embedding generation using Google Gemini and storage/retrieval in Qdrant vector database.
+Handles embedding generation through the configured embedding provider and storage/retrieval in Qdrant vector database.
 """
 import os
 import uuid
 import re
-from typing import List, Dict
+import hashlib
+import logging
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional, Tuple
+import httpx
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
-from google import genai
+
+from .embedding_cache import get_embedding_cache
+from .metrics import QDRANT_POINTS_UPSERTED, QDRANT_QUERY_SECONDS, QDRANT_UPSERT_SECONDS
+from .providers import get_embedding_provider
+
+logger = logging.getLogger(__name__)
+
+# Payload fields that searches can filter on, with the index type created for each
+PAYLOAD_INDEXES = {
+    "resume_id": qmodels.PayloadSchemaType.INTEGER,
+    "section": qmodels.PayloadSchemaType.KEYWORD,
+    "skill": qmodels.PayloadSchemaType.KEYWORD,
+    "company": qmodels.PayloadSchemaType.KEYWORD,
+}
+
+# Relative weight of each section when ranking candidates by section-weighted score
+DEFAULT_SECTION_WEIGHTS = {
+    "experience": 1.0,
+    "skill": 0.8,
+    "summary": 0.6,
+    "education": 0.4,
+}
+
+AGGREGATES = ("max", "sum_top_n", "section_weighted")
+
+QUANTIZATIONS = ("none", "scalar", "binary")
+
+# Namespace of the deterministic chunk point ids
+POINT_ID_NAMESPACE = uuid.UUID("6f1c4f0e-3b7a-5d2e-9a61-2f0c8e4b7d15")
+
+# Seconds before a Qdrant request fails, and HTTP connections kept open per client
+QDRANT_TIMEOUT = int(os.environ.get("QDRANT_TIMEOUT", 30))
+QDRANT_POOL_SIZE = int(os.environ.get("QDRANT_POOL_SIZE", 32))
+
+# One client per Qdrant URL, shared by every QdrantService in the process
+_clients: Dict[str, QdrantClient] = {}
+_clients_lock = threading.Lock()
+
+# (Qdrant URL, collection) already created or checked by this process
+_collections_ready = set()
+_collections_lock = threading.Lock()
+
+# (Qdrant URL, collection or alias) -> (whether its vectors are quantized, when that was read)
+_quantized: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+# Seconds before the quantization of a collection is read again, e.g. after another process switched an alias
+QUANTIZATION_REFRESH_SECONDS = 60
+
+
+def get_qdrant_client(url: str) -> QdrantClient:
+    """
+    The process-wide client for `url`, created on first use. Its connection
+    pool keeps up to QDRANT_POOL_SIZE connections alive between requests.
+    """
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is None:
+            client = _clients[url] = QdrantClient(
+                url=url,
+                timeout=QDRANT_TIMEOUT,
+                # The client turns keep-alive off for localhost unless limits are given
+                limits=httpx.Limits(max_connections=QDRANT_POOL_SIZE,
+                                    max_keepalive_connections=QDRANT_POOL_SIZE)
+            )
+        return client
+
+
+def close_qdrant_clients():
+    """
+    Close the shared clients and their connections.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _collections_ready.clear()
+        _quantized.clear()
+
+
+def point_id(resume_id: int, section: str, text: str) -> str:
+    """
+    Deterministic point id of a chunk, from the resume id, the section and a
+    hash of the chunk text: re-ingesting an unchanged chunk yields the same id.
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{resume_id}:{section}:{digest}"))
+
+
+def quantization_config(kind: str) -> Optional[qmodels.QuantizationConfig]:
+    """
+    Collection quantization for `kind` ("none", "scalar" or "binary"), with
+    the quantized vectors kept in RAM.
+    """
+    if kind == "none":
+        return None
+    if kind == "scalar":
+        # int8 per dimension, clipping the 1% most extreme values: 4x smaller than float32
+        return qmodels.ScalarQuantization(scalar=qmodels.ScalarQuantizationConfig(
+            type=qmodels.ScalarType.INT8, quantile=0.99, always_ram=True
+        ))
+    if kind == "binary":
+        # One bit per dimension: 32x smaller, needs rescoring to keep recall
+        return qmodels.BinaryQuantization(binary=qmodels.BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"Unsupported quantization: {kind}; choose one of {', '.join(QUANTIZATIONS)}")
+
 
 class QdrantService: #pylint: disable=R0902
     """
     Qdrant Service Module
-    Handles embedding generation using Google Gemini and
-    storage/retrieval in Qdrant vector database.
+    Handles embedding generation through the configured embedding provider
+    and storage/retrieval in Qdrant vector database.
     """
     def __init__(self):
         """
@@ -22,37 +133,189 @@ class QdrantService: #pylint: disable=R0902
         """
         self.qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
         self.collection_name = "resumes"
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY")  # set this env var with your key
-        self.embed_model = "gemini-embedding-001"          # recommended model
+        self.embedder = get_embedding_provider()
+        self.embedding_cache = get_embedding_cache()
         self.default_vector_size = 1536
+        self.embed_batch_size = self.embedder.batch_size
+        self.upsert_batch_size = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+        self.upsert_wait = os.getenv("QDRANT_UPSERT_WAIT", "true").lower() == "true"
+        self.max_inflight_upserts = int(os.getenv("QDRANT_MAX_INFLIGHT_UPSERTS", "2"))
+        self.group_oversample = int(os.getenv("QDRANT_GROUP_OVERSAMPLE", "3"))
+        self.quantization = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported QDRANT_QUANTIZATION {self.quantization!r}; "
+                             f"choose one of {', '.join(QUANTIZATIONS)}")
+        # With quantization the original vectors are only read to rescore, so they can live on disk
+        self.on_disk_vectors = os.getenv(
+            "QDRANT_ON_DISK_VECTORS", str(self.quantization != "none")
+        ).lower() == "true"
+        self.quantization_oversampling = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+        self.quantization_rescore = os.getenv("QDRANT_QUANTIZATION_RESCORE", "true").lower() == "true"
         self.chunks = []
-        self.points = []
-        self.qclient = QdrantClient(url=self.qdrant_url)
-        self.genai_client = genai.Client(api_key=self.gemini_api_key)
+        self.qclient = get_qdrant_client(self.qdrant_url)
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str], dimension: Optional[int] = None) -> List[List[float]]:
         """
-        Generate embeddings for a list of texts using Google Gemini embedding model.
+        Generate embeddings for a list of texts with the embedding provider.
+        Texts are normalized and looked up in the embedding cache first; only
+        the misses are sent to the provider, once per distinct text.
+        `dimension` overrides the provider's output dimensionality.
         """
-        # genai python example: client.models.embed_content(...)
-        res = self.genai_client.models.embed_content(model=self.embed_model, contents=texts)
-        # res.embeddings is a list of vectors
-        return res.embeddings
+        dimension = dimension or self.embedder.dimension
+        cleaned = [self._clean_text(t) for t in texts]
+        keys = [
+            self.embedding_cache.key(self.embedder.model, dimension, t)
+            for t in cleaned
+        ]
+        vectors = self.embedding_cache.get_many(keys)
+        misses = {}
+        for key, text in zip(keys, cleaned):
+            if key not in vectors:
+                misses.setdefault(key, text)
+        if misses:
+            fresh = dict(zip(misses, self.embedder.embed(list(misses.values()), dimension)))
+            self.embedding_cache.put_many(fresh)
+            vectors.update(fresh)
+        return [vectors[key] for key in keys]
 
-    def ensure_collection(self, name: str, vector_size: int):
+    def ensure_collection(self, name: str, vector_size: Optional[int] = None) -> bool:
         """
         Ensure that a Qdrant collection exists with the specified name and vector size.
-        If it does not exist, create it.
+        If it does not exist, create it with the configured quantization and
+        vector storage; without a `vector_size` it is left for the first
+        upsert to create. An existing collection is used as it is: its
+        quantization only changes by reindexing into a new collection. Each
+        collection is checked once per process. Returns whether the
+        collection is ready.
         """
-        # If collection exists we keep it; to recreate, use recreate_collection
-        if name in [c.name for c in self.qclient.get_collections().collections]:
-            print(f"Collection {name} already exists.")
-            return
-        self.qclient.recreate_collection(
+        ready = (self.qdrant_url, name)
+        if ready in _collections_ready:
+            return True
+        # Concurrent first ingests must not both create (and so wipe) the collection
+        with _collections_lock:
+            if ready in _collections_ready:
+                return True
+            # If collection exists we keep it; to recreate, use recreate_collection
+            if self.collection_exists(name):
+                logger.debug("Collection %s already exists.", name)
+            elif vector_size is None:
+                return False
+            else:
+                self.qclient.recreate_collection(
+                    collection_name=name,
+                    vectors_config=qmodels.VectorParams(
+                        size=vector_size, distance=qmodels.Distance.COSINE, on_disk=self.on_disk_vectors
+                    ),
+                    quantization_config=quantization_config(self.quantization),
+                )
+                logger.info("Created collection %s with vector size %d, %s quantization.",
+                            name, vector_size, self.quantization)
+            self.ensure_payload_indexes(name)
+            _collections_ready.add(ready)
+            return True
+
+    def is_quantized(self, name: str) -> bool:
+        """
+        Whether the collection `name` (or the one it is an alias of) stores
+        quantized vectors, as configured in Qdrant rather than in this
+        process's environment. Cached for QUANTIZATION_REFRESH_SECONDS.
+        """
+        key = (self.qdrant_url, name)
+        cached = _quantized.get(key)
+        if cached is not None and time.monotonic() - cached[1] < QUANTIZATION_REFRESH_SECONDS:
+            return cached[0]
+        collection = self.alias_target(name) or name
+        quantized = (
+            self.qclient.collection_exists(collection)
+            and self.qclient.get_collection(collection).config.quantization_config is not None
+        )
+        _quantized[key] = (quantized, time.monotonic())
+        return quantized
+
+    def search_params(self) -> Optional[qmodels.SearchParams]:
+        """
+        Search parameters for quantized collections: candidates are found with
+        the quantized vectors, `quantization_oversampling` times more than
+        requested, and rescored against the original vectors.
+        """
+        if not self.is_quantized(self.collection_name):
+            return None
+        return qmodels.SearchParams(quantization=qmodels.QuantizationSearchParams(
+            rescore=self.quantization_rescore,
+            oversampling=self.quantization_oversampling
+        ))
+
+    def collection_exists(self, name: str) -> bool:
+        """
+        Whether `name` is a collection or an alias of one.
+        """
+        return self.qclient.collection_exists(name) or self.alias_target(name) is not None
+
+    def alias_target(self, alias: str) -> Optional[str]:
+        """
+        The collection `alias` points to, or None if there is no such alias.
+        """
+        for description in self.qclient.get_aliases().aliases:
+            if description.alias_name == alias:
+                return description.collection_name
+        return None
+
+    def switch_alias(self, alias: str, collection: str):
+        """
+        Point `alias` at `collection` in one atomic update, so searches move
+        from the old collection to the new one without a gap. A collection
+        that still has the alias's name (from before aliases were used) is
+        deleted first; only that one-time migration has a short gap.
+        """
+        operations = []
+        if self.alias_target(alias) is not None:
+            operations.append(qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=alias)))
+        elif self.qclient.collection_exists(alias):
+            logger.warning("Deleting collection %s to replace it with an alias.", alias)
+            self.qclient.delete_collection(alias)
+            self.forget_collection(alias)
+        operations.append(qmodels.CreateAliasOperation(
+            create_alias=qmodels.CreateAlias(collection_name=collection, alias_name=alias)
+        ))
+        self.qclient.update_collection_aliases(change_aliases_operations=operations)
+        _quantized.pop((self.qdrant_url, alias), None)
+        logger.info("Alias %s now points to collection %s.", alias, collection)
+
+    def forget_collection(self, name: str):
+        """
+        Drop the cached check of collection `name`, e.g. after deleting it,
+        so the next ensure_collection looks at Qdrant again.
+        """
+        _collections_ready.discard((self.qdrant_url, name))
+        _quantized.pop((self.qdrant_url, name), None)
+
+    def delete_points_after(self, name: str, resume_id: int):
+        """
+        Delete the points of resumes with an id above `resume_id` from collection `name`.
+        """
+        self.qclient.delete(
             collection_name=name,
-            vectors_config=qmodels.VectorParams(size=vector_size, distance=qmodels.Distance.COSINE),
+            points_selector=qmodels.FilterSelector(filter=qmodels.Filter(must=[
+                qmodels.FieldCondition(key="resume_id", range=qmodels.Range(gt=resume_id))
+            ])),
+            wait=True
         )
-        print(f"Created collection {name} with vector size {vector_size}.")
+
+    def ensure_payload_indexes(self, name: str):
+        """
+        Create the payload indexes used by filtered searches if they are missing.
+        """
+        existing = self.qclient.get_collection(name).payload_schema or {}
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field in existing:
+                continue
+            self.qclient.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=schema,
+                wait=True
+            )
+            logger.info("Created payload index on %s in %s.", field, name)
 
     def _clean_text(self, text: str) -> str:
         """
@@ -65,19 +328,24 @@ class QdrantService: #pylint: disable=R0902
         text = re.sub(r"\s+", " ", text).strip()
         return text
 
-    def prepare_resume_chunks(self, resume_json: Dict) -> List[Dict]:
+    def prepare_resume_chunks(self, resume_json: Dict, append: bool = False) -> List[Dict]:
         """
         Prepare resume chunks from the extracted resume JSON for embedding.
         Each chunk corresponds to a section of the resume (summary, skills, experience, education).
+        With `append` the chunks are added to those already prepared, so several
+        resumes can be embedded and stored in one call.
+        Chunk ids are derived from the resume id, section and text (see
+        `point_id`), so a chunk repeated within a resume is kept once.
         """
-        self.chunks = []  # reset chunks
+        if not append:
+            self.chunks = []  # reset chunks
+        first = len(self.chunks)
         rid = resume_json["resume_id"]
         data = resume_json["extracted_data"]
-        rname = data.get("name", "").strip()
+        rname = (data.get("name") or "").strip()
         summary = self._clean_text(data.get("summary", ""))
         if summary:
             self.chunks.append({
-                "id": str(uuid.uuid4()),
                 "text": f"[SUMMARY] {summary}",
                 "metadata": {
                     "resume_id": rid,
@@ -90,7 +358,6 @@ class QdrantService: #pylint: disable=R0902
             if not skill:
                 continue
             self.chunks.append({
-                "id": str(uuid.uuid4()),
                 "text": f"[SKILL] {skill}",
                 "metadata": {
                     "resume_id": rid,
@@ -115,7 +382,6 @@ class QdrantService: #pylint: disable=R0902
             full_text = " ".join(text_parts).strip()
             if full_text:
                 self.chunks.append({
-                    "id": str(uuid.uuid4()),
                     "text": f"[EXPERIENCE] {full_text}",
                     "metadata": {
                         "resume_id": rid,
@@ -137,7 +403,6 @@ class QdrantService: #pylint: disable=R0902
                 text += f" ({start}-{end})"
             if text:
                 self.chunks.append({
-                    "id": str(uuid.uuid4()),
                     "text": f"[EDUCATION] {text}",
                     "metadata": {
                         "resume_id": rid,
@@ -149,35 +414,180 @@ class QdrantService: #pylint: disable=R0902
                         "end_year": end
                     }
                 })
+        unique = {}
+        for chunk in self.chunks[first:]:
+            chunk["id"] = point_id(rid, chunk["metadata"]["section"], chunk["text"])
+            unique.setdefault(chunk["id"], chunk)
+        self.chunks[first:] = list(unique.values())
 
-    def create_embeddings_and_store(self):
+    def create_embeddings_and_store(self) -> int:
         """
         Create embeddings for the chunks and store them in the Qdrant collection.
+        Chunks are embedded in batches of `embed_batch_size` while the previous
+        batches are uploaded in the background in batches of `upsert_batch_size`,
+        with at most `max_inflight_upserts` uploads outstanding.
+        Returns the number of points written.
         """
-        texts = [c["text"] for c in self.chunks]
-        embeddings = self.embed_texts(texts)
-        vec_len = len(embeddings[0].values)
-        self.ensure_collection(self.collection_name, vec_len)
-        # Build points
-        for c, vec in zip(self.chunks, embeddings):
-            pid = str(uuid.uuid4())
-            payload = c["metadata"]
-            payload["text"] = c["text"][:1000]  # store a text preview (avoid huge payloads)
-            self.points.append(qmodels.PointStruct(id=pid, vector=vec.values, payload=payload))
-            # upsert
-            self.qclient.upsert(collection_name=self.collection_name, points=self.points)
-            print(f"Upserted {len(self.points)} points to {self.collection_name}.")
-
-    def semantic_search(self, query: str, limit: int = 5):
+        if not self.chunks:
+            return 0
+        written = 0
+        pending = deque()
+        buffer = []
+        # Uploads run in the current context so their metrics keep the request id
+        with ThreadPoolExecutor(max_workers=max(1, self.max_inflight_upserts)) as uploader:
+            for start in range(0, len(self.chunks), self.embed_batch_size):
+                batch = self.chunks[start:start + self.embed_batch_size]
+                embeddings = self.embed_texts([c["text"] for c in batch])
+                if start == 0:
+                    self.ensure_collection(self.collection_name, len(embeddings[0]))
+                for c, vec in zip(batch, embeddings):
+                    payload = dict(c["metadata"])
+                    payload["text"] = c["text"][:1000]  # store a text preview (avoid huge payloads)
+                    buffer.append(qmodels.PointStruct(id=c["id"], vector=vec, payload=payload))
+                while len(buffer) >= self.upsert_batch_size:
+                    pending.append(uploader.submit(contextvars.copy_context().run, self._upsert_points,
+                                                 buffer[:self.upsert_batch_size]))
+                    buffer = buffer[self.upsert_batch_size:]
+                    while len(pending) > self.max_inflight_upserts:
+                        written += pending.popleft().result()
+            if buffer:
+                pending.append(uploader.submit(contextvars.copy_context().run, self._upsert_points, buffer))
+            while pending:
+                written += pending.popleft().result()
+        logger.info("Upserted %d points to %s.", written, self.collection_name)
+        return written
+
+    def _upsert_points(self, points: List[qmodels.PointStruct]) -> int:
         """
-        Perform a semantic search on the specified Qdrant collection using the query string.
-        Returns the top results based on similarity.
+        Upload one batch of points.
+        """
+        with QDRANT_UPSERT_SECONDS.time():
+            self.qclient.upsert(
+                collection_name=self.collection_name,
+                points=points,
+                wait=self.upsert_wait
+            )
+        QDRANT_POINTS_UPSERTED.inc(len(points))
+        return len(points)
+
+    def delete_resume_points(self, resume_id: int):
         """
-        q_emb = self.embed_texts([query])[0].values
-        res = self.qclient.query_points(
+        Delete every point that belongs to the given resume, waiting until
+        Qdrant has applied the delete.
+        """
+        if not self.collection_exists(self.collection_name):
+            return
+        self.qclient.delete(
             collection_name=self.collection_name,
-            query=q_emb
+            points_selector=qmodels.FilterSelector(filter=qmodels.Filter(must=[
+                qmodels.FieldCondition(key="resume_id", match=qmodels.MatchValue(value=resume_id))
+            ])),
+            wait=True
         )
+
+    def has_resume_points(self, resume_id: int) -> bool:
+        """
+        Whether any point is stored for the given resume.
+        """
+        if not self.collection_exists(self.collection_name):
+            return False
+        points, _ = self.qclient.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=qmodels.Filter(must=[
+                qmodels.FieldCondition(key="resume_id", match=qmodels.MatchValue(value=resume_id))
+            ]),
+            limit=1,
+            with_payload=False,
+            with_vectors=False
+        )
+        return bool(points)
+
+    def resume_point_ids(self, resume_id: int) -> set:
+        """
+        Ids of the points stored for the given resume.
+        """
+        if not self.collection_exists(self.collection_name):
+            return set()
+        ids = set()
+        offset = None
+        while True:
+            points, offset = self.qclient.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=qmodels.Filter(must=[
+                    qmodels.FieldCondition(key="resume_id", match=qmodels.MatchValue(value=resume_id))
+                ]),
+                limit=1000,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+            ids.update(str(point.id) for point in points)
+            if offset is None:
+                return ids
+
+    def sync_resume_points(self, resume_id: int) -> Dict[str, int]:
+        """
+        Make the stored points of a resume match its prepared chunks. Only
+        chunks with a new id (new or changed text) are embedded and upserted;
+        points of chunks that are gone are deleted afterwards, so the resume
+        stays searchable throughout. Returns the upserted, deleted and
+        unchanged point counts.
+        """
+        existing = self.resume_point_ids(resume_id)
+        wanted = {chunk["id"] for chunk in self.chunks}
+        self.chunks = [chunk for chunk in self.chunks if chunk["id"] not in existing]
+        upserted = self.create_embeddings_and_store()
+        stale = existing - wanted
+        if stale:
+            self.qclient.delete(
+                collection_name=self.collection_name,
+                points_selector=qmodels.PointIdsList(points=sorted(stale)),
+                wait=self.upsert_wait
+            )
+        logger.info("Resume %s: %d points upserted, %d deleted, %d unchanged.",
+                    resume_id, upserted, len(stale), len(wanted & existing))
+        return {"upserted": upserted, "deleted": len(stale), "unchanged": len(wanted & existing)}
+
+    @staticmethod
+    def build_filter(filters: Optional[Dict[str, Any]]) -> Optional[qmodels.Filter]:
+        """
+        Turn {field: value or [values]} into a Qdrant filter. Every field must
+        match; a list matches any of its values. Empty values are ignored.
+        """
+        conditions = []
+        for field, value in (filters or {}).items():
+            if value is None or value == []:
+                continue
+            if field not in PAYLOAD_INDEXES:
+                raise ValueError(f"Unsupported filter field: {field}")
+            if isinstance(value, (list, tuple, set)):
+                match = qmodels.MatchAny(any=list(value))
+            else:
+                match = qmodels.MatchValue(value=value)
+            conditions.append(qmodels.FieldCondition(key=field, match=match))
+        return qmodels.Filter(must=conditions) if conditions else None
+
+    def semantic_search(self, query: str, limit: int = 5, offset: int = 0, #pylint: disable=R0913
+                        score_threshold: Optional[float] = None,
+                        filters: Optional[Dict[str, Any]] = None):
+        """
+        Perform a semantic search on the specified Qdrant collection using the query string.
+        Returns the top results based on similarity.
+        Limit, offset, score threshold and payload filters are applied by
+        Qdrant, so only the requested points are sent back.
+        """
+        q_emb = self.embed_texts([query])[0]
+        with QDRANT_QUERY_SECONDS.time(operation="query_points"):
+            res = self.qclient.query_points(
+                collection_name=self.collection_name,
+                query=q_emb,
+                query_filter=self.build_filter(filters),
+                search_params=self.search_params(),
+                limit=limit,
+                offset=offset,
+                score_threshold=score_threshold,
+                with_payload=True
+            )
         results = []
         for point in res.points:
             results.append({
@@ -185,4 +595,75 @@ class QdrantService: #pylint: disable=R0902
                 "score": point.score,
                 "payload": point.payload
             })
-        return results[:limit]
\ No newline at end of file
+        return results
+
+    @staticmethod
+    def aggregate_score(hits: List[Dict], aggregate: str, top_n: int,
+                        section_weights: Dict[str, float]) -> float:
+        """
+        Collapse a candidate's chunk hits (sorted best first) into one score.
+        """
+        if aggregate == "max":
+            return hits[0]["score"]
+        if aggregate == "sum_top_n":
+            return sum(h["score"] for h in hits[:top_n])
+        if aggregate == "section_weighted":
+            best = {}
+            for h in hits:
+                section = h["section"]
+                best[section] = max(best.get(section, h["score"]), h["score"])
+            return sum(section_weights.get(section, 0.0) * score for section, score in best.items())
+        raise ValueError(f"Unsupported aggregate: {aggregate}")
+
+    def grouped_search(self, query: str, limit: int = 5, offset: int = 0, #pylint: disable=R0913,R0914
+                       score_threshold: Optional[float] = None,
+                       filters: Optional[Dict[str, Any]] = None,
+                       aggregate: str = "max", top_n: int = 3, group_size: int = 3,
+                       section_weights: Optional[Dict[str, float]] = None):
+        """
+        Search at candidate level: chunk hits are grouped per resume_id by
+        Qdrant, each candidate is scored with `aggregate` ("max", "sum_top_n"
+        or "section_weighted") and candidates are returned ranked and paged,
+        each with its `group_size` best supporting chunks.
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {aggregate}")
+        section_weights = section_weights or DEFAULT_SECTION_WEIGHTS
+        # Qdrant orders groups by their best hit; other aggregates can reorder
+        # candidates, so fetch extra groups to rank from
+        oversample = 1 if aggregate == "max" else self.group_oversample
+        hits_per_group = max(group_size, top_n)
+        if aggregate == "section_weighted":
+            # Enough hits per candidate to see the best chunk of most sections
+            hits_per_group = max(hits_per_group, 2 * len(section_weights))
+        q_emb = self.embed_texts([query])[0]
+        with QDRANT_QUERY_SECONDS.time(operation="query_points_groups"):
+            res = self.qclient.query_points_groups(
+                collection_name=self.collection_name,
+                query=q_emb,
+                group_by="resume_id",
+                query_filter=self.build_filter(filters),
+                search_params=self.search_params(),
+                limit=(offset + limit) * oversample,
+                group_size=hits_per_group,
+                score_threshold=score_threshold,
+                with_payload=True
+            )
+        candidates = []
+        for group in res.groups:
+            hits = [{
+                "section": point.payload.get("section"),
+                "text": point.payload.get("text"),
+                "score": point.score
+            } for point in group.hits]
+            if not hits:
+                continue
+            hits.sort(key=lambda h: h["score"], reverse=True)
+            candidates.append({
+                "resume_id": group.id,
+                "candidate_name": group.hits[0].payload.get("candidate_name"),
+                "score": self.aggregate_score(hits, aggregate, top_n, section_weights),
+                "hits": hits[:group_size]
+            })
+        candidates.sort(key=lambda c: c["score"], reverse=True)
+        return candidates[offset:offset + limit]
\ No newline at end of file
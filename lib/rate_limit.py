@@ -0,0 +1,293 @@
+"""
+Rate Limit Module
+Client-side limits for calls to a model provider, shared by every caller
+in the process: token buckets for requests and tokens per minute, a
+concurrency limit that adapts to throttling and latency (AIMD), and
+jittered exponential backoff for retrying throttled calls.
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import List, Optional
+
+from .metrics import REGISTRY, counter
+
+# Fraction of the configured quota to aim for, so throughput settles just under it
+RATE_LIMIT_HEADROOM = float(os.environ.get("RATE_LIMIT_HEADROOM", 0.9))
+# Seconds of quota that can be spent at once after an idle period
+RATE_LIMIT_BURST_SECONDS = float(os.environ.get("RATE_LIMIT_BURST_SECONDS", 5))
+RATE_LIMIT_MAX_RETRIES = int(os.environ.get("RATE_LIMIT_MAX_RETRIES", 5))
+RATE_LIMIT_BACKOFF_BASE = float(os.environ.get("RATE_LIMIT_BACKOFF_BASE", 1.0))
+RATE_LIMIT_BACKOFF_MAX = float(os.environ.get("RATE_LIMIT_BACKOFF_MAX", 30.0))
+
+THROTTLE_SECONDS = counter(
+    "resumescreener_rate_limit_wait_seconds_total",
+    "Time calls spent waiting on client-side limits.", ("limiter", "reason"))
+THROTTLED_RESPONSES = counter(
+    "resumescreener_rate_limit_throttled_total",
+    "Calls the provider rejected as over quota (e.g. HTTP 429).", ("limiter",))
+RETRIES = counter(
+    "resumescreener_rate_limit_retries_total", "Throttled calls retried after backoff.", ("limiter",))
+
+_limiters: List["RateLimiter"] = []
+_limiters_lock = threading.Lock()
+
+
+def backoff_delay(attempt: int, base: float = RATE_LIMIT_BACKOFF_BASE,
+                  cap: float = RATE_LIMIT_BACKOFF_MAX) -> float:
+    """
+    Exponential backoff with full jitter for retry number `attempt` (from 1),
+    so retries of concurrent calls do not line up.
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units per minute up to a burst capacity.
+    Callers reserve units and are told how long to wait for them, so
+    waiters are served in arrival order and none of them spin.
+    """
+    def __init__(self, per_minute: float, burst_seconds: float = RATE_LIMIT_BURST_SECONDS):
+        """
+        Initialize a full bucket.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` units, returning the seconds to wait before using them.
+        The level may go negative; later callers then wait for the debt.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= amount
+            return max(0.0, -self._level / self.rate)
+
+    def adjust(self, amount: float):
+        """
+        Correct an earlier reservation once the real usage is known:
+        positive amounts are taken, negative ones given back.
+        """
+        with self._lock:
+            self._level = min(self.capacity, self._level - amount)
+
+
+class _Waiter:
+    """
+    A call queued for a concurrency slot: a thread waiting on an event or a
+    coroutine awaiting a future, woken by whoever hands it the slot.
+    """
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Initialize a waiter for a thread, or for a coroutine on `loop`.
+        """
+        self.granted = False
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def wake(self) -> bool:
+        """
+        Tell the waiter it holds a slot; False if it can no longer be told.
+        """
+        if self.loop is None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # The waiter's event loop is closed
+            return False
+        return True
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class RateLimiter:
+    """
+    Limits for one provider endpoint (e.g. Gemini text generation). A call
+    first waits for its share of the request and token buckets, then for a
+    concurrency slot, so a slot is never held while waiting for quota.
+    Fewer than `limit` calls may be in flight; queued calls are handed
+    slots in arrival order as calls end. The limit grows by one per limit's
+    worth of successful calls and is halved when the provider throttles
+    (or cut by 10% when a call is slower than `latency_target`), at most
+    once per call duration, within [1, max_concurrency].
+    """
+    def __init__(self, name: str, max_concurrency: int, rpm: float = 0, tpm: float = 0,
+                 latency_target: float = 0):
+        """
+        Initialize the limiter; a zero `rpm`, `tpm` or `latency_target` disables that limit.
+        """
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.requests = TokenBucket(rpm * RATE_LIMIT_HEADROOM) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm * RATE_LIMIT_HEADROOM) if tpm > 0 else None
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._waiters = deque()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        """
+        Calls queued for a concurrency slot.
+        """
+        return len(self._waiters)
+
+    def resize(self, max_concurrency: int):
+        """
+        Change the concurrency ceiling; the limit restarts from it.
+        """
+        with self._lock:
+            self.max_concurrency = max(1, max_concurrency)
+            self.limit = float(self.max_concurrency)
+            self._grant()
+
+    def _reserve(self, tokens: int) -> float:
+        waits = []
+        if self.requests is not None:
+            waits.append(("rpm", self.requests.reserve(1)))
+        if self.tokens is not None and tokens:
+            waits.append(("tpm", self.tokens.reserve(tokens)))
+        for reason, wait in waits:
+            if wait:
+                THROTTLE_SECONDS.inc(wait, limiter=self.name, reason=reason)
+        return max((wait for _, wait in waits), default=0.0)
+
+    def _unreserve(self, tokens: int):
+        # A call that gave up before starting returns its quota
+        if self.requests is not None:
+            self.requests.adjust(-1)
+        if self.tokens is not None and tokens:
+            self.tokens.adjust(-tokens)
+
+    def _free(self) -> bool:
+        # Caller holds self._lock
+        return self.in_flight < min(int(self.limit), self.max_concurrency)
+
+    def _grant(self):
+        # Caller holds self._lock; hand free slots to the oldest waiters
+        while self._waiters and self._free():
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            waiter.granted = True
+            if not waiter.wake():
+                self.in_flight -= 1
+
+    def _enter(self, waiter: _Waiter) -> bool:
+        """
+        Take a slot now if one is free and nobody is queued; otherwise
+        queue `waiter`. Returns whether the slot was taken.
+        """
+        with self._lock:
+            if not self._waiters and self._free():
+                self.in_flight += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def acquire(self, tokens: int = 0):
+        """
+        Block the calling thread until a call using `tokens` may start.
+        """
+        # Wait for quota before taking a slot, so a slot is never held idle
+        time.sleep(self._reserve(tokens))
+        started = time.monotonic()
+        waiter = _Waiter()
+        if not self._enter(waiter):
+            waiter.event.wait()
+            THROTTLE_SECONDS.inc(time.monotonic() - started, limiter=self.name, reason="concurrency")
+
+    async def acquire_async(self, tokens: int = 0):
+        """
+        Wait, without blocking the event loop, until a call using `tokens` may start.
+        """
+        try:
+            await asyncio.sleep(self._reserve(tokens))
+        except BaseException:
+            self._unreserve(tokens)
+            raise
+        started = time.monotonic()
+        waiter = _Waiter(asyncio.get_running_loop())
+        if self._enter(waiter):
+            return
+        try:
+            await waiter.future
+        except BaseException:
+            # Cancelled while queued: leave the queue, or pass on a slot granted meanwhile
+            with self._lock:
+                if waiter.granted:
+                    self.in_flight -= 1
+                    self._grant()
+                else:
+                    self._waiters.remove(waiter)
+            self._unreserve(tokens)
+            raise
+        THROTTLE_SECONDS.inc(time.monotonic() - started, limiter=self.name, reason="concurrency")
+
+    def release(self, latency: float, throttled: bool = False, token_correction: int = 0):
+        """
+        End a call admitted by `acquire`, adapting the limit to its outcome.
+        `token_correction` is the real token usage minus the reserved amount.
+        """
+        if self.tokens is not None and token_correction:
+            self.tokens.adjust(token_correction)
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            slow = self.latency_target and latency > self.latency_target
+            if (throttled or slow) and now - self._last_decrease >= latency:
+                self.limit = max(1.0, self.limit * (0.5 if throttled else 0.9))
+                self._last_decrease = now
+            elif not throttled and not slow:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._grant()
+        if throttled:
+            THROTTLED_RESPONSES.inc(limiter=self.name)
+
+
+def _gauges():
+    """
+    Queue depth, in-flight calls and current concurrency limit of every limiter.
+    """
+    stats = {
+        "resumescreener_rate_limit_queue_depth": ("Calls waiting for a concurrency slot.", "waiting"),
+        "resumescreener_rate_limit_in_flight": ("Calls in flight.", "in_flight"),
+        "resumescreener_rate_limit_concurrency": ("Current adaptive concurrency limit.", "limit"),
+    }
+    for name, (documentation, attribute) in stats.items():
+        yield name, documentation, [
+            (name, {"limiter": limiter.name}, getattr(limiter, attribute)) for limiter in _limiters
+        ]
+
+
+REGISTRY.register_callback(_gauges)
+
+
+def get_limiter(name: str, max_concurrency: int, rpm: float = 0, tpm: float = 0,
+                latency_target: float = 0) -> RateLimiter:
+    """
+    The process-wide limiter called `name`, created on first use.
+    """
+    with _limiters_lock:
+        for limiter in _limiters:
+            if limiter.name == name:
+                return limiter
+        limiter = RateLimiter(name, max_concurrency, rpm, tpm, latency_target)
+        _limiters.append(limiter)
+        return limiter
@@ -0,0 +1,140 @@
+"""
+Tracing Module
+Request ids carried through every pipeline stage in a context variable,
+structured (JSON) logging that includes them, and sampling for the verbose
+prompt/response payload logs.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import random
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", 0.01))
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", 2000))
+TRACE_STAGES = os.environ.get("TRACE_STAGES", "false").lower() == "true"
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+logger = logging.getLogger(__name__)
+
+
+def new_request_id() -> str:
+    """
+    A fresh random request id.
+    """
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> Optional[str]:
+    """
+    Request id of the current context, if any.
+    """
+    return request_id_var.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None):
+    """
+    Run the block with `request_id` (or a new one) as the current request id.
+    """
+    token = request_id_var.set(request_id or new_request_id())
+    try:
+        yield request_id_var.get()
+    finally:
+        request_id_var.reset(token)
+
+
+class RequestIdFilter(logging.Filter): #pylint: disable=R0903
+    """
+    Adds the current request id to every log record.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, request id and
+    any structured fields passed as `extra={"fields": {...}}`.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """
+    Send application logs to stdout, as JSON lines unless LOG_FORMAT=text.
+    Safe to call more than once.
+    """
+    root = logging.getLogger()
+    if any(getattr(h, "_resumescreener", False) for h in root.handlers):
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler._resumescreener = True #pylint: disable=W0212
+    handler.addFilter(RequestIdFilter())
+    if os.environ.get("LOG_FORMAT", "json").lower() == "text":
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+    else:
+        handler.setFormatter(JsonFormatter())
+    root.addHandler(handler)
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+
+def payload_sampled() -> bool:
+    """
+    Whether the current request is one whose payloads get logged. Decided
+    by request id, so a sampled request logs all of its payloads.
+    """
+    if LOG_PAYLOAD_SAMPLE_RATE <= 0:
+        return False
+    request_id = request_id_var.get()
+    if request_id is None:
+        return random.random() < LOG_PAYLOAD_SAMPLE_RATE
+    return zlib.crc32(request_id.encode("utf-8")) % 10000 < LOG_PAYLOAD_SAMPLE_RATE * 10000
+
+
+def log_payload(log: logging.Logger, message: str, payload, **fields):
+    """
+    Log a large payload (prompt, model response, search results) at DEBUG
+    level for a sample of requests, truncated to LOG_PAYLOAD_MAX_CHARS.
+    Nothing is formatted unless the record will be emitted.
+    """
+    if not log.isEnabledFor(logging.DEBUG) or not payload_sampled():
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    log.debug(message, extra={"fields": {
+        **fields,
+        "payload": text[:LOG_PAYLOAD_MAX_CHARS],
+        "payload_chars": len(text),
+    }})
+
+
+def trace_stage(stage: str, seconds: float, labels: dict):
+    """
+    With TRACE_STAGES=true, log the duration of one stage against the
+    current request id, so a request can be followed across stages.
+    """
+    if TRACE_STAGES:
+        logger.info("stage", extra={"fields": {
+            "stage": stage, **labels, "duration_ms": round(seconds * 1000, 3)
+        }})
@@ -0,0 +1,28 @@
+"""
+Create the tables and indexes the API, the workers and the search queries
+rely on. Run it once per deploy, before starting the API; the API itself
+runs no DDL at startup and only warns when something is missing.
+
+Indexes are built with CREATE INDEX CONCURRENTLY, so on large existing
+tables uploads keep being written while they build. Running it again is
+safe: existing indexes are skipped and ones left invalid by an interrupted
+build are rebuilt.
+
+Usage: python migrate.py
+"""
+import time
+
+from lib import DatabaseService, init_pool, close_pool
+from lib.tracing import configure_logging
+
+
+if __name__ == "__main__":
+    configure_logging()
+    started = time.perf_counter()
+    init_pool()
+    try:
+        with DatabaseService() as database:
+            database.migrate()
+    finally:
+        close_pool()
+    print(f"Schema up to date in {time.perf_counter() - started:.1f}s.")
@@ -1,2 +1,4 @@
 from .resume_extract_prompt import *
 from .summarize_prompt import *
+from .resume_repair_prompt import *
+from .resume_schema import *
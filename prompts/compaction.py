@@ -0,0 +1,199 @@
+"""
+Prompt compaction: strips layout noise from extracted text, drops repeated
+lines and fits prompt inputs into a token budget, keeping the most useful
+parts first.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+RESUME_PROMPT_MAX_TOKENS = int(os.environ.get("RESUME_PROMPT_MAX_TOKENS", 4000))
+SUMMARIZE_PROMPT_MAX_TOKENS = int(os.environ.get("SUMMARIZE_PROMPT_MAX_TOKENS", 2000))
+SUMMARIZE_HIT_MAX_CHARS = int(os.environ.get("SUMMARIZE_HIT_MAX_CHARS", 400))
+
+# Rough average for English text; used to estimate tokens without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Resume section headings (lower-cased, without a trailing colon) and the
+# priority of the section when the text has to be cut; lower is kept first.
+# Lines before the first heading (usually name and contact details) have
+# priority 0, lines under an unknown heading that of the section above.
+SECTION_PRIORITIES = {
+    **dict.fromkeys(("contact", "details", "personal details", "links"), 0),
+    **dict.fromkeys(("experience", "work experience", "professional experience", "employment",
+                     "employment history", "work history", "career history"), 1),
+    **dict.fromkeys(("skills", "technical skills", "core skills", "key skills", "skills & tools",
+                     "technologies", "competencies", "core competencies"), 2),
+    **dict.fromkeys(("education", "academic background", "qualifications", "education & training"), 3),
+    **dict.fromkeys(("summary", "profile", "objective", "about", "about me", "professional summary",
+                     "career summary", "career objective"), 4),
+    **dict.fromkeys(("certifications", "projects", "achievements", "awards", "courses",
+                     "publications"), 5),
+    **dict.fromkeys(("languages", "volunteering", "hobbies", "interests", "references"), 6),
+}
+
+SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u3000]+")
+INVISIBLE_RE = re.compile(r"[\u00ad\u200b-\u200d\u2060\ufeff]")
+BULLET_RE = re.compile(r"^[•·▪◦●○■□►▶➢➤✓✔❖◆◇*]+\s*")
+PAGE_NUMBER_RE = re.compile(r"^(?:-\s*)?(?:page\s+)?\d{1,2}(?:\s*(?:/|of)\s*\d{1,2})?(?:\s*-)?$", re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+# Section tag at the start of indexed chunk texts, e.g. "[SKILL] Python"
+CHUNK_TAG_RE = re.compile(r"^\[[A-Z_ ]+\]\s*")
+# Repeats of lines at least this long are dropped wherever they occur
+MIN_DUPLICATE_CHARS = 40
+# Lines this close to a page edge are header/footer candidates
+PAGE_EDGE_LINES = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count of `text`.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _clean_line(line: str) -> str:
+    line = SPACE_RE.sub(" ", INVISIBLE_RE.sub("", line)).strip()
+    return BULLET_RE.sub("- ", line)
+
+
+def _page_edges(pages: List[List[str]]) -> Dict[str, int]:
+    # Number of pages each line appears on near the top or bottom
+    counts: Dict[str, int] = {}
+    for lines in pages:
+        edges = set(lines[:PAGE_EDGE_LINES] + lines[-PAGE_EDGE_LINES:])
+        for line in edges:
+            key = line.casefold()
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def clean_text(raw_text: str) -> str:
+    """
+    Normalize whitespace and bullets, drop page numbers, and remove
+    repeated lines: headers and footers repeated on several pages, and any
+    repeat of a long line. Lines with a year are kept, since the same date
+    range can belong to different positions.
+    """
+    pages = []
+    for page in re.split(r"\n\s*\n", raw_text):
+        lines = [_clean_line(line) for line in page.splitlines()]
+        lines = [line for line in lines if line and not PAGE_NUMBER_RE.match(line)]
+        if lines:
+            pages.append(lines)
+
+    edges = _page_edges(pages)
+    seen = set()
+    kept = []
+    for lines in pages:
+        for line in lines:
+            key = line.casefold()
+            if key in seen and not YEAR_RE.search(line) and (
+                    len(line) >= MIN_DUPLICATE_CHARS or edges.get(key, 0) > 1):
+                continue
+            seen.add(key)
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def _sections(lines: List[str]) -> List[Tuple[int, List[str]]]:
+    sections = [(0, [])]
+    for line in lines:
+        heading = line.strip(" :").casefold()
+        if heading in SECTION_PRIORITIES:
+            sections.append((SECTION_PRIORITIES[heading], [line]))
+        else:
+            sections[-1][1].append(line)
+    return [section for section in sections if section[1]]
+
+
+def fit_sections(text: str, max_tokens: int) -> str:
+    """
+    Cut resume text to `max_tokens`. Whole sections are kept in priority
+    order (contact details, experience, skills, education, summary, then
+    the rest) and the first section that does not fit is cut line by line.
+    The kept lines stay in their original order.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sections = _sections(text.split("\n"))
+    order = sorted(range(len(sections)), key=lambda i: (sections[i][0], i))
+    budget = max_tokens * CHARS_PER_TOKEN
+    kept: Dict[int, List[str]] = {}
+    for index in order:
+        lines = sections[index][1]
+        size = sum(len(line) + 1 for line in lines)
+        if size <= budget:
+            kept[index] = lines
+            budget -= size
+            continue
+        partial = []
+        for line in lines:
+            if len(line) + 1 > budget:
+                break
+            partial.append(line)
+            budget -= len(line) + 1
+        if partial:
+            kept[index] = partial
+        break
+    return "\n".join(line for index in sorted(kept) for line in kept[index])
+
+
+def compact_resume_text(raw_text: str, max_tokens: Optional[int] = None) -> str:
+    """
+    Resume text for the extraction prompt: cleaned and cut to the budget
+    (RESUME_PROMPT_MAX_TOKENS by default).
+    """
+    return fit_sections(clean_text(raw_text), max_tokens or RESUME_PROMPT_MAX_TOKENS)
+
+
+def _hit_text(text: Optional[str]) -> str:
+    text = CHUNK_TAG_RE.sub("", SPACE_RE.sub(" ", (text or "").replace("\n", " ")).strip())
+    if len(text) > SUMMARIZE_HIT_MAX_CHARS:
+        text = text[:SUMMARIZE_HIT_MAX_CHARS].rsplit(" ", 1)[0] + " ..."
+    return text
+
+
+def _candidates(search_results) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    # Chunk results (dense search) and candidate results (grouped, lexical,
+    # hybrid) as [(candidate name, [(section, text), ...])] in rank order
+    candidates: Dict[object, Tuple[str, List[Tuple[str, str]]]] = {}
+    for result in search_results or []:
+        if "payload" in result:
+            payload = result["payload"] or {}
+            key = payload.get("resume_id", payload.get("candidate_name"))
+            hits = [(payload.get("section"), payload.get("text"))]
+            name = payload.get("candidate_name")
+        else:
+            key = result.get("resume_id", result.get("candidate_name"))
+            hits = [(hit.get("section"), hit.get("text")) for hit in result.get("hits") or []]
+            name = result.get("candidate_name")
+        entry = candidates.setdefault(key, (name or "Unknown candidate", []))
+        entry[1].extend(hits)
+    return list(candidates.values())
+
+
+def compact_search_results(search_results, max_tokens: Optional[int] = None) -> str:
+    """
+    Search results for the summary prompt, as plain text: one block per
+    candidate in rank order with its matching text, without ids, scores or
+    repeated text. Lower-ranked results are dropped to fit the budget
+    (SUMMARIZE_PROMPT_MAX_TOKENS by default).
+    """
+    budget = (max_tokens or SUMMARIZE_PROMPT_MAX_TOKENS) * CHARS_PER_TOKEN
+    blocks = []
+    for name, hits in _candidates(search_results):
+        lines = [f"Candidate: {name}"]
+        seen = set()
+        for section, text in hits:
+            text = _hit_text(text)
+            if not text or text.casefold() in seen:
+                continue
+            seen.add(text.casefold())
+            lines.append(f"- [{section or 'resume'}] {text}")
+        block = "\n".join(lines)
+        if len(block) + 2 > budget:
+            break
+        blocks.append(block)
+        budget -= len(block) + 2
+    return "\n\n".join(blocks) if blocks else "No results."
@@ -1,6 +1,19 @@
+from typing import Optional
+
+from .compaction import compact_resume_text, estimate_tokens
+
 class ResumeExtractionPrompt:
     @staticmethod
-    def prompt(raw_text: str) -> str:
+    def prompt(raw_text: str, usage: Optional[dict] = None) -> str:
+        """
+        Build the extraction prompt from compacted resume text. `usage`, if
+        given, receives the estimated tokens of the text before ("raw") and
+        after ("compacted") compaction.
+        """
+        resume_text = compact_resume_text(raw_text)
+        if usage is not None:
+            usage["raw"] = estimate_tokens(raw_text)
+            usage["compacted"] = estimate_tokens(resume_text)
         return """
             You are an expert resume parser. Extract the following fields from the provided resume text.
             Return STRICT JSON ONLY, following EXACTLY this structure that can be parsed using json.loads() and loaded into a python dict.
@@ -34,4 +47,4 @@ class ResumeExtractionPrompt:
                     }
                 ]
             }
-            """.replace("RAW_TEXT_PLACEHOLDER", raw_text)
+            """.replace("RAW_TEXT_PLACEHOLDER", resume_text)
@@ -0,0 +1,34 @@
+import json
+from typing import List
+
+from .compaction import compact_resume_text
+
+class ResumeRepairPrompt:
+    @staticmethod
+    def prompt(raw_text: str, invalid: dict, errors: List[str]) -> str:
+        """
+        Ask again for only the fields of an extraction that failed
+        validation, showing the rejected values and why they were rejected.
+        """
+        return """
+            You are an expert resume parser. A previous extraction from the resume text below returned invalid values for some fields.
+            Return STRICT JSON ONLY: a single object containing exactly these fields, corrected: FIELDS_PLACEHOLDER
+            Use the same types as before: strings or null, "skills" a list of strings, "experience" and "education" lists of objects.
+            Don't include code block json formatting like json ````json ... ````
+
+            Invalid Values:
+            INVALID_PLACEHOLDER
+
+            Validation Errors:
+            ERRORS_PLACEHOLDER
+
+            Input Resume Text:
+            RAW_TEXT_PLACEHOLDER
+
+            Output JSON Structure:
+            {FIELDS_OBJECT_PLACEHOLDER}
+            """.replace("FIELDS_PLACEHOLDER", ", ".join(invalid)) \
+               .replace("FIELDS_OBJECT_PLACEHOLDER", ", ".join(f'"{field}": ...' for field in invalid)) \
+               .replace("INVALID_PLACEHOLDER", json.dumps(invalid)) \
+               .replace("ERRORS_PLACEHOLDER", "\n".join(errors)) \
+               .replace("RAW_TEXT_PLACEHOLDER", compact_resume_text(raw_text))
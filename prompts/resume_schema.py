@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+class ExperienceEntry(BaseModel):
+    """
+    One position in ResumeExtraction.experience.
+    """
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    company: Optional[str] = None
+    role: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    description: Optional[str] = None
+
+class EducationEntry(BaseModel):
+    """
+    One degree in ResumeExtraction.education.
+    """
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    institution: Optional[str] = None
+    degree: Optional[str] = None
+    start_year: Optional[str] = None
+    end_year: Optional[str] = None
+
+class ResumeExtraction(BaseModel):
+    """
+    The JSON structure requested by ResumeExtractionPrompt, used as the
+    model's response schema and to validate its output.
+    """
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    summary: Optional[str] = None
+    skills: List[str] = []
+    experience: List[ExperienceEntry] = []
+    education: List[EducationEntry] = []
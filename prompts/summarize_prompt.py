@@ -1,8 +1,20 @@
 import json
+from typing import Optional
+
+from .compaction import compact_search_results, estimate_tokens
 
 class SummarizePrompt:
     @staticmethod
-    def prompt(question: str, search_results) -> str:
+    def prompt(question: str, search_results, usage: Optional[dict] = None) -> str:
+        """
+        Build the summary prompt with the search results as compact text.
+        `usage`, if given, receives the estimated tokens of the results as
+        JSON ("raw") and as compacted text ("compacted").
+        """
+        results_text = compact_search_results(search_results)
+        if usage is not None:
+            usage["raw"] = estimate_tokens(json.dumps(search_results))
+            usage["compacted"] = estimate_tokens(results_text)
         return """
             You are an expert at summarizing information. Given the following search results from a resume vector database using semantic search,
             provide a concise and informative summary that answers the question below.
@@ -13,4 +25,4 @@ class SummarizePrompt:
             Search Results:
             SEARCH_RESULTS_PLACEHOLDER
 
-            """.replace("QUESTION_PLACEHOLDER", question).replace("SEARCH_RESULTS_PLACEHOLDER", json.dumps(search_results))
\ No newline at end of file
+            """.replace("QUESTION_PLACEHOLDER", question).replace("SEARCH_RESULTS_PLACEHOLDER", results_text)
@@ -0,0 +1,299 @@
+"""
+Rebuild the Qdrant index from the resumes stored in Postgres, without
+re-uploading PDFs or calling the LLM again. Use it after changing the
+embedding model, its output dimensionality, quantization or the chunking
+in QdrantService.prepare_resume_chunks.
+
+Resumes are read from Postgres in id order, one page per transaction,
+chunked, embedded in large batches and written to a new versioned
+collection (resumes_v1, resumes_v2, ...). Searches keep using the current
+collection through the `resumes` alias until the new one is complete; then
+the alias is switched in one atomic update.
+
+Writes made while the run copies still go to the old collection. Before
+the switch, resumes re-extracted since the run started (resumes.updated_at)
+are synced into the new collection and deleted ones (resume_deletions) are
+removed from it. After the switch the run waits `--settle-seconds` for
+requests that resolved the alias earlier, then replays once more.
+
+Progress is checkpointed to a SQLite file after every batch, so an
+interrupted run continues from the last finished batch when started again.
+
+Usage: python reindex.py --batch-size 500 --embed-batch-size 1000
+"""
+import os
+import re
+import time
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from lib import DatabaseService, QdrantService, init_pool, close_pool
+from lib.ingestion import document_data
+from lib.profile_index import build_profile_index
+from lib.tracing import configure_logging
+
+
+class Checkpoint:
+    """
+    Progress of reindex runs, stored in SQLite: the collection being built
+    and the last resume id written to it.
+    """
+    def __init__(self, path: str):
+        """
+        Open or create the checkpoint file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                collection TEXT PRIMARY KEY,
+                alias TEXT NOT NULL,
+                status TEXT NOT NULL,
+                last_resume_id INTEGER NOT NULL DEFAULT 0,
+                resumes INTEGER NOT NULL DEFAULT 0,
+                points INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+        """)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(runs);")}
+        if "since" not in columns:
+            # Checkpoints written before replaying existed
+            self.db.execute("ALTER TABLE runs ADD COLUMN since TEXT;")
+        self.db.commit()
+
+    def unfinished(self, alias: str) -> Optional[tuple]:
+        """
+        (collection, last_resume_id, resumes, points, since) of the latest
+        unfinished run for `alias`.
+        """
+        return self.db.execute(
+            "SELECT collection, last_resume_id, resumes, points, since FROM runs "
+            "WHERE alias = ? AND status = 'running' ORDER BY updated_at DESC LIMIT 1;", (alias,)
+        ).fetchone()
+
+    def save(self, collection: str, alias: str, status: str, #pylint: disable=R0913
+             last_resume_id: int, resumes: int, points: int, since: str):
+        """
+        Record the state of the run building `collection`; `since` is the
+        database time the run started at.
+        """
+        self.db.execute(
+            "INSERT OR REPLACE INTO runs "
+            "(collection, alias, status, last_resume_id, resumes, points, since, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+            (collection, alias, status, last_resume_id, resumes, points, since, time.time())
+        )
+        self.db.commit()
+
+
+def next_version(service: QdrantService, alias: str) -> str:
+    """
+    Name of the next versioned collection for `alias`, e.g. resumes_v3.
+    """
+    pattern = re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+    versions = [
+        int(match.group(1))
+        for match in (pattern.match(c.name) for c in service.qclient.get_collections().collections)
+        if match
+    ]
+    return f"{alias}_v{max(versions, default=0) + 1}"
+
+
+class Reindex: #pylint: disable=R0902
+    """
+    One reindex run into `collection`, continuing after `last_resume_id`
+    with the counts of the earlier sessions of the run. `since` is the
+    database time the run started at; changes made from then on are
+    replayed into `collection` before the alias is switched.
+    """
+    def __init__(self, service: QdrantService, checkpoint: Checkpoint, alias: str, #pylint: disable=R0913
+                 collection: str, batch_size: int, report_interval: float, since,
+                 last_resume_id: int = 0, resumes: int = 0, points: int = 0, settle_seconds: float = 0.0):
+        """
+        Prepare the run; `service` writes to `collection`.
+        """
+        self.service = service
+        self.checkpoint = checkpoint
+        self.alias = alias
+        self.collection = collection
+        self.batch_size = batch_size
+        self.report_interval = report_interval
+        self.last_resume_id = last_resume_id
+        self.resumes = resumes
+        self.points = points
+        self.since = since
+        self.settle_seconds = settle_seconds
+        self.replayed = 0
+        self.deleted = 0
+        self.started = time.perf_counter()
+        self._session_resumes = 0
+        self._session_points = 0
+        self._last_report = self.started
+
+    def report(self, final: bool = False):
+        """
+        Print progress and the throughput of this session.
+        """
+        now = time.perf_counter()
+        if not final and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        elapsed = max(now - self.started, 1e-9)
+        print(f"{'done' if final else 'progress'}: {self.resumes} resumes, {self.points} points "
+              f"(last id {self.last_resume_id}, {self.replayed} replayed, {self.deleted} deleted) | {elapsed:.1f}s, "
+              f"{self._session_resumes / elapsed:.1f} resumes/s, {self._session_points / elapsed:.1f} points/s",
+              flush=True)
+
+    def _flush(self, batch: list):
+        for resume_id, document in batch:
+            self.service.prepare_resume_chunks(
+                {"resume_id": resume_id, "extracted_data": document_data(document)}, append=True
+            )
+        written = self.service.create_embeddings_and_store()
+        self.service.chunks = []
+        self.last_resume_id = batch[-1][0]
+        self.resumes += len(batch)
+        self.points += written
+        self._session_resumes += len(batch)
+        self._session_points += written
+        self._save("running")
+        self.report()
+
+    def _save(self, status: str):
+        self.checkpoint.save(self.collection, self.alias, status, self.last_resume_id,
+                             self.resumes, self.points, self.since.isoformat())
+
+    def copy(self) -> int:
+        """
+        Index every resume after `last_resume_id`. Returns the number indexed.
+        """
+        before = self.resumes
+        batch = []
+        with DatabaseService() as database:
+            for row in database.iter_resume_documents(after_id=self.last_resume_id,
+                                                      itersize=self.batch_size):
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+        if batch:
+            self._flush(batch)
+        return self.resumes - before
+
+    def replay(self, since):
+        """
+        Bring the copied resumes up to date with the changes made from
+        `since` on: re-extracted resumes are synced into the collection and
+        deleted ones removed from it.
+        """
+        with DatabaseService() as database:
+            for resume_id, document in database.iter_resume_documents(
+                    updated_since=since, up_to_id=self.last_resume_id, itersize=self.batch_size):
+                self.service.prepare_resume_chunks({"resume_id": resume_id, "extracted_data": document_data(document)})
+                self.service.sync_resume_points(resume_id)
+                self.service.chunks = []
+                self.replayed += 1
+            deleted = database.deleted_resume_ids(since)
+        for resume_id in deleted:
+            self.service.delete_resume_points(resume_id)
+        self.deleted += len(deleted)
+
+    def run(self) -> Optional[str]:
+        """
+        Copy all resumes, catch up with resumes ingested, re-extracted or
+        deleted meanwhile, then switch the alias to the new collection and
+        catch up once more with writes still aimed at the old one. Returns
+        the collection the alias pointed to before.
+        """
+        self.copy()
+        # Uploads that landed during the pass have higher ids; repeat until none are left
+        while self.copy():
+            pass
+        with DatabaseService() as database:
+            replay_started = database.current_time()
+        self.replay(self.since)
+        previous = self.service.alias_target(self.alias)
+        self.service.switch_alias(self.alias, self.collection)
+        # Requests that resolved the alias before the switch may still write to the
+        # old collection; wait for them, then pick up what they committed
+        time.sleep(self.settle_seconds)
+        self.copy()
+        self.replay(replay_started - timedelta(seconds=self.settle_seconds))
+        self._save("done")
+        with DatabaseService() as database:
+            database.prune_deletions(self.since)
+        self.report(final=True)
+        return previous
+
+
+def main(args):
+    """
+    Run a reindex as configured on the command line.
+    """
+    configure_logging()
+    checkpoint = Checkpoint(args.checkpoint)
+    service = QdrantService()
+    alias = service.collection_name
+    if args.embed_batch_size:
+        service.embed_batch_size = args.embed_batch_size
+
+    init_pool()
+    try:
+        with DatabaseService() as database:
+            started_at = database.current_time()
+        unfinished = None if args.restart else checkpoint.unfinished(alias)
+        if unfinished and service.qclient.collection_exists(unfinished[0]):
+            collection, last_resume_id, resumes, points, since = unfinished
+            # Changes are replayed from the start of the first session of the run
+            since = datetime.fromisoformat(since) if since else datetime.fromtimestamp(0, started_at.tzinfo)
+            # Points of the batch that was being written when the run stopped
+            service.delete_points_after(collection, last_resume_id)
+            print(f"Resuming {collection} after resume id {last_resume_id} ({resumes} resumes done).")
+        else:
+            collection, last_resume_id, resumes, points = next_version(service, alias), 0, 0, 0
+            since = started_at
+            print(f"Building {collection}.")
+
+        # Create the collection up front with the current embedding size and settings
+        service.ensure_collection(collection, len(service.embed_texts(["dimension probe"])[0]))
+        service.collection_name = collection
+        checkpoint.save(collection, alias, "running", last_resume_id, resumes, points, since.isoformat())
+
+        run = Reindex(service, checkpoint, alias, collection, args.batch_size, args.report_interval, since,
+                      last_resume_id, resumes, points, args.settle_seconds)
+        previous = run.run()
+        if args.build_profiles:
+            with DatabaseService() as database:
+                meta = build_profile_index(service, database.list_resume_ids() or [])
+            print(f"Built profiles of {meta['count']} resumes from {collection}.")
+    finally:
+        close_pool()
+
+    if previous and previous != collection:
+        if args.drop_old:
+            service.qclient.delete_collection(previous)
+            service.forget_collection(previous)
+            print(f"Deleted previous collection {previous}.")
+        else:
+            print(f"Previous collection {previous} kept; delete it once the new index is verified.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the Qdrant index from Postgres behind an alias.")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="resumes per embedding round and checkpoint")
+    parser.add_argument("--embed-batch-size", type=int,
+                        help="chunks embedded per round while earlier ones upload (default: provider batch size)")
+    parser.add_argument("--checkpoint", default=".cache/reindex.checkpoint.sqlite3", help="checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="ignore an unfinished run and start a new version")
+    parser.add_argument("--drop-old", action="store_true",
+                        help="delete the previous collection after the alias is switched")
+    parser.add_argument("--build-profiles", action="store_true",
+                        help="rebuild the /api/match profile index from the new collection")
+    parser.add_argument("--settle-seconds", type=float, default=10.0,
+                        help="seconds to wait after the switch for writes still aimed at the previous collection")
+    parser.add_argument("--report-interval", type=float, default=10.0,
+                        help="seconds between throughput reports")
+    main(parser.parse_args())
@@ -0,0 +1,58 @@
+"""
+Standalone ingestion worker. Drains the job queue filled by
+POST /api/resume?background=true, independently of the API processes.
+
+Usage: python worker.py --concurrency 4
+"""
+import os
+import asyncio
+import argparse
+
+from lib import init_pool, close_pool
+from lib.concurrency import start_executors, shutdown_executors, warm_cpu_workers
+from lib.embedding_cache import close_embedding_cache
+from lib.ingestion import IngestionPipeline
+from lib.job_worker import start_workers, stop_workers
+from lib.pdf_extractor import worker_ready
+from lib.qdrant_service import close_qdrant_clients
+from lib.providers import get_llm_provider
+from lib.tracing import configure_logging
+
+
+async def main(concurrency: int):
+    """
+    Run `concurrency` workers until interrupted.
+    """
+    configure_logging()
+    init_pool()
+    start_executors()
+    tasks = []
+    try:
+        await warm_cpu_workers(worker_ready)
+        pipeline = IngestionPipeline(get_llm_provider())
+        tasks = start_workers(pipeline, concurrency)
+        print(f"Started {concurrency} ingestion workers.")
+        await asyncio.gather(*tasks)
+    finally:
+        # Same teardown as the API lifespan
+        try:
+            await stop_workers(tasks)
+        finally:
+            shutdown_executors()
+            close_qdrant_clients()
+            close_embedding_cache()
+            close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume ingestion worker.")
+    parser.add_argument(
+        "--concurrency", type=int,
+        default=int(os.environ.get("INGEST_WORKER_CONCURRENCY", 4)),
+        help="number of jobs processed concurrently by this process"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.concurrency))
+    except KeyboardInterrupt:
+        pass